@@ -1,10 +1,15 @@
-from fastapi import FastAPI, HTTPException, Query
+import json
+import hmac
+import asyncio
+from fastapi import FastAPI, HTTPException, Query, Request, Header, Depends
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uvicorn
 
 from services.llm_service import LLMService
+from config import CATALOG_POLL_SECONDS, LLM_BATCH_QUERIES_PER_PROMPT, ADMIN_TOKEN
 
 # Initialize the FastAPI app
 app = FastAPI(title="Ohio Restaurant Finder API")
@@ -18,8 +23,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize the LLM service
+# Initialize the LLM service and pick up new dataset versions as they are written
 llm_service = LLMService()
+llm_service.catalog_manager.watch(CATALOG_POLL_SECONDS)
 
 # Request and response models
 class RecommendationRequest(BaseModel):
@@ -32,27 +38,77 @@ class RecommendationResponse(BaseModel):
     query_analysis: str
     recommendations: List[Dict[str, Any]]
     error: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+class BatchRecommendationRequest(BaseModel):
+    queries: List[RecommendationRequest]
+    queries_per_prompt: Optional[int] = None
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[RecommendationResponse]
+    metadata: Dict[str, Any]
 
 @app.get("/")
 def read_root():
     return {"status": "Restaurant Finder API is running"}
 
 @app.post("/recommendations", response_model=RecommendationResponse)
-def get_recommendations(request: RecommendationRequest):
+async def get_recommendations(request: RecommendationRequest):
     """
     Get restaurant recommendations based on user query
     """
     try:
-        results = llm_service.get_recommendations(
+        results = await llm_service.get_recommendations_async(
             user_query=request.query,
             num_results=request.num_results,
             city=request.city,
             price_level=request.price_levels
         )
         return results
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for recommendations")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/recommendations/batch", response_model=BatchRecommendationResponse)
+async def get_recommendations_batch(request: BatchRecommendationRequest):
+    """
+    Get recommendations for many queries at once; queries with the same filters share LLM calls
+    """
+    try:
+        return await llm_service.get_recommendations_batch_async(
+            [query.model_dump() for query in request.queries],
+            queries_per_prompt=request.queries_per_prompt or LLM_BATCH_QUERIES_PER_PROMPT
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def server_sent_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/recommendations/stream")
+async def stream_recommendations(request: RecommendationRequest):
+    """
+    Stream restaurant recommendations as server-sent events: query_analysis,
+    then each recommendation as soon as it is generated, then done
+    """
+    async def events():
+        try:
+            async for event, data in llm_service.stream_recommendations(
+                user_query=request.query,
+                num_results=request.num_results,
+                city=request.city,
+                price_level=request.price_levels
+            ):
+                yield server_sent_event(event, data)
+        except asyncio.TimeoutError:
+            yield server_sent_event("error", {"error": "Timed out waiting for recommendations"})
+        except Exception as e:
+            yield server_sent_event("error", {"error": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.get("/restaurant/{restaurant_id}")
 def get_restaurant_details(restaurant_id: str):
     """
@@ -63,17 +119,92 @@ def get_restaurant_details(restaurant_id: str):
         raise HTTPException(status_code=404, detail=result["error"])
     return result
 
+@app.get("/similar/{restaurant_id}")
+def get_similar_restaurants(restaurant_id: str,
+                            limit: int = Query(10, ge=1, le=50),
+                            city: Optional[str] = None,
+                            price_levels: Optional[List[int]] = Query(None)):
+    """
+    Get the restaurants most similar to a restaurant, leaving out its other branches
+    """
+    result = llm_service.get_similar_restaurants(restaurant_id, limit, city=city, price_level=price_levels)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
 @app.get("/cities")
 def get_cities():
     """
     Get list of available cities
     """
-    cities = set()
-    for restaurant in llm_service.restaurants:
-        city = restaurant.get("city")
-        if city:
-            cities.add(city)
-    return {"cities": sorted(list(cities))}
+    return {"cities": llm_service.catalog.facets["cities"]}
+
+@app.get("/facets")
+def get_facets():
+    """
+    Get the available cities and the restaurant counts per cuisine type and price level
+    """
+    return llm_service.catalog.facets
+
+@app.get("/search")
+def search_restaurants(name: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    """
+    Autocomplete restaurant names
+    """
+    matches = llm_service.catalog.search_names(name, limit)
+    return {"results": [
+        {
+            "place_id": r.place_id,
+            "name": r.name,
+            "address": r.address,
+            "city": r.city,
+            "rating": r.rating
+        }
+        for r in matches
+    ]}
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    """
+    Get recommendation cache size, hit rate and saved LLM time
+    """
+    return llm_service.response_cache.stats()
+
+LOCAL_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+def require_admin(request: Request, x_admin_token: Optional[str] = Header(None)):
+    """
+    Allow a request to the admin endpoints
+
+    With ADMIN_TOKEN set the X-Admin-Token header must match it. Otherwise only
+    requests from this machine without an Origin header are allowed, so a web
+    page open in a local browser can't reach them.
+    """
+    if ADMIN_TOKEN:
+        if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+            raise HTTPException(status_code=401, detail="Invalid or missing admin token")
+        return
+    host = request.client.host if request.client else None
+    if host not in LOCAL_HOSTS or "origin" in request.headers:
+        raise HTTPException(status_code=403, detail="Admin endpoints are only available locally; set ADMIN_TOKEN")
+
+@app.post("/admin/reload", dependencies=[Depends(require_admin)])
+def reload_catalog():
+    """
+    Load the dataset again and swap it in; requests in flight keep the previous version
+    """
+    try:
+        changed = llm_service.reload()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, previous version kept: {e}")
+    return {"changed": changed, **llm_service.catalog_manager.status()}
+
+@app.get("/admin/catalog", dependencies=[Depends(require_admin)])
+def get_catalog_status():
+    """
+    Get the loaded dataset version and reload state
+    """
+    return llm_service.catalog_manager.status()
 
 if __name__ == "__main__":
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -3,6 +3,40 @@ import argparse
 import json
 from services.data_collector import GooglePlacesCollector
 from utils.data_processor import DataProcessor
+from utils.snapshot import SnapshotReader
+
+def print_stats(stats):
+    """Print the dataset statistics in readable form"""
+    print(f"Total restaurants in dataset: {stats['total']}")
+    
+    print("\nTop Cuisine Types:")
+    for cuisine, count in list(stats["cuisines"].items())[:10]:  # Show top 10
+        print(f"{cuisine}: {count} restaurants")
+    
+    print("\nPrice Levels:")
+    for label, count in stats["price_levels"].items():
+        print(f"{label}: {count} restaurants")
+    
+    coverage = stats["coverage"]
+    print(f"\nEnhanced Data:")
+    print(f"Restaurants with extracted dishes: {coverage['popular_dishes']}/{stats['total']}")
+    print(f"Restaurants with descriptors: {coverage['descriptors']}/{stats['total']}")
+    print(f"Restaurants with profiles: {coverage['profile']}/{stats['total']}")
+    
+    print("\nRating Distribution:")
+    for rating, count in stats["rating_distribution"].items():
+        print(f"{rating} stars: {count} restaurants")
+    
+    rating = stats["rating"]
+    reviews = stats["review_count"]
+    print(f"\nRating: average {rating['average']}, median {rating['p50']}, p25 {rating['p25']}, p90 {rating['p90']}")
+    print(f"Review count: median {reviews['p50']}, p25 {reviews['p25']}, p90 {reviews['p90']}")
+    
+    print("\nBy City:")
+    for city, city_stats in stats["cities"].items():
+        top_cuisine = next(iter(city_stats["cuisines"]), "n/a")
+        print(f"{city}: {city_stats['total']} restaurants, median rating {city_stats['rating']['p50']}, "
+              f"top cuisine {top_cuisine}")
 
 def main():
     """Main entry point for the restaurant data collection and processing component"""
@@ -10,8 +44,24 @@ def main():
     parser.add_argument('--collect', action='store_true', help='Collect restaurant data')
     parser.add_argument('--cities', nargs='+', help='Specific cities to collect data for (e.g., columbus cleveland)')
     parser.add_argument('--zipcodes', nargs='+', help='Specific zip codes to collect data for (e.g., 43201 43215)')
+    parser.add_argument('--mode', choices=['zipcode', 'grid'], default='zipcode', help='Collect by zip code text search, or by adaptive grid of nearby searches')
+    parser.add_argument('--workers', type=int, help='Number of parallel workers: zip code searches for --collect, enrichment processes for --process')
+    parser.add_argument('--details-workers', type=int, help='Number of place details lookups to run in parallel during collection')
+    parser.add_argument('--qps', type=float, help='Maximum Google Places API requests per second during collection')
+    parser.add_argument('--cache-mode', choices=['passthrough', 'record', 'replay'], help='Places API response cache: record live responses or replay them offline')
+    parser.add_argument('--stale-days', type=float, help='Re-fetch already collected restaurants older than this many days')
+    parser.add_argument('--refetch-details', action='store_true', help='Fetch details again for every restaurant found, even ones already collected')
+    resume_group = parser.add_mutually_exclusive_group()
+    resume_group.add_argument('--resume', dest='force', action='store_false', help='Resume an interrupted collection run, skipping completed zip codes (default)')
+    resume_group.add_argument('--force', dest='force', action='store_true', help='Redo work instead of resuming or reusing it: discard collection progress and re-enrich every restaurant')
+    parser.set_defaults(force=False)
     parser.add_argument('--process', action='store_true', help='Process and enhance restaurant data for LLM matching')
+    parser.add_argument('--chunk-size', type=int, help='Number of restaurants sent to each enrichment worker at a time during processing')
+    parser.add_argument('--input', type=str, help='JSON or JSONL file to process instead of restaurants.json')
+    parser.add_argument('--lexicon', type=str, help='JSON list of food words used to filter popular dish candidates (e.g. data/food_lexicon.json)')
     parser.add_argument('--stats', action='store_true', help='Generate statistics about the data')
+    parser.add_argument('--json', action='store_true', help='Print --stats as JSON')
+    parser.add_argument('--export-json', type=str, metavar='PATH', help='Export the binary snapshot written by --process as a restaurants JSON file')
     parser.add_argument('--view', type=str, help='View a specific restaurant by name or ID')
     parser.add_argument('--all', action='store_true', help='Run full pipeline: collect, process, and show stats')
     
@@ -25,71 +75,56 @@ def main():
     
     if args.collect:
         print("\n=== STEP 1: COLLECTING RESTAURANT DATA ===")
-        collector = GooglePlacesCollector()
+        collector = GooglePlacesCollector(
+            max_workers=args.workers,
+            details_workers=args.details_workers,
+            qps=args.qps,
+            stale_after_days=args.stale_days,
+            cache_mode=args.cache_mode
+        )
         
         if args.zipcodes:
             print(f"Collecting restaurant data for specific zipcodes: {', '.join(args.zipcodes)}")
-            collector.collect_by_zipcodes(args.zipcodes)
+            collector.collect_by_zipcodes(args.zipcodes, force=args.force, mode=args.mode,
+                                          refetch_details=args.refetch_details)
         else:
             print(f"Collecting restaurant data for cities: {', '.join(args.cities) if args.cities else 'all'}")
-            collector.collect_all_restaurants(args.cities)
+            collector.collect_all_restaurants(args.cities, force=args.force, mode=args.mode,
+                                              refetch_details=args.refetch_details)
             
         print("Data collection complete!")
     
     if args.process:
         print("\n=== STEP 2: PROCESSING RESTAURANT DATA ===")
-        processor = DataProcessor()
+        processor = DataProcessor(food_lexicon_path=args.lexicon)
         print("Cleaning and enhancing restaurant data...")
-        processor.clean_data()
+        processor.clean_data(workers=args.workers, chunk_size=args.chunk_size, input_path=args.input, force=args.force)
         print("Data processing complete!")
     
     if args.stats:
-        print("\n=== STEP 3: GENERATING STATISTICS ===")
         processor = DataProcessor()
+        stats = processor.generate_stats().to_dict()
         
-        # Basic stats
-        restaurants = processor.load_restaurants()
-        print(f"Total restaurants in dataset: {len(restaurants)}")
-        
-        # Cuisine stats
-        cuisine_stats = processor.generate_cuisine_stats()
-        print("\nTop Cuisine Types:")
-        for cuisine, count in list(cuisine_stats.items())[:10]:  # Show top 10
-            print(f"{cuisine}: {count} restaurants")
-        
-        # Price stats
-        price_stats = processor.generate_price_stats()
-        print("\nPrice Levels:")
-        for label, count in price_stats.items():
-            print(f"{label}: {count} restaurants")
-        
-        # Enhanced data stats
-        with_dishes = sum(1 for r in restaurants if r.get("popular_dishes"))
-        with_descriptors = sum(1 for r in restaurants if r.get("descriptors"))
-        
-        print(f"\nEnhanced Data:")
-        print(f"Restaurants with extracted dishes: {with_dishes}/{len(restaurants)}")
-        print(f"Restaurants with descriptors: {with_descriptors}/{len(restaurants)}")
-        
-        # Rating distribution
-        ratings = {}
-        for r in restaurants:
-            rating = r.get("rating", 0)
-            # Round to nearest 0.5
-            rating_key = round(rating * 2) / 2
-            ratings[rating_key] = ratings.get(rating_key, 0) + 1
-        
-        print("\nRating Distribution:")
-        for rating in sorted(ratings.keys()):
-            print(f"{rating} stars: {ratings[rating]} restaurants")
+        if args.json:
+            print(json.dumps(stats, indent=2))
+        else:
+            print("\n=== STEP 3: GENERATING STATISTICS ===")
+            print_stats(stats)
+    
+    if args.export_json:
+        processor = DataProcessor()
+        if not os.path.exists(processor.snapshot_path):
+            print(f"No snapshot found at {processor.snapshot_path}; run --process first")
+        else:
+            with SnapshotReader(processor.snapshot_path) as reader:
+                count = reader.export_json(args.export_json)
+            print(f"Exported {count} restaurants to {args.export_json}")
     
     if args.view:
         processor = DataProcessor()
-        restaurants = processor.load_restaurants()
         
-        # Case-insensitive partial name matching
-        search_term = args.view.lower()
-        matches = [r for r in restaurants if search_term in r.get("name", "").lower() or search_term == r.get("place_id", "")]
+        # Case-insensitive partial name matching, or an exact place_id
+        matches = processor.find_restaurants(args.view)
         
         if matches:
             print(f"\nFound {len(matches)} matching restaurants:")
@@ -136,13 +171,21 @@ def main():
             print(f"No restaurants found matching '{args.view}'")
     
     # If no arguments provided, show help
-    if not (args.collect or args.process or args.stats or args.view or args.all):
+    if not (args.collect or args.process or args.stats or args.export_json or args.view or args.all):
         parser.print_help()
         print("\nExample usage:")
         print("  python app.py --collect --cities columbus            # Collect data for Columbus")
         print("  python app.py --collect --zipcodes 43201 43215       # Collect data for specific zip codes")
+        print("  python app.py --collect --workers 8 --qps 20         # Collect with more parallelism")
+        print("  python app.py --collect --force                      # Start over instead of resuming")
+        print("  python app.py --collect --refetch-details            # Fetch details again for every restaurant")
+        print("  python app.py --collect --mode grid                  # Collect all of Ohio with an adaptive grid")
+        print("  python app.py --collect --cache-mode replay          # Re-run a recorded collection offline")
         print("  python app.py --process                             # Process collected data")
+        print("  python app.py --process --lexicon data/food_lexicon.json  # Only keep dishes with known food words")
         print("  python app.py --all                                 # Run complete pipeline")
+        print("  python app.py --stats --json                        # Print statistics as JSON")
+        print("  python app.py --export-json restaurants.json        # Export the binary snapshot as JSON")
         print("  python app.py --view burger                         # View restaurants with 'burger' in name")
 
 if __name__ == "__main__":
@@ -0,0 +1,1166 @@
+import os
+import sys
+import math
+import json
+import time
+import re
+import random
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import threading
+import asyncio
+import types
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# The stub server accepts any key, so offline runs don't need a real one
+os.environ.setdefault("GOOGLE_PLACES_API_KEY", "offline-benchmark")
+os.environ.setdefault("GOOGLE_GEMINI_API_KEY", "offline-benchmark")
+
+from services.data_collector import GooglePlacesCollector
+from collections import Counter
+from utils.data_processor import DataProcessor, DESCRIPTOR_PATTERNS, COMMON_FOOD_WORDS, PRICE_MAPPING
+from utils.snapshot import SnapshotReader, write_snapshot, snapshot_path_for
+from utils.restaurant import Restaurant
+from services.catalog import RestaurantCatalog
+from utils.search_index import SearchIndex
+from config import LLM_MAX_CONTEXT_RESTAURANTS, LLM_RETRIEVAL_TOP_K, LLM_PROMPT_TOKEN_BUDGET
+from config import DATA_DIR
+
+
+# Synthetic restaurants for the stub nearby search: a dense downtown lattice
+# inside a sparse one, so the grid mode has cells to split
+STUB_REGION = (39.9, -83.1, 40.1, -82.9)
+STUB_PLACES = (
+    [(39.9 + i * 0.01, -83.1 + j * 0.01) for i in range(20) for j in range(20)]
+    + [(39.95 + i * 0.002, -83.0 + j * 0.002) for i in range(15) for j in range(15)]
+)
+
+
+class StubPlacesHandler(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for the Google Places text search, nearby search, details
+    and geocoding endpoints. Every zip code returns three pages of 20 places,
+    and neighbouring zip codes overlap so deduplication is exercised.
+    """
+    latency = 0.02
+    error_rate = 0.0
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        # Simulate throttling so the retry path is exercised
+        if random.random() < self.error_rate:
+            self._send(429, {"status": "OVER_QUERY_LIMIT", "error_message": "Stub rate limit"})
+            return
+
+        if url.path.endswith("textsearch/json"):
+            if "pagetoken" in params:
+                zipcode, page = params["pagetoken"].split(":")
+                page = int(page)
+            else:
+                zipcode, page = params["query"].split()[2], 0
+            offset = int(zipcode) * 10 + page * 20
+            body = {
+                "status": "OK",
+                "results": [{"place_id": f"stub-{offset + i}"} for i in range(20)]
+            }
+            if page < 2:
+                body["next_page_token"] = f"{zipcode}:{page + 1}"
+            self._send(200, body)
+        elif url.path.endswith("nearbysearch/json"):
+            if "pagetoken" in params:
+                lat, lng, radius, page = params["pagetoken"].split(":")
+                page = int(page)
+            else:
+                lat, lng = params["location"].split(",")
+                radius, page = params["radius"], 0
+            lat, lng, radius = float(lat), float(lng), float(radius)
+            matches = [
+                (i, p) for i, p in enumerate(STUB_PLACES)
+                if math.hypot((p[0] - lat) * 111320, (p[1] - lng) * 111320 * math.cos(math.radians(lat))) <= radius
+            ]
+            page_matches = matches[:60][page * 20:(page + 1) * 20]
+            body = {"status": "OK", "results": [
+                {"place_id": f"stub-geo-{i}", "geometry": {"location": {"lat": p[0], "lng": p[1]}}}
+                for i, p in page_matches
+            ]}
+            if page < 2 and len(matches) > (page + 1) * 20:
+                body["next_page_token"] = f"{lat}:{lng}:{radius}:{page + 1}"
+            self._send(200, body)
+        elif url.path.endswith("geocode/json"):
+            south, west, north, east = STUB_REGION
+            self._send(200, {"status": "OK", "results": [{"geometry": {"bounds": {
+                "southwest": {"lat": south, "lng": west},
+                "northeast": {"lat": north, "lng": east}
+            }}}]})
+        elif url.path.endswith("details/json"):
+            place_id = params["place_id"]
+            lat, lng = STUB_PLACES[int(place_id.rsplit("-", 1)[1]) % len(STUB_PLACES)]
+            self._send(200, {"status": "OK", "result": {
+                "place_id": place_id,
+                "name": f"Stub Restaurant {place_id}",
+                "formatted_address": "1 Main St, Columbus, OH 43201, USA",
+                "geometry": {"location": {"lat": lat, "lng": lng}},
+                "address_components": [
+                    {"long_name": "Columbus", "short_name": "Columbus", "types": ["locality", "political"]},
+                    {"long_name": "Ohio", "short_name": "OH", "types": ["administrative_area_level_1", "political"]},
+                    {"long_name": "43201", "short_name": "43201", "types": ["postal_code"]}
+                ],
+                "rating": 4.2,
+                "user_ratings_total": 120,
+                "price_level": 2,
+                "types": ["restaurant", "food"],
+                "reviews": [{"author_name": "Stub", "rating": 5, "text": "Great Cheese Burger, cheap and fast.", "time": 0}]
+            }})
+        else:
+            self._send(404, {"status": "NOT_FOUND", "error_message": "Unknown endpoint"})
+
+
+def start_stub_server(latency: float, error_rate: float) -> ThreadingHTTPServer:
+    """Start the stub Places server on a free local port"""
+    StubPlacesHandler.latency = latency
+    StubPlacesHandler.error_rate = error_rate
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPlacesHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def benchmark_collect(args):
+    """
+    Benchmark a full collection run against a local stub Places server.
+    """
+    server = start_stub_server(args.latency, args.error_rate)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        zipcodes = [str(43201 + i) for i in range(args.zipcodes)]
+        with open(os.path.join(data_dir, "ohio_zipcodes.json"), "w") as f:
+            json.dump({"benchmark": zipcodes}, f)
+
+        collector = GooglePlacesCollector(
+            max_workers=args.workers,
+            details_workers=args.details_workers,
+            qps=args.qps,
+            base_url=base_url,
+            data_dir=data_dir,
+            cache_mode=args.cache_mode,
+            cache_dir=args.cache_dir or os.path.join(data_dir, "places_cache")
+        )
+
+        start = time.perf_counter()
+        collector.collect_restaurants(cities=["benchmark"], mode=args.mode)
+        elapsed = time.perf_counter() - start
+
+        stats = collector.client.get_stats()
+        print("\n--- Collection Benchmark ---")
+        print(f"Mode: {args.mode}, zip codes: {args.zipcodes}, workers: {args.workers}, details workers: {args.details_workers}")
+        print(f"Elapsed: {elapsed:.2f}s")
+        print(f"Throughput: {stats['requests'] / elapsed:.1f} requests/s")
+        print(f"Latency: p50 {stats['p50_ms']} ms, p90 {stats['p90_ms']} ms, p99 {stats['p99_ms']} ms")
+        print(f"Retries: {stats['retries']}, failures: {stats['failures']}")
+        if args.cache_mode != "passthrough":
+            cache = collector.client.cache
+            print(f"Cache ({args.cache_mode}): {cache.hits} hits, {cache.misses} misses")
+
+    server.shutdown()
+
+
+def legacy_extract_descriptors(reviews):
+    """The previous descriptor scan: one substring search per pattern, no word boundaries"""
+    all_text = " ".join([review.get("text", "").lower() for review in reviews])
+    descriptors = []
+    for category, patterns in DESCRIPTOR_PATTERNS.items():
+        for pattern in patterns:
+            if pattern in all_text:
+                descriptors.append(category)
+                break
+    return descriptors
+
+
+def load_json(path):
+    """Load a JSON file"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_review_sets(processor):
+    """Reviews of every bundled restaurant, as plain dicts"""
+    return [[review.to_dict() for review in r.reviews] for r in processor.load_restaurants()]
+
+
+def time_call(func, repeat):
+    """Best wall time of `repeat` calls to func, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_descriptors(args):
+    """
+    Compare the single-pass descriptor matcher with the previous substring scan.
+
+    Correctness cases live in tests/test_descriptors.py.
+    """
+    processor = DataProcessor()
+
+    review_sets = load_review_sets(processor) * args.scale
+    legacy = time_call(lambda: [legacy_extract_descriptors(r) for r in review_sets], args.repeat)
+    current = time_call(lambda: [processor.extract_descriptors(r) for r in review_sets], args.repeat)
+
+    changed = sum(
+        1 for r in review_sets[:len(review_sets) // args.scale]
+        if legacy_extract_descriptors(r) != processor.extract_descriptors(r)
+    )
+
+    print("\n--- Descriptor Benchmark ---")
+    print(f"Restaurants: {len(review_sets)}")
+    print(f"Substring scan: {legacy * 1000:.1f} ms")
+    print(f"Single-pass matcher: {current * 1000:.1f} ms ({legacy / current:.1f}x)")
+    print(f"Restaurants whose descriptors changed: {changed}/{len(review_sets) // args.scale}")
+
+
+def legacy_extract_popular_dishes(reviews):
+    """The previous dish extraction: patterns compiled on every call, results collected in a list"""
+    potential_dishes = []
+    for review in reviews:
+        text = review.get("text", "")
+        capitalized_phrases = re.findall(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b', text)
+        food_phrases = re.findall(r'\b(\w+\s+(?:burger|pizza|sandwich|salad|pasta|taco|burrito|chicken|steak|fish|soup|dessert)s?)\b', text.lower())
+        for phrase in capitalized_phrases:
+            if len(phrase) > 3 and phrase.lower() not in COMMON_FOOD_WORDS:
+                potential_dishes.append(phrase)
+        for phrase in food_phrases:
+            if phrase not in potential_dishes:
+                potential_dishes.append(" ".join(word.capitalize() for word in phrase.split()))
+    if potential_dishes:
+        return [dish for dish, count in Counter(potential_dishes).most_common(10) if count > 1]
+    return []
+
+
+def benchmark_dishes(args):
+    """
+    Compare the precompiled, batched dish extraction with the previous version,
+    with and without the food lexicon.
+    """
+    processor = DataProcessor()
+    lexicon_processor = DataProcessor(food_lexicon_path=args.lexicon)
+
+    review_sets = load_review_sets(processor)
+    restaurants = len(review_sets)
+    review_sets = review_sets * args.scale
+    legacy = time_call(lambda: [legacy_extract_popular_dishes(r) for r in review_sets], args.repeat)
+    single = time_call(lambda: [processor.extract_popular_dishes(r) for r in review_sets], args.repeat)
+    current = time_call(lambda: processor.extract_popular_dishes_batch(review_sets), args.repeat)
+    filtered = time_call(lambda: lexicon_processor.extract_popular_dishes_batch(review_sets), args.repeat)
+
+    # Without a lexicon the output must be unchanged
+    base_sets = review_sets[:restaurants]
+    expected = [legacy_extract_popular_dishes(r) for r in base_sets]
+    mismatches = sum(1 for a, b in zip(expected, processor.extract_popular_dishes_batch(base_sets)) if a != b)
+    mismatches += sum(1 for a, r in zip(expected, base_sets) if a != processor.extract_popular_dishes(r))
+
+    # With the lexicon, count the candidates it drops
+    with_lexicon = lexicon_processor.extract_popular_dishes_batch(base_sets)
+    dropped = sorted({dish for a, b in zip(expected, with_lexicon) for dish in set(a) - set(b)})
+
+    print("\n--- Dish Extraction Benchmark ---")
+    print(f"Restaurants: {len(review_sets)}")
+    print(f"Previous extraction: {legacy * 1000:.1f} ms")
+    print(f"Precompiled, one restaurant per call: {single * 1000:.1f} ms ({legacy / single:.1f}x)")
+    print(f"Precompiled batch: {current * 1000:.1f} ms ({legacy / current:.1f}x)")
+    print(f"Precompiled batch with lexicon: {filtered * 1000:.1f} ms ({legacy / filtered:.1f}x)")
+    print(f"Restaurants whose dishes changed without the lexicon: {mismatches}/{restaurants}")
+    print(f"Candidates dropped by the lexicon: {len(dropped)}")
+    for dish in dropped[:args.show]:
+        print(f"  {dish}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+def legacy_stats(processor):
+    """The previous --stats: three full loads of the dataset plus separate passes"""
+    restaurants = load_json(processor.restaurants_path)
+    for _ in range(2):
+        cuisine_counts = {}
+        for restaurant in load_json(processor.restaurants_path):
+            for cuisine in restaurant.get("cuisine_types", []):
+                cuisine_counts[cuisine] = cuisine_counts.get(cuisine, 0) + 1
+    price_counts = {level: 0 for level in PRICE_MAPPING}
+    for restaurant in restaurants:
+        price_counts[restaurant.get("price_level", 0)] += 1
+    sum(1 for r in restaurants if r.get("popular_dishes"))
+    sum(1 for r in restaurants if r.get("descriptors"))
+    ratings = {}
+    for r in restaurants:
+        rating_key = round(r.get("rating", 0) * 2) / 2
+        ratings[rating_key] = ratings.get(rating_key, 0) + 1
+
+
+def benchmark_stats(args):
+    """
+    Compare the single-pass statistics engine with the previous --stats passes
+    as the dataset grows.
+    """
+    restaurants = [r.to_dict() for r in DataProcessor().load_restaurants()]
+
+    print("\n--- Statistics Benchmark ---")
+    with tempfile.TemporaryDirectory() as data_dir:
+        for scale in args.scales:
+            path = os.path.join(data_dir, f"restaurants_{scale}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(restaurants * scale, f, ensure_ascii=False, indent=2)
+
+            processor = DataProcessor()
+            processor.restaurants_path = path
+            processor.snapshot_path = snapshot_path_for(path)
+            legacy = time_call(lambda: legacy_stats(processor), args.repeat)
+            current = time_call(lambda: processor.generate_stats(path).to_dict(), args.repeat)
+            count = len(restaurants) * scale
+            print(f"{count} restaurants: previous {legacy * 1000:.1f} ms, single pass {current * 1000:.1f} ms "
+                  f"({legacy / current:.1f}x, {current / count * 1e6:.1f} us per restaurant)")
+
+
+def measure_load(load):
+    """Wall time and peak traced memory of a loader, keeping its result alive until measured"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def benchmark_load(args):
+    """
+    Compare loading the pretty-printed JSON dataset with opening the binary snapshot.
+    """
+    restaurants = [r.to_dict() for r in DataProcessor().load_restaurants()] * args.scale
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        json_path = os.path.join(data_dir, "restaurants.json")
+        snapshot_path = os.path.join(data_dir, "restaurants.snap")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(restaurants, f, ensure_ascii=False, indent=2)
+        write_snapshot(restaurants, snapshot_path)
+
+        def load_json():
+            with open(json_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        def load_snapshot():
+            return SnapshotReader(snapshot_path).load_restaurants()
+
+        json_time, json_peak = measure_load(load_json)
+        snapshot_time, snapshot_peak = measure_load(load_snapshot)
+
+        # Lazily loaded reviews must decode to the original records
+        with SnapshotReader(snapshot_path) as reader:
+            mismatches = sum(1 for a, b in zip(reader.iter_restaurants(reviews="eager"), restaurants) if a != b)
+
+        print("\n--- Dataset Load Benchmark ---")
+        print(f"Restaurants: {len(restaurants)}")
+        print(f"File size: JSON {os.path.getsize(json_path) / 1e6:.1f} MB, "
+              f"snapshot {os.path.getsize(snapshot_path) / 1e6:.1f} MB")
+        print(f"json.load: {json_time * 1000:.1f} ms, peak {json_peak / 1e6:.1f} MB")
+        print(f"Snapshot (lazy reviews): {snapshot_time * 1000:.1f} ms, peak {snapshot_peak / 1e6:.1f} MB "
+              f"({json_time / snapshot_time:.1f}x faster)")
+        print(f"Records that differ after a round trip: {mismatches}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+def synthetic_restaurant(i):
+    """A processed restaurant record with five short reviews"""
+    return {
+        "place_id": f"synthetic-{i}",
+        "name": f"Synthetic Restaurant {i}",
+        "address": f"{i} Main St, Columbus, OH 43201, USA",
+        "city": random.choice(["columbus", "cleveland", "cincinnati", "dayton", "toledo"]),
+        "zipcode": "43201",
+        "lat": 39.9 + random.random() * 0.2,
+        "lng": -83.1 + random.random() * 0.2,
+        "rating": round(random.uniform(3, 5), 1),
+        "user_ratings_total": random.randint(0, 2000),
+        "price_level": random.randint(0, 4),
+        "website": f"https://example.com/{i}",
+        "phone": "(614) 555-0100",
+        "types": ["restaurant", "food", "point_of_interest", "establishment"],
+        "fetched_at": 1700000000,
+        "reviews": [
+            {"author_name": f"Reviewer {j}", "rating": random.randint(1, 5),
+             "text": f"Review {j} of restaurant {i}: good food and friendly staff.", "time": 1700000000 + j}
+            for j in range(5)
+        ],
+        "cuisine_types": ["Restaurant"],
+        "price_display": "$$",
+        "popular_dishes": ["Cheese Burger"],
+        "descriptors": ["casual"],
+        "sentiment": "positive",
+        "profile": f"Synthetic Restaurant {i} is a restaurant in columbus.",
+        "content_hash": f"{i:064x}"
+    }
+
+
+def resident_bytes():
+    """Current resident set size of this process (Linux), or peak RSS elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure_catalog(variant, count):
+    """Resident size of `count` synthetic restaurants held as dicts or Restaurant records"""
+    random.seed(0)
+    before = resident_bytes()
+    if variant == "dict":
+        catalog = [synthetic_restaurant(i) for i in range(count)]
+    else:
+        shared = {}
+        catalog = [Restaurant.from_dict(synthetic_restaurant(i), shared) for i in range(count)]
+    after = resident_bytes()
+    print(json.dumps({"variant": variant, "count": len(catalog), "bytes": after - before}))
+
+
+def benchmark_memory(args):
+    """
+    Compare the resident size of the catalog as nested dicts and as Restaurant records.
+    Each variant is measured in a fresh process.
+    """
+    if args.variant:
+        measure_catalog(args.variant, args.count)
+        return
+
+    results = {}
+    for variant in ("dict", "restaurant"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "memory", "--count", str(args.count), "--variant", variant],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results[variant] = json.loads(output.strip().splitlines()[-1])["bytes"]
+
+    print("\n--- Catalog Memory Benchmark ---")
+    print(f"Restaurants: {args.count}")
+    print(f"Dicts: {results['dict'] / 1e6:.1f} MB ({results['dict'] / args.count:.0f} bytes each)")
+    print(f"Restaurant records: {results['restaurant'] / 1e6:.1f} MB "
+          f"({results['restaurant'] / args.count:.0f} bytes each, "
+          f"{results['dict'] / results['restaurant']:.1f}x smaller)")
+
+
+def legacy_top_k(restaurants, k, city=None, price_levels=None):
+    """The previous candidate selection: linear filters, then a full sort when over k"""
+    if city:
+        restaurants = [r for r in restaurants if r.city.lower() == city.lower()]
+    if price_levels:
+        restaurants = [r for r in restaurants if r.price_level in price_levels]
+    if len(restaurants) > k:
+        restaurants = sorted(
+            restaurants,
+            key=lambda r: (r.rating * min(r.user_ratings_total, 500) / 500),
+            reverse=True
+        )[:k]
+    return restaurants
+
+
+FILTER_QUERIES = [
+    (None, None),
+    ("columbus", None),
+    (None, [1, 2]),
+    ("dayton", [4]),
+    ("toledo", [1]),
+    ("nowhere", None),
+]
+
+
+def benchmark_filter(args):
+    """
+    Compare indexed candidate selection with the previous filter-and-sort,
+    per request, as the catalog grows.
+    """
+    random.seed(0)
+    print("\n--- Candidate Filter Benchmark ---")
+    for size in args.sizes:
+        restaurants = [Restaurant.from_dict(synthetic_restaurant(i)) for i in range(size)]
+        build_start = time.perf_counter()
+        catalog = RestaurantCatalog(restaurants)
+        build = time.perf_counter() - build_start
+
+        mismatches = sum(
+            1 for city, prices in FILTER_QUERIES
+            if [r.place_id for r in legacy_top_k(restaurants, args.k, city, prices)]
+            != [r.place_id for r in catalog.top_k(args.k, city, prices)]
+        )
+
+        legacy = time_call(lambda: [legacy_top_k(restaurants, args.k, c, p) for c, p in FILTER_QUERIES], args.repeat)
+        current = time_call(lambda: [catalog.top_k(args.k, c, p) for c, p in FILTER_QUERIES], args.repeat)
+        per_query = len(FILTER_QUERIES)
+        print(f"{size} restaurants: previous {legacy / per_query * 1000:.2f} ms/request, "
+              f"indexed {current / per_query * 1000:.3f} ms/request ({legacy / current:.0f}x), "
+              f"index build {build * 1000:.0f} ms, mismatches {mismatches}")
+
+        if mismatches:
+            sys.exit(1)
+
+
+RETRIEVAL_QUERIES = [
+    "cheap and yummy chinese food but not too spicy and also authentic",
+    "yummy ramen place with a good atmosphere",
+    "nice place for a family dinner",
+    "late night pizza slice",
+    "brunch with good coffee and pancakes",
+]
+
+
+def format_candidates(restaurants):
+    """Approximate prompt text for a candidate list (same fields as the LLM context)"""
+    return "\n\n".join(
+        f"Name: {r.name}\nAddress: {r.address}\nRating: {r.rating}/5\nPrice Level: {r.price_display or r.price_level}\n"
+        f"Reviews: {' | '.join(review.text for review in r.reviews[:2])}\nProfile: {r.profile or ''}"
+        for r in restaurants
+    )
+
+
+def benchmark_retrieval(args):
+    """
+    Compare query-aware BM25 retrieval with the popularity-only candidate list:
+    prompt size, retrieval latency and the top candidates per query.
+    """
+    processor = DataProcessor()
+    restaurants = processor.load_restaurants()
+    catalog = RestaurantCatalog(restaurants)
+
+    start = time.perf_counter()
+    index = SearchIndex.build(restaurants)
+    build = time.perf_counter() - start
+    print("\n--- Retrieval Benchmark ---")
+    print(f"Restaurants: {len(restaurants)}, index terms: {len(index.postings)}, build {build * 1000:.0f} ms")
+
+    for query in RETRIEVAL_QUERIES:
+        popular = catalog.top_k(LLM_MAX_CONTEXT_RESTAURANTS)
+        latency = time_call(lambda: index.search(query), args.repeat)
+        matches = index.search(query)
+        retrieved = catalog.top_k_relevant(matches, LLM_RETRIEVAL_TOP_K) if matches else popular
+
+        # Rough token estimate of four characters per token
+        popular_tokens = len(format_candidates(popular)) // 4
+        retrieved_tokens = len(format_candidates(retrieved)) // 4
+        print(f"\n{query!r}")
+        print(f"  search {latency * 1000:.2f} ms, {len(matches)} matches; "
+              f"prompt ~{popular_tokens} -> ~{retrieved_tokens} tokens")
+        for r in retrieved[:args.show]:
+            print(f"  - {r.name} ({', '.join(r.cuisine_types)})")
+
+
+def benchmark_prompt(args):
+    """
+    Compare prompt sizes of the previous context (top 100 by popularity, two full
+    reviews each) with the token-budgeted, retrieval-ranked context, and time
+    context assembly with and without cached prompt fragments.
+    No LLM is called.
+    """
+    from services.llm_service import LLMService, estimate_tokens
+
+    service = LLMService()
+    budget = args.budget or LLM_PROMPT_TOKEN_BUDGET
+    previous, packed = [], []
+    for query in RETRIEVAL_QUERIES:
+        for city in (None, "columbus"):
+            popular = service.catalog.top_k(100, city=city)
+            previous.append(len(format_candidates(popular)) // 4)
+
+            matches = service.search_index.search(query)
+            candidates = service.catalog.top_k_relevant(matches, LLM_RETRIEVAL_TOP_K, city=city)
+            overhead = estimate_tokens(service._build_prompt("", query))
+            context, _ = service._prepare_context(candidates, query, budget - overhead)
+            packed.append(estimate_tokens(service._build_prompt(context, query)))
+
+    # Context assembly from freshly rendered fragments and from the cached ones
+    candidates = service.catalog.top_k(LLM_MAX_CONTEXT_RESTAURANTS)
+
+    def render():
+        service.prompt_fragments.clear()
+        service._prepare_context(candidates, "", budget)
+
+    rendered = time_call(render, args.repeat)
+    cached = time_call(lambda: service._prepare_context(candidates, "", budget), args.repeat)
+
+    print("\n--- Prompt Size Benchmark ---")
+    print(f"Queries: {len(previous)}")
+    print(f"Previous context: {min(previous)}-{max(previous)} tokens (context only)")
+    print(f"Budgeted prompt: {min(packed)}-{max(packed)} tokens (whole prompt, budget {budget})")
+    print(f"Context assembly for {len(candidates)} candidates: rendered {rendered * 1000:.2f} ms, "
+          f"cached fragments {cached * 1000:.2f} ms ({rendered / cached:.1f}x)")
+
+
+def query_variants(query):
+    """Rephrasings of a query that should share its cached response"""
+    return [query, query.upper(), f"  {query.capitalize()}!  ", f"looking for {query} please", f"{query}?"]
+
+
+def benchmark_cache(args):
+    """
+    Replay a mix of repeated and rephrased queries through the recommendation cache,
+    with a simulated LLM call on every miss.
+    """
+    from services.response_cache import RecommendationCache
+
+    random.seed(0)
+    path = os.path.join(tempfile.mkdtemp(), "cache.db") if args.sqlite else None
+    cache = RecommendationCache(similarity=args.similarity if args.similarity > 0 else None, path=path)
+    queries = [variant for query in RETRIEVAL_QUERIES for variant in query_variants(query)]
+    cities = [None, "columbus"]
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        query, city = random.choice(queries), random.choice(cities)
+        if cache.get(query, city, None, 3, "benchmark") is None:
+            time.sleep(args.latency)
+            cache.put(query, city, None, 3, "benchmark", {"query_analysis": query, "recommendations": []},
+                      args.latency)
+    elapsed = time.perf_counter() - start
+    stats = cache.stats()
+
+    print("\n--- Recommendation Cache Benchmark ---")
+    print(f"Requests: {args.requests}, distinct phrasings: {len(queries) * len(cities)}, "
+          f"simulated LLM latency {args.latency * 1000:.0f} ms, backend {'SQLite' if path else 'memory'}")
+    print(f"Hits: {stats['hits']}, similar hits: {stats['similar_hits']}, misses: {stats['misses']} "
+          f"(hit rate {stats['hit_rate']:.0%})")
+    print(f"Average latency: {elapsed / args.requests * 1000:.2f} ms "
+          f"(uncached {args.latency * 1000:.0f} ms), LLM time saved {stats['saved_seconds']:.1f} s")
+
+
+class FakeGeminiModel:
+    """
+    Stand-in for the Gemini model client that answers after a fixed latency.
+    Streamed responses arrive in chunks spread evenly over that latency.
+    """
+
+    def __init__(self, latency, recommendations=0, chunks=20):
+        self.latency = latency
+        self.chunks = chunks
+        self.text = json.dumps({
+            "query_analysis": "benchmark",
+            "recommendations": [
+                {"name": f"Restaurant {i}", "address": f"{i} Main St", "rating": "4.5/5", "price_level": "$$",
+                 "match_reasons": "Known for its food. " * 15, "details": "Cuisine: Benchmark. " * 8}
+                for i in range(recommendations)
+            ]
+        }, indent=2)
+
+    def _response(self, text):
+        return types.SimpleNamespace(text=text, usage_metadata=None)
+
+    async def _stream(self):
+        size = -(-len(self.text) // self.chunks)
+        for start in range(0, len(self.text), size):
+            await asyncio.sleep(self.latency / self.chunks)
+            yield self._response(self.text[start:start + size])
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.latency)
+        return self._response(self.text)
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        if stream:
+            return self._stream()
+        await asyncio.sleep(self.latency)
+        return self._response(self.text)
+
+
+async def run_users(app, path, users, requests_per_user):
+    """Send requests from concurrent users, each one waiting for its previous response"""
+    import httpx
+
+    latencies = []
+    errors = 0
+
+    async def user(client, u):
+        nonlocal errors
+        for r in range(requests_per_user):
+            # Unique queries, so the response cache doesn't answer them
+            query = f"{RETRIEVAL_QUERIES[(u + r) % len(RETRIEVAL_QUERIES)]} {u}-{r}"
+            start = time.perf_counter()
+            response = await client.post(path, json={"query": query})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(user(client, u) for u in range(users)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "errors": errors
+    }
+
+
+def benchmark_concurrency(args):
+    """
+    Load-test /recommendations against a fake LLM with a fixed latency, comparing the
+    async endpoint with the previous blocking endpoint served from the threadpool.
+    """
+    import api_endpoints
+    from services.response_cache import RecommendationCache
+
+    service = api_endpoints.llm_service
+    service.model = FakeGeminiModel(args.latency)
+    service.max_concurrency = args.max_concurrency
+    service.response_cache = RecommendationCache(max_entries=0)
+
+    @api_endpoints.app.post("/benchmark/blocking")
+    def blocking_recommendations(request: api_endpoints.RecommendationRequest):
+        return service.get_recommendations(request.query, request.num_results, request.city, request.price_levels)
+
+    print("\n--- Concurrent Recommendations Benchmark ---")
+    print(f"Fake LLM latency {args.latency * 1000:.0f} ms, {args.requests} requests per user, "
+          f"async concurrency limit {args.max_concurrency}")
+    for users in args.users:
+        for label, path in (("blocking", "/benchmark/blocking"), ("async", "/recommendations")):
+            result = asyncio.run(run_users(api_endpoints.app, path, users, args.requests))
+            print(f"{users:4d} users, {label:8s}: {result['throughput']:7.1f} req/s, "
+                  f"p50 {result['p50'] * 1000:6.0f} ms, p99 {result['p99'] * 1000:6.0f} ms, "
+                  f"errors {result['errors']}")
+
+
+def benchmark_stream(args):
+    """
+    Compare time to first result of streamed recommendations with the latency of
+    the complete response, against a fake LLM.
+    """
+    from services.llm_service import LLMService
+    from services.response_cache import RecommendationCache
+
+    service = LLMService()
+    service.model = FakeGeminiModel(args.latency, recommendations=args.results, chunks=args.chunks)
+    service.response_cache = RecommendationCache(max_entries=0)
+
+    async def stream(query):
+        start = time.perf_counter()
+        first = None
+        recommendations = 0
+        async for event, _ in service.stream_recommendations(query, num_results=args.results):
+            if event == "recommendation":
+                recommendations += 1
+                first = first or time.perf_counter() - start
+        return first, time.perf_counter() - start, recommendations
+
+    async def complete(query):
+        start = time.perf_counter()
+        response = await service.get_recommendations_async(query, num_results=args.results)
+        return time.perf_counter() - start, len(response["recommendations"])
+
+    print("\n--- Streaming Recommendations Benchmark ---")
+    print(f"Fake LLM latency {args.latency * 1000:.0f} ms in {args.chunks} chunks, {args.results} recommendations")
+    for query in RETRIEVAL_QUERIES:
+        full, count = asyncio.run(complete(query))
+        first, total, streamed = asyncio.run(stream(query))
+        print(f"{query[:40]!r:44s} complete {full * 1000:5.0f} ms; streamed: first result {first * 1000:5.0f} ms, "
+              f"all {total * 1000:5.0f} ms ({streamed}/{count} recommendations)")
+
+
+def benchmark_reload(args):
+    """
+    Measure prompt preparation latency while the catalog is reloaded in the
+    background, compared with an idle catalog. No LLM is called.
+    """
+    from services.llm_service import LLMService
+
+    service = LLMService()
+
+    def prepare_prompts(count):
+        latencies = []
+        versions = set()
+        for i in range(count):
+            state = service.catalog_manager.current
+            query = f"{RETRIEVAL_QUERIES[i % len(RETRIEVAL_QUERIES)]} {i}"
+            start = time.perf_counter()
+            service._prepare_prompt(state, query, 3, None, None, state.catalog.find_anchor(query))
+            latencies.append(time.perf_counter() - start)
+            versions.add(state.version)
+        latencies.sort()
+        return latencies, versions
+
+    idle, _ = prepare_prompts(args.requests)
+
+    reload_times = []
+    stop = threading.Event()
+
+    def reload_loop():
+        while not stop.is_set():
+            start = time.perf_counter()
+            service.reload()
+            reload_times.append(time.perf_counter() - start)
+
+    reloader = threading.Thread(target=reload_loop)
+    reloader.start()
+    try:
+        busy, versions = prepare_prompts(args.requests)
+    finally:
+        stop.set()
+        reloader.join()
+
+    def percentile(latencies, pct):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))] * 1000
+
+    print("\n--- Catalog Reload Benchmark ---")
+    print(f"Reloads: {len(reload_times)}, {sum(reload_times) / len(reload_times) * 1000:.0f} ms each")
+    print(f"Idle: p50 {percentile(idle, 50):.2f} ms, p99 {percentile(idle, 99):.2f} ms")
+    print(f"Reloading: p50 {percentile(busy, 50):.2f} ms, p99 {percentile(busy, 99):.2f} ms, "
+          f"dataset versions seen {len(versions)}")
+
+
+NAME_WORDS = (
+    ["Golden", "Blue", "Lucky", "Happy", "Old", "Little", "Red", "Royal", "Green", "Silver", "Urban", "Rustic"],
+    ["Dragon", "Oak", "Garden", "Lotus", "Harbor", "Maple", "Tiger", "Olive", "Ember", "River", "Stone", "Pepper"],
+    ["Grill", "Kitchen", "Bistro", "Diner", "Cafe", "Pizzeria", "Taqueria", "Noodle House", "Tavern", "Bakery"]
+)
+
+
+def synthetic_name(i):
+    """A restaurant name built from common name words"""
+    return " ".join(random.choice(words) for words in NAME_WORDS) + f" {i % 97}"
+
+
+def benchmark_lookup(args):
+    """
+    Compare place_id lookups, the city list and name searches on the catalog
+    indexes with the previous linear scans, as the catalog grows.
+    """
+    random.seed(0)
+    print("\n--- Lookup Benchmark ---")
+    for size in args.sizes:
+        restaurants = [Restaurant.from_dict(dict(synthetic_restaurant(i), name=synthetic_name(i))) for i in range(size)]
+        start = time.perf_counter()
+        catalog = RestaurantCatalog(restaurants)
+        build = time.perf_counter() - start
+        place_id = restaurants[size // 2].place_id
+        term = "lotus noodle"
+
+        def scan_place_id():
+            return next(r for r in restaurants if r.place_id == place_id)
+
+        def scan_cities():
+            return sorted({r.city for r in restaurants if r.city})
+
+        def scan_names():
+            return [r for r in restaurants if term in r.name.lower() or term == r.place_id]
+
+        def index_names():
+            return [restaurants[p] for p in catalog.name_index.search(term)]
+
+        assert scan_place_id() is catalog.get(place_id)
+        assert scan_cities() == catalog.facets["cities"]
+        start = time.perf_counter()
+        assert scan_names() == index_names()
+        first_search = time.perf_counter() - start
+
+        print(f"{size} restaurants (catalog build {build * 1000:.0f} ms, "
+              f"first name search incl. trigram build {first_search * 1000:.0f} ms):")
+        for label, previous, current in (
+            ("place_id lookup", scan_place_id, lambda: catalog.get(place_id)),
+            ("cities", scan_cities, lambda: catalog.facets["cities"]),
+            (f"name contains {term!r}", scan_names, index_names),
+            ("autocomplete 'lotus noo'", scan_names, lambda: catalog.search_names("lotus noo")),
+        ):
+            before = time_call(previous, args.repeat)
+            after = time_call(current, args.repeat)
+            print(f"  {label:32s} scan {before * 1e6:9.0f} us, indexed {after * 1e6:7.1f} us")
+
+
+class FakeBatchGeminiModel(FakeGeminiModel):
+    """Fake model that answers every query of a batch prompt and counts calls and prompt tokens"""
+
+    def __init__(self, latency):
+        super().__init__(latency, recommendations=3)
+        self.calls = 0
+        self.prompt_tokens = 0
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        self.prompt_tokens += len(prompt) // 4
+        await asyncio.sleep(self.latency)
+        queries = re.findall(r"^QUERY (\d+):", prompt, re.MULTILINE)
+        if not queries:
+            return self._response(self.text)
+        single = json.loads(self.text)
+        return self._response(json.dumps({"results": [dict(single, query=int(q)) for q in queries]}))
+
+
+def benchmark_batch(args):
+    """
+    Compare answering a query log one query per LLM call with the batch API,
+    against a fake LLM with a fixed latency.
+    """
+    from services.llm_service import LLMService
+    from services.response_cache import RecommendationCache
+
+    service = LLMService()
+    service.max_concurrency = args.concurrency
+    requests = [
+        {"query": f"{RETRIEVAL_QUERIES[i % len(RETRIEVAL_QUERIES)]} {i}", "city": (None, "columbus")[i % 2]}
+        for i in range(args.queries)
+    ]
+
+    def run(label, call):
+        service.model = FakeBatchGeminiModel(args.latency)
+        service.response_cache = RecommendationCache(max_entries=0)
+        start = time.perf_counter()
+        results = asyncio.run(call())
+        elapsed = time.perf_counter() - start
+        answered = sum(1 for r in results if r.get("recommendations"))
+        print(f"{label:22s} {args.queries / elapsed:7.1f} queries/s, {service.model.calls:4d} LLM calls, "
+              f"{service.model.prompt_tokens / args.queries:6.0f} prompt tokens/query, {answered} answered")
+
+    async def one_per_call():
+        return await asyncio.gather(*(
+            service.get_recommendations_async(r["query"], city=r["city"]) for r in requests
+        ))
+
+    async def batched():
+        response = await service.get_recommendations_batch_async(requests, queries_per_prompt=args.per_prompt)
+        return response["results"]
+
+    print("\n--- Batch Recommendations Benchmark ---")
+    print(f"{args.queries} queries, fake LLM latency {args.latency * 1000:.0f} ms, "
+          f"{args.concurrency} concurrent LLM calls")
+    run("one query per call", one_per_call)
+    run(f"batch of {args.per_prompt} per prompt", batched)
+
+
+SIMILAR_CUISINES = ["Burgers", "Pizza", "Sushi", "Tacos", "Thai", "Indian", "BBQ", "Cafe", "Bakery", "Diner"]
+SIMILAR_DESCRIPTORS = ["casual", "quick_service", "romantic", "late_night", "family_friendly", "healthy", "fancy"]
+SIMILAR_DISHES = ["Cheese Burger", "Fries", "Pepperoni Pizza", "Salmon Roll", "Fish Tacos", "Pad Thai",
+                  "Butter Chicken", "Brisket", "Latte", "Croissant", "Pancakes", "Milkshake"]
+
+
+def similar_restaurant(i):
+    """A synthetic restaurant with varied cuisines, descriptors and dishes; every 50th shares a chain name"""
+    record = synthetic_restaurant(i)
+    record["name"] = "Burger Barn" if i % 50 == 0 else synthetic_name(i)
+    record["cuisine_types"] = ["Restaurant", random.choice(SIMILAR_CUISINES)]
+    record["descriptors"] = random.sample(SIMILAR_DESCRIPTORS, 2)
+    record["popular_dishes"] = random.sample(SIMILAR_DISHES, 3)
+    return Restaurant.from_dict(record)
+
+
+def benchmark_similar(args):
+    """
+    Time "similar to X" neighbours from the similarity index against scoring
+    every restaurant, as the catalog grows, and compare the prompt the LLM gets
+    for such queries from search retrieval and from the similarity index.
+    """
+    from services.llm_service import LLMService, estimate_tokens
+    from utils.similarity_index import normalize_name
+
+    random.seed(0)
+    print("\n--- Similarity Benchmark ---")
+    for size in args.sizes:
+        restaurants = [similar_restaurant(i) for i in range(size)]
+        start = time.perf_counter()
+        catalog = RestaurantCatalog(restaurants)
+        build = time.perf_counter() - start
+        index = catalog.similarity
+        query = "similar to Burger Barn but not Burger Barn"
+
+        def scan():
+            anchor = catalog.find_anchor(query)
+            position = catalog._positions[anchor.place_id]
+            vector = index.vectors[position]
+            excluded = normalize_name(anchor.name)
+            scored = []
+            for doc, candidate in enumerate(restaurants):
+                if normalize_name(candidate.name) == excluded:
+                    continue
+                cosine = sum(weight * index.vectors[doc].get(feature, 0.0) for feature, weight in vector.items())
+                if cosine > 0:
+                    scored.append((index._score(anchor, candidate, cosine), -catalog._rank_of[doc], doc))
+            return [(restaurants[doc], score) for score, _, doc in sorted(scored, reverse=True)[:args.k]]
+
+        def indexed():
+            return catalog.similar(catalog.find_anchor(query).place_id, args.k)
+
+        assert [r.place_id for r, _ in scan()] == [r.place_id for r, _ in indexed()]
+        before = time_call(scan, args.repeat)
+        after = time_call(indexed, args.repeat)
+        print(f"{size:7d} restaurants: index build {build * 1000:6.0f} ms (whole catalog), "
+              f"top {args.k} by scan {before * 1000:8.2f} ms, indexed {after * 1000:6.2f} ms")
+
+    # Prompts for "similar to X but not X" over the real dataset
+    service = LLMService()
+    state = service.catalog_manager.current
+    anchors = [r for r in service.catalog.top_k(args.anchors)]
+    search_tokens, similar_tokens, search_anchor, local = [], [], 0, []
+    for anchor in anchors:
+        query = f"something similar to {anchor.name} but not {anchor.name}"
+        matches = state.search_index.search(query)
+        candidates = state.catalog.top_k_relevant(matches, LLM_RETRIEVAL_TOP_K)
+        search_anchor += any(normalize_name(r.name) == normalize_name(anchor.name) for r in candidates)
+        overhead = estimate_tokens(service._build_prompt("", query))
+        context, _ = service._prepare_context(candidates, query, LLM_PROMPT_TOKEN_BUDGET - overhead, state)
+        search_tokens.append(estimate_tokens(service._build_prompt(context, query)))
+        prompt_metadata = service._prepare_prompt(state, query, 3, None, None, state.catalog.find_anchor(query))[1]
+        similar_tokens.append(prompt_metadata["prompt_tokens"])
+
+        service.answer_similar_locally = True
+        start = time.perf_counter()
+        response = service.get_recommendations(query)
+        local.append(time.perf_counter() - start)
+        service.answer_similar_locally = False
+        assert response["metadata"].get("source") == "similarity"
+
+    print(f"{len(anchors)} 'similar to X but not X' queries over {len(state.restaurants)} restaurants:")
+    print(f"  search retrieval  prompt {sum(search_tokens) / len(anchors):7.0f} tokens, "
+          f"X itself among the candidates in {search_anchor}/{len(anchors)}")
+    print(f"  similarity index  prompt {sum(similar_tokens) / len(anchors):7.0f} tokens, X itself never a candidate")
+    print(f"  local answer (no LLM call) {sum(local) / len(local) * 1000:.2f} ms on average")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the restaurant backend")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    collect_parser = subparsers.add_parser("collect", help="Benchmark collection against a local stub Places server")
+    collect_parser.add_argument("--mode", choices=["zipcode", "grid"], default="zipcode", help="Collection mode")
+    collect_parser.add_argument("--zipcodes", type=int, default=10, help="Number of zip codes to collect")
+    collect_parser.add_argument("--workers", type=int, default=4, help="Zip codes searched in parallel")
+    collect_parser.add_argument("--details-workers", type=int, default=8, help="Details lookups in parallel")
+    collect_parser.add_argument("--qps", type=float, default=200, help="Request rate limit")
+    collect_parser.add_argument("--latency", type=float, default=0.02, help="Stub server latency in seconds")
+    collect_parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests throttled")
+    collect_parser.add_argument("--cache-mode", choices=["passthrough", "record", "replay"], default="passthrough",
+                                help="Places response cache mode")
+    collect_parser.add_argument("--cache-dir", help="Response cache directory, to replay a recorded run")
+    collect_parser.set_defaults(func=benchmark_collect)
+
+    descriptors_parser = subparsers.add_parser("descriptors", help="Benchmark descriptor extraction")
+    descriptors_parser.add_argument("--scale", type=int, default=20, help="Times to repeat the bundled dataset")
+    descriptors_parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    descriptors_parser.set_defaults(func=benchmark_descriptors)
+
+    dishes_parser = subparsers.add_parser("dishes", help="Benchmark popular dish extraction")
+    dishes_parser.add_argument("--scale", type=int, default=20, help="Times to repeat the bundled dataset")
+    dishes_parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    dishes_parser.add_argument("--lexicon", default=os.path.join(DATA_DIR, "food_lexicon.json"),
+                               help="Food lexicon to compare against")
+    dishes_parser.add_argument("--show", type=int, default=15, help="Dropped candidates to list")
+    dishes_parser.set_defaults(func=benchmark_dishes)
+
+    stats_parser = subparsers.add_parser("stats", help="Benchmark dataset statistics")
+    stats_parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50],
+                              help="Times to repeat the bundled dataset")
+    stats_parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    stats_parser.set_defaults(func=benchmark_stats)
+
+    load_parser = subparsers.add_parser("load", help="Benchmark loading JSON against the binary snapshot")
+    load_parser.add_argument("--scale", type=int, default=20, help="Times to repeat the bundled dataset")
+    load_parser.set_defaults(func=benchmark_load)
+
+    memory_parser = subparsers.add_parser("memory", help="Benchmark catalog memory as dicts and Restaurant records")
+    memory_parser.add_argument("--count", type=int, default=100000, help="Number of synthetic restaurants")
+    memory_parser.add_argument("--variant", choices=["dict", "restaurant"], help=argparse.SUPPRESS)
+    memory_parser.set_defaults(func=benchmark_memory)
+
+    filter_parser = subparsers.add_parser("filter", help="Benchmark candidate selection for recommendations")
+    filter_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                               help="Catalog sizes to test")
+    filter_parser.add_argument("--k", type=int, default=100, help="Candidates per request")
+    filter_parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    filter_parser.set_defaults(func=benchmark_filter)
+
+    retrieval_parser = subparsers.add_parser("retrieval", help="Benchmark BM25 candidate retrieval")
+    retrieval_parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions")
+    retrieval_parser.add_argument("--show", type=int, default=3, help="Top candidates to list per query")
+    retrieval_parser.set_defaults(func=benchmark_retrieval)
+
+    prompt_parser = subparsers.add_parser("prompt", help="Benchmark recommendation prompt sizes")
+    prompt_parser.add_argument("--budget", type=int, help="Prompt token budget (defaults to the configured one)")
+    prompt_parser.add_argument("--repeat", type=int, default=50, help="Timing repetitions")
+    prompt_parser.set_defaults(func=benchmark_prompt)
+
+    cache_parser = subparsers.add_parser("cache", help="Benchmark the recommendation response cache")
+    cache_parser.add_argument("--requests", type=int, default=500, help="Requests to replay")
+    cache_parser.add_argument("--latency", type=float, default=0.05, help="Simulated LLM latency in seconds")
+    cache_parser.add_argument("--similarity", type=float, default=0.8,
+                              help="Near-duplicate threshold (0 or less for exact matches only)")
+    cache_parser.add_argument("--sqlite", action="store_true", help="Persist the cache in a temporary SQLite file")
+    cache_parser.set_defaults(func=benchmark_cache)
+
+    concurrency_parser = subparsers.add_parser("concurrency", help="Load-test recommendations against a fake LLM")
+    concurrency_parser.add_argument("--users", type=int, nargs="+", default=[50, 100, 250, 500],
+                                    help="Concurrent users to simulate")
+    concurrency_parser.add_argument("--requests", type=int, default=3, help="Requests per user")
+    concurrency_parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM latency in seconds")
+    concurrency_parser.add_argument("--max-concurrency", type=int, default=500,
+                                    help="Concurrent LLM calls allowed on the async path")
+    concurrency_parser.set_defaults(func=benchmark_concurrency)
+
+    stream_parser = subparsers.add_parser("stream", help="Benchmark time to first streamed recommendation")
+    stream_parser.add_argument("--latency", type=float, default=3.0, help="Fake LLM latency in seconds")
+    stream_parser.add_argument("--chunks", type=int, default=30, help="Chunks the fake response is streamed in")
+    stream_parser.add_argument("--results", type=int, default=3, help="Recommendations per response")
+    stream_parser.set_defaults(func=benchmark_stream)
+
+    reload_parser = subparsers.add_parser("reload", help="Benchmark request latency during catalog reloads")
+    reload_parser.add_argument("--requests", type=int, default=2000, help="Prompts to prepare per phase")
+    reload_parser.set_defaults(func=benchmark_reload)
+
+    lookup_parser = subparsers.add_parser("lookup", help="Benchmark place_id, city and name lookups")
+    lookup_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                               help="Catalog sizes to test")
+    lookup_parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    lookup_parser.set_defaults(func=benchmark_lookup)
+
+    batch_parser = subparsers.add_parser("batch", help="Benchmark batch recommendations against a fake LLM")
+    batch_parser.add_argument("--queries", type=int, default=200, help="Queries in the log")
+    batch_parser.add_argument("--latency", type=float, default=1.0, help="Fake LLM latency in seconds")
+    batch_parser.add_argument("--concurrency", type=int, default=8, help="Concurrent LLM calls")
+    batch_parser.add_argument("--per-prompt", type=int, default=5, help="Queries per batch prompt")
+    batch_parser.set_defaults(func=benchmark_batch)
+
+    similar_parser = subparsers.add_parser("similar", help="Benchmark 'similar to X' neighbours and prompts")
+    similar_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                                help="Catalog sizes to test")
+    similar_parser.add_argument("--k", type=int, default=15, help="Neighbours per query")
+    similar_parser.add_argument("--anchors", type=int, default=20, help="Dataset restaurants to use as X")
+    similar_parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    similar_parser.set_defaults(func=benchmark_similar)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,5 +12,114 @@ GOOGLE_GEMINI_API_KEY = os.getenv("GOOGLE_GEMINI_API_KEY")
 # Max number of restaurants to fetch per zip code
 MAX_RESTAURANTS_PER_ZIP = 1000
 
+# Number of zip codes searched in parallel during collection
+COLLECTOR_MAX_WORKERS = 4
+
+# Number of place details lookups running in parallel during collection
+COLLECTOR_DETAILS_WORKERS = 8
+
+# Google Maps API base URL (override to point collection at a local stub server)
+PLACES_API_BASE_URL = os.getenv("PLACES_API_BASE_URL", "https://maps.googleapis.com/maps/api")
+
+# Per-request timeout for Google Places API calls (seconds)
+PLACES_API_TIMEOUT = 10
+
+# Retries for throttled (429, OVER_QUERY_LIMIT) or failed (5xx, network) Places API calls
+PLACES_API_MAX_RETRIES = 5
+
+# Exponential backoff base and cap for Places API retries (seconds)
+PLACES_API_BACKOFF_BASE = 0.5
+PLACES_API_BACKOFF_MAX = 30
+
+# Maximum Google Places API requests per second across all workers
+PLACES_API_QPS = 10
+
+# Delay Google requires before a next_page_token becomes valid (seconds)
+PLACES_PAGE_TOKEN_DELAY = float(os.getenv("PLACES_PAGE_TOKEN_DELAY", 2))
+
+# Bounding box of Ohio (south, west, north, east), used by the grid collection mode
+OHIO_BOUNDS = (38.40, -84.82, 41.98, -80.52)
+
+# Side of the initial grid cells in degrees; cells that hit the nearby search
+# result cap are split into quadrants down to the minimum cell size
+GRID_INITIAL_CELL_DEG = 0.2
+GRID_MIN_CELL_DEG = 0.005
+
+# Days after which an already collected restaurant's details are fetched again
+DETAILS_STALE_AFTER_DAYS = 30
+
+# Number of place details written to the collection checkpoint at a time
+DETAILS_CHECKPOINT_BATCH = 20
+
+# Worker processes and chunk size used by --process to enrich restaurants
+PROCESS_WORKERS = os.cpu_count() or 1
+PROCESS_CHUNK_SIZE = 500
+
 # Path to the data directory
-DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
\ No newline at end of file
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Optional food lexicon used to filter dish candidates during --process
+# (e.g. os.path.join(DATA_DIR, "food_lexicon.json")); None keeps every candidate
+FOOD_LEXICON_PATH = os.getenv("FOOD_LEXICON_PATH")
+
+# Gemini model used for recommendations, the maximum number of calls in flight
+# on the async API path, and the per-request timeout in seconds
+LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "gemini-2.5-pro-exp-03-25")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 64))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+
+# Maximum number of restaurants included in the recommendation prompt when the
+# query matches nothing in the search index (the most popular are sent instead)
+LLM_MAX_CONTEXT_RESTAURANTS = 100
+
+# Number of restaurants retrieved for the prompt when the query matches the search index
+LLM_RETRIEVAL_TOP_K = 40
+
+# Search matches fetched per retrieved restaurant when a city or price filter is
+# set, since some of them will be filtered out; all matches are searched only
+# when too few of those pass the filters
+LLM_RETRIEVAL_FILTER_OVERFETCH = 4
+
+# Estimated token budget for the whole recommendation prompt; candidates are
+# packed best first until it is used up
+LLM_PROMPT_TOKEN_BUDGET = 12000
+
+# Maximum characters kept from each review included in the prompt
+LLM_REVIEW_MAX_CHARS = 300
+
+# "Similar to X" queries: when a query names a restaurant, the prompt candidates
+# are its LLM_SIMILAR_TOP_K nearest neighbours (other branches left out) instead
+# of search results. With SIMILAR_ANSWER_LOCALLY the neighbours are returned as
+# the recommendations directly, without an LLM call
+LLM_SIMILAR_TOP_K = 15
+SIMILAR_ANSWER_LOCALLY = os.getenv("SIMILAR_ANSWER_LOCALLY", "").lower() in ("1", "true", "yes")
+
+# Batch recommendations: queries with the same filters share a prompt, up to
+# LLM_BATCH_QUERIES_PER_PROMPT per prompt, within a larger token budget
+LLM_BATCH_QUERIES_PER_PROMPT = 5
+LLM_BATCH_PROMPT_TOKEN_BUDGET = 30000
+
+# Seconds between checks of the data files by the API server; a new --process
+# output is loaded in the background and swapped in (0 disables watching)
+CATALOG_POLL_SECONDS = float(os.getenv("CATALOG_POLL_SECONDS", 30))
+
+# The /admin endpoints require ADMIN_TOKEN in the X-Admin-Token header. Without
+# a token they only answer local requests that don't come from a web page
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Recommendation response cache: exact queries (after lowercasing) are served
+# for LLM_CACHE_TTL_SECONDS, and queries whose search terms are at least
+# LLM_CACHE_SIMILARITY similar (Jaccard, None disables it) share a response.
+# Set LLM_CACHE_PATH to a SQLite file to keep the cache across restarts
+LLM_CACHE_MAX_ENTRIES = 1000
+LLM_CACHE_TTL_SECONDS = 6 * 60 * 60
+LLM_CACHE_SIMILARITY = 0.8
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")
+
+# On-disk cache of Places API responses for offline development and benchmarks.
+# Modes: "passthrough" (no cache), "record" (serve fresh entries, store live responses)
+# or "replay" (serve only from the cache, never hit the network)
+PLACES_CACHE_DIR = os.path.join(DATA_DIR, "places_cache")
+PLACES_CACHE_MODE = os.getenv("PLACES_CACHE_MODE", "passthrough")
+PLACES_CACHE_TTL_DAYS = 30
+PLACES_CACHE_MAX_MB = 500
\ No newline at end of file
@@ -0,0 +1,227 @@
+import os
+import sys
+import heapq
+import hashlib
+from array import array
+from itertools import islice
+from collections import Counter
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.restaurant import Restaurant
+from utils.name_index import NameIndex
+from utils.similarity_index import SimilarityIndex
+
+
+def popularity_score(restaurant: Restaurant) -> float:
+    """Rating weighted by review count, capped at 500 reviews"""
+    return restaurant.rating * min(restaurant.user_ratings_total, 500) / 500
+
+
+class RestaurantCatalog:
+    """
+    In-memory restaurant catalog with indexes for the recommendation filters.
+
+    Built once at load time: the restaurants are ranked by popularity score,
+    and the city and price level indexes hold the ranks of their restaurants
+    in ascending order. A filtered top-K is then a merge or intersection of
+    those lists that stops after K matches, instead of filtering and sorting
+    the whole catalog on every request.
+    
+    Lookups by place_id, name searches, the facets (cities, cuisines and
+    price level counts) and "similar to X" neighbours are also served from
+    structures built here.
+    """
+
+    def __init__(self, restaurants: List[Restaurant]):
+        self.restaurants = restaurants
+        self.version = self.dataset_version(restaurants)
+
+        # Positions in catalog order, most popular first (ties keep catalog order)
+        scores = [popularity_score(r) for r in restaurants]
+        self.by_popularity = array("l", sorted(range(len(restaurants)), key=scores.__getitem__, reverse=True))
+        self._rank_of = array("l", bytes(array("l").itemsize * len(restaurants)))
+        self._positions = {r.place_id: position for position, r in enumerate(restaurants)}
+
+        # Filter values by rank, so a candidate can be checked against the other filter in O(1)
+        self._city_by_rank: List[str] = []
+        self._price_by_rank: List[Any] = []
+        self.city_index: Dict[str, array] = {}
+        self.price_index: Dict[Any, array] = {}
+
+        for rank, position in enumerate(self.by_popularity):
+            self._rank_of[position] = rank
+            restaurant = restaurants[position]
+            city = (restaurant.city or "").lower()
+            price_level = restaurant.price_level
+            try:
+                self.price_index.setdefault(price_level, array("l")).append(rank)
+            except TypeError:
+                # Unhashable price levels can't match a filter
+                price_level = None
+            self._city_by_rank.append(city)
+            self._price_by_rank.append(price_level)
+            self.city_index.setdefault(city, array("l")).append(rank)
+        
+        self.name_index = NameIndex([r.name for r in restaurants], [r.place_id for r in restaurants])
+        self.facets = self._build_facets(restaurants)
+        self.similarity = SimilarityIndex(restaurants, self._rank_of)
+
+    def __len__(self) -> int:
+        return len(self.restaurants)
+    
+    @staticmethod
+    def _build_facets(restaurants: List[Restaurant]) -> Dict[str, Any]:
+        """Distinct cities and the restaurant counts per cuisine type and price level"""
+        cuisines = Counter()
+        prices = Counter()
+        cities = set()
+        for restaurant in restaurants:
+            if restaurant.city:
+                cities.add(restaurant.city)
+            cuisines.update(restaurant.cuisine_types or [])
+            try:
+                prices[restaurant.price_level] += 1
+            except TypeError:
+                prices[None] += 1
+        return {
+            "cities": sorted(cities),
+            "cuisines": dict(cuisines.most_common()),
+            "price_levels": {str(level): prices[level] for level in sorted(prices, key=lambda p: (p is None, str(p)))}
+        }
+    
+    def get(self, place_id: str) -> Optional[Restaurant]:
+        """Look up a restaurant by place_id"""
+        position = self._positions.get(place_id)
+        return self.restaurants[position] if position is not None else None
+    
+    def search_names(self, query: str, limit: int = 10) -> List[Restaurant]:
+        """
+        Autocomplete restaurant names
+        
+        Names starting with the query come first, then names with a word
+        starting with it, then names containing it; each group is ordered by
+        popularity.
+        """
+        positions = self.name_index.autocomplete(query, limit, rank=self._rank_of)
+        return [self.restaurants[position] for position in positions]
+    
+    def similar(self, place_id: str, k: int = 10, city: Optional[str] = None,
+                price_levels: Optional[Iterable[int]] = None) -> List[Tuple[Restaurant, float]]:
+        """
+        Get the restaurants most similar to one restaurant, leaving out its other branches
+        
+        Returns:
+            List of (restaurant, score), most similar first; empty for an unknown place_id
+        """
+        position = self._positions.get(place_id)
+        if position is None:
+            return []
+        neighbours = self.similarity.similar(position, k, city=city, price_levels=price_levels)
+        return [(self.restaurants[p], score) for p, score in neighbours]
+    
+    def find_anchor(self, query: str) -> Optional[Restaurant]:
+        """The restaurant a "similar to X" / "like X" query names, if any"""
+        position = self.similarity.find_anchor(query)
+        return self.restaurants[position] if position is not None else None
+    
+    def similarity_reasons(self, anchor: Restaurant, restaurant: Restaurant) -> Dict[str, Any]:
+        """What two restaurants have in common: shared features, price levels and distance"""
+        return self.similarity.explain(self._positions[anchor.place_id], self._positions[restaurant.place_id])
+    
+    @staticmethod
+    def dataset_version(restaurants: List[Restaurant]) -> str:
+        """Short digest of the records, so results cached for one dataset aren't served for another"""
+        digest = hashlib.sha256()
+        for r in restaurants:
+            digest.update(f"{r.place_id}\0{r.content_hash}\0{r.rating}\0{r.user_ratings_total}\n".encode("utf-8"))
+        return digest.hexdigest()[:12]
+
+    def _matching_ranks(self, city: Optional[str], price_levels: Optional[Iterable[int]]) -> Iterator[int]:
+        """Ranks of the restaurants matching the filters, most popular first"""
+        city = city.lower() if city else None
+        prices = set(price_levels) if price_levels else None
+
+        price_lists = None
+        if prices is not None:
+            price_lists = [self.price_index[p] for p in prices if p in self.price_index]
+
+        if city is None and price_lists is None:
+            return iter(range(len(self.restaurants)))
+
+        if price_lists is None:
+            return iter(self.city_index.get(city, ()))
+
+        merged = heapq.merge(*price_lists) if len(price_lists) > 1 else iter(price_lists[0] if price_lists else ())
+        if city is None:
+            return merged
+
+        # Walk the shorter candidate list and check the other filter by rank
+        city_ranks = self.city_index.get(city, ())
+        if len(city_ranks) <= sum(len(ranks) for ranks in price_lists):
+            return (rank for rank in city_ranks if self._price_by_rank[rank] in prices)
+        return (rank for rank in merged if self._city_by_rank[rank] == city)
+
+    def top_k(self, k: int, city: Optional[str] = None,
+              price_levels: Optional[Iterable[int]] = None) -> List[Restaurant]:
+        """
+        Get up to k restaurants matching the city and price level filters
+
+        When more than k restaurants match, the k most popular are returned,
+        most popular first. Otherwise all matches are returned in catalog order.
+
+        Args:
+            k: Maximum number of restaurants to return
+            city: Optional city filter (case-insensitive)
+            price_levels: Optional price levels to keep
+        """
+        ranks = list(islice(self._matching_ranks(city, price_levels), k + 1))
+        if len(ranks) > k:
+            return [self.restaurants[self.by_popularity[rank]] for rank in ranks[:k]]
+        return [self.restaurants[position] for position in sorted(self.by_popularity[rank] for rank in ranks)]
+    
+    def top_k_relevant(self, matches: List[Tuple[str, float]], k: int, city: Optional[str] = None,
+                       price_levels: Optional[Iterable[int]] = None) -> List[Restaurant]:
+        """
+        Get up to k restaurants matching the filters, most relevant first
+        
+        Restaurants from the search matches come first, by score. If fewer
+        than k of them pass the filters, the rest are filled with the most
+        popular matching restaurants.
+        
+        Args:
+            matches: (place_id, score) pairs from a search, best first
+            k: Maximum number of restaurants to return
+            city: Optional city filter (case-insensitive)
+            price_levels: Optional price levels to keep
+        """
+        city = city.lower() if city else None
+        prices = set(price_levels) if price_levels else None
+        
+        chosen = []
+        seen = set()
+        for place_id, _ in matches:
+            position = self._positions.get(place_id)
+            if position is None or position in seen:
+                continue
+            rank = self._rank_of[position]
+            if city is not None and self._city_by_rank[rank] != city:
+                continue
+            if prices is not None and self._price_by_rank[rank] not in prices:
+                continue
+            chosen.append(position)
+            seen.add(position)
+            if len(chosen) >= k:
+                break
+        
+        if len(chosen) < k:
+            for rank in self._matching_ranks(city, prices):
+                position = self.by_popularity[rank]
+                if position not in seen:
+                    chosen.append(position)
+                    seen.add(position)
+                    if len(chosen) >= k:
+                        break
+        
+        return [self.restaurants[position] for position in chosen]
@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import time
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.snapshot import SnapshotReader, snapshot_path_for, snapshot_is_fresh
+from utils.restaurant import Restaurant
+from utils.search_index import SearchIndex
+from services.catalog import RestaurantCatalog
+
+
+class CatalogState:
+    """
+    One loaded version of the dataset: the restaurants, their indexes and the
+    prompt fragments rendered from them.
+
+    A state is never modified once published (the fragment cache only grows),
+    so a request that took a reference keeps a consistent view even if a
+    newer version is swapped in meanwhile.
+
+    Restaurants loaded from a snapshot decode their reviews from `reader`.
+    It is unmapped once neither the state nor any of its restaurants is
+    referenced, so a request holding a restaurant across a reload can still
+    read its reviews.
+    """
+
+    __slots__ = ("restaurants", "catalog", "search_index", "prompt_fragments", "version", "loaded_at", "source",
+                 "reader")
+
+    def __init__(self, restaurants: List[Restaurant], search_index: SearchIndex, source: tuple,
+                 reader: Optional[SnapshotReader] = None):
+        self.restaurants = restaurants
+        self.catalog = RestaurantCatalog(restaurants)
+        self.search_index = search_index
+        # Prompt fragments by place_id: (with reviews, without reviews)
+        self.prompt_fragments: Dict[str, Tuple[str, str]] = {}
+        self.version = self.catalog.version
+        self.loaded_at = time.time()
+        self.source = source
+        self.reader = reader
+
+
+class CatalogManager:
+    """
+    Loads the restaurant dataset and keeps the API process on its latest version.
+
+    A new version is built next to the current one (by reload(), or by the
+    watcher thread when the data files change) and swapped in with a single
+    reference assignment. Requests read `current` once and never wait on a
+    reload; reloads are serialized.
+    """
+
+    def __init__(self, restaurants_path: str, search_index_path: str):
+        self.restaurants_path = restaurants_path
+        self.snapshot_path = snapshot_path_for(restaurants_path)
+        self.search_index_path = search_index_path
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.reloading = False
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self.current = self._build()
+
+    def _source_signature(self) -> tuple:
+        """Modification time and size of the data files, to notice new --process output"""
+        signature = []
+        for path in (self.restaurants_path, self.snapshot_path, self.search_index_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _load_restaurants(self) -> Tuple[List[Restaurant], Optional[SnapshotReader]]:
+        """
+        Load restaurant data, from the binary snapshot when it is up to date, otherwise from JSON
+
+        Returns:
+            The restaurants, and the snapshot reader their reviews are decoded from (None for JSON)
+        """
+        if snapshot_is_fresh(self.snapshot_path, self.restaurants_path):
+            reader = SnapshotReader(self.snapshot_path)
+            try:
+                shared = {}
+                return [Restaurant.from_dict(r, shared) for r in reader.iter_restaurants()], reader
+            except Exception:
+                reader.close()
+                raise
+
+        if not os.path.exists(self.restaurants_path):
+            raise FileNotFoundError(f"Restaurant data not found at {self.restaurants_path}")
+
+        with open(self.restaurants_path, 'r', encoding='utf-8') as f:
+            shared = {}
+            return [Restaurant.from_dict(r, shared) for r in json.load(f)], None
+
+    def _load_search_index(self, restaurants: List[Restaurant]) -> SearchIndex:
+        """Load the search index written by --process, or build it if it is missing or out of date"""
+        if snapshot_is_fresh(self.search_index_path, self.restaurants_path):
+            return SearchIndex.load(self.search_index_path)
+
+        print("Search index missing or out of date, building it in memory (run --process to save it)")
+        return SearchIndex.build(restaurants)
+
+    def _build(self) -> CatalogState:
+        """Load a new version of the dataset and its indexes"""
+        source = self._source_signature()
+        restaurants, reader = self._load_restaurants()
+        try:
+            return CatalogState(restaurants, self._load_search_index(restaurants), source, reader)
+        except Exception:
+            if reader is not None:
+                reader.close()
+            raise
+
+    def reload(self) -> bool:
+        """
+        Build the dataset from the current files and swap it in
+
+        Requests in flight keep the version they started with. If the build
+        fails, the current version stays in place and the error is raised.
+
+        Returns:
+            True if the dataset version changed
+        """
+        with self._reload_lock:
+            self.reloading = True
+            try:
+                start = time.perf_counter()
+                state = self._build()
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+            finally:
+                self.reloading = False
+
+            previous = self.current
+            self.current = state
+            self.reloads += 1
+            self.last_error = None
+            print(f"Loaded catalog version {state.version} ({len(state.restaurants)} restaurants) "
+                  f"in {time.perf_counter() - start:.2f}s")
+            return state.version != previous.version
+
+    def watch(self, interval: float) -> None:
+        """
+        Reload in a background thread whenever the data files change
+
+        A change is picked up once the files have stayed the same for one
+        interval, so a --process run still writing them isn't loaded halfway.
+
+        Args:
+            interval: Seconds between checks of the data files
+        """
+        if self._watcher is not None or not interval:
+            return
+
+        def poll():
+            pending = None
+            while not self._stop.wait(interval):
+                signature = self._source_signature()
+                if signature == self.current.source:
+                    pending = None
+                elif signature != pending:
+                    pending = signature
+                else:
+                    try:
+                        self.reload()
+                    except Exception as e:
+                        print(f"Catalog reload failed, keeping version {self.current.version}: {e}")
+                    pending = None
+
+        self._watcher = threading.Thread(target=poll, name="catalog-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop the watcher thread"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def status(self) -> Dict[str, Any]:
+        """Current version and reload state"""
+        state = self.current
+        return {
+            "version": state.version,
+            "restaurants": len(state.restaurants),
+            "loaded_at": state.loaded_at,
+            "reloads": self.reloads,
+            "reloading": self.reloading,
+            "watching": self._watcher is not None,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,98 @@
+import os
+import json
+from typing import List, Dict, Any, Set, Iterator
+
+
+class CheckpointStore:
+    """
+    Append-only checkpoint for restaurant records collected during a run.
+
+    Each record is written as one JSON line and fsynced, so only the new records
+    are written after each zip code. The checkpoint is merged into the canonical
+    restaurants.json once by compact() at the end of the run. If a run is
+    interrupted, the checkpoint survives and the next run picks up from it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        """Check whether a checkpoint from this or a previous run is present"""
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the durable records in the checkpoint"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted write is not durable
+                    print(f"Warning: Skipping incomplete checkpoint record in {self.path}")
+
+    def load_place_ids(self) -> Set[str]:
+        """Get the place_ids already written to the checkpoint"""
+        return {r.get("place_id") for r in self.iter_records() if r.get("place_id")}
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        """Append records to the checkpoint and flush them to disk"""
+        if not records:
+            return
+
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self, output_path: str) -> int:
+        """
+        Merge the checkpoint into the canonical dataset and remove the checkpoint
+
+        Args:
+            output_path: Path of the canonical restaurants.json file
+
+        Returns:
+            Number of new restaurants added to the dataset
+        """
+        existing_restaurants = []
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            try:
+                with open(output_path, 'r', encoding='utf-8') as f:
+                    existing_restaurants = json.load(f)
+            except json.JSONDecodeError:
+                print("Warning: Existing restaurant data file is corrupted. Starting with empty dataset.")
+
+        positions = {r.get("place_id"): i for i, r in enumerate(existing_restaurants)}
+        merged = list(existing_restaurants)
+        new_count = 0
+        refreshed_count = 0
+
+        for record in self.iter_records():
+            place_id = record.get("place_id", "")
+            if place_id in positions:
+                # A re-fetched stale record replaces the existing one in place
+                merged[positions[place_id]] = record
+                refreshed_count += 1
+                continue
+            positions[place_id] = len(merged)
+            merged.append(record)
+            new_count += 1
+
+        # Write to a temporary file first so the dataset is never left half-written
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, output_path)
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        print(f"Saved {len(merged)} restaurants to {output_path} ({new_count} new, {refreshed_count} refreshed)")
+        return new_count
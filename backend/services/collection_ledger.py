@@ -0,0 +1,149 @@
+import os
+import json
+import threading
+from typing import List, Dict, Any, Optional
+
+
+class CollectionLedger:
+    """
+    Persisted per-zipcode progress ledger for restaurant collection.
+
+    Progress is stored as an append-only JSONL event log. For every zip code
+    (or grid cell, in grid mode) it records the search pages fetched (with the
+    page token used and the place_ids found), whether the search finished and
+    hit the result cap, which place_ids have been detailed and whether the
+    zip code is complete. Replaying the log rebuilds the state, so an
+    interrupted run can skip completed zip codes and restart in-progress ones
+    from where they stopped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    @staticmethod
+    def _new_entry() -> Dict[str, Any]:
+        """Create an empty progress entry for a zip code"""
+        return {
+            "page_tokens": [],
+            "place_ids": [],
+            "next_page_token": None,
+            "search_complete": False,
+            "saturated": False,
+            "detailed": set(),
+            "complete": False
+        }
+
+    def _load(self) -> None:
+        """Rebuild the progress state by replaying the event log"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Warning: Skipping incomplete ledger entry in {self.path}")
+                    continue
+                self._apply(event)
+
+        in_progress = sum(1 for entry in self.state.values() if not entry["complete"])
+        print(f"Loaded collection ledger: {len(self.state) - in_progress} zip codes complete, "
+              f"{in_progress} in progress")
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        """Apply a single event to the in-memory state"""
+        entry = self.state.setdefault(event["zipcode"], self._new_entry())
+        kind = event["event"]
+
+        if kind == "page":
+            entry["page_tokens"].append(event.get("page_token"))
+            known = set(entry["place_ids"])
+            entry["place_ids"].extend(pid for pid in event.get("place_ids", []) if pid not in known)
+            entry["next_page_token"] = event.get("next_page_token")
+        elif kind == "search_complete":
+            entry["search_complete"] = True
+            entry["saturated"] = event.get("saturated", False)
+            entry["next_page_token"] = None
+        elif kind == "detailed":
+            entry["detailed"].update(event.get("place_ids", []))
+        elif kind == "complete":
+            entry["complete"] = True
+        elif kind == "reset":
+            self.state[event["zipcode"]] = self._new_entry()
+
+    def _record(self, event: Dict[str, Any]) -> None:
+        """Durably append an event to the log and apply it"""
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._apply(event)
+
+    def get(self, zipcode: str) -> Dict[str, Any]:
+        """Get the progress entry for a zip code"""
+        with self._lock:
+            return self.state.get(zipcode) or self._new_entry()
+
+    def is_complete(self, zipcode: str) -> bool:
+        """Check whether all work for a zip code is done"""
+        return self.get(zipcode)["complete"]
+
+    def record_page(self, zipcode: str, page_token: Optional[str], place_ids: List[str],
+                    next_page_token: Optional[str]) -> None:
+        """Record a fetched search page"""
+        self._record({
+            "zipcode": zipcode,
+            "event": "page",
+            "page_token": page_token,
+            "place_ids": place_ids,
+            "next_page_token": next_page_token
+        })
+
+    def record_search_complete(self, zipcode: str, saturated: bool = False) -> None:
+        """Record that the search for a zip code has no more pages, and whether it hit the result cap"""
+        self._record({"zipcode": zipcode, "event": "search_complete", "saturated": saturated})
+
+    def record_detailed(self, zipcode: str, place_ids: List[str]) -> None:
+        """Record place_ids whose details have been saved"""
+        if place_ids:
+            self._record({"zipcode": zipcode, "event": "detailed", "place_ids": place_ids})
+
+    def record_complete(self, zipcode: str) -> None:
+        """Record that all work for a zip code is done"""
+        self._record({"zipcode": zipcode, "event": "complete"})
+
+    def reset_search(self, zipcode: str) -> None:
+        """Forget the search progress of a zip code, e.g. after its page token expired"""
+        self._record({"zipcode": zipcode, "event": "reset"})
+
+    def clear(self) -> None:
+        """Discard all progress"""
+        with self._lock:
+            self.state = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def clear_if_complete(self) -> bool:
+        """
+        Discard the ledger once every zip code in it is complete
+
+        The ledger is kept as-is while anything is still in progress, so grid
+        cells completed earlier are not searched again on the next run.
+
+        Returns:
+            True if the ledger was cleared
+        """
+        with self._lock:
+            if any(not entry["complete"] for entry in self.state.values()):
+                return False
+
+        self.clear()
+        return True
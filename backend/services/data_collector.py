@@ -1,13 +1,32 @@
 import os
 import json
 import time
-import requests
-from typing import List, Dict, Any, Optional
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import sys
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import GOOGLE_PLACES_API_KEY, DATA_DIR, MAX_RESTAURANTS_PER_ZIP
+from config import (
+    GOOGLE_PLACES_API_KEY, DATA_DIR, MAX_RESTAURANTS_PER_ZIP,
+    COLLECTOR_MAX_WORKERS, COLLECTOR_DETAILS_WORKERS,
+    PLACES_PAGE_TOKEN_DELAY, DETAILS_CHECKPOINT_BATCH, DETAILS_STALE_AFTER_DAYS,
+    OHIO_BOUNDS, GRID_INITIAL_CELL_DEG, GRID_MIN_CELL_DEG,
+    PLACES_CACHE_DIR, PLACES_CACHE_MODE, PLACES_CACHE_TTL_DAYS, PLACES_CACHE_MAX_MB
+)
+from services.places_client import PlacesClient
+from services.places_cache import PlacesResponseCache
+from services.checkpoint_store import CheckpointStore
+from services.collection_ledger import CollectionLedger
+
+# Places returns at most 20 results per page and 3 pages per nearby search
+PLACES_PAGE_SIZE = 20
+NEARBY_SEARCH_MAX_PAGES = 3
+
+# Approximate length of one degree of latitude
+METERS_PER_DEGREE = 111320
 
 class GooglePlacesCollector:
     """
@@ -15,75 +34,227 @@ class GooglePlacesCollector:
     optimized to gather only the essential fields needed for restaurant recommendations
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, details_workers: Optional[int] = None,
+                 qps: Optional[float] = None, base_url: Optional[str] = None,
+                 data_dir: Optional[str] = None, stale_after_days: Optional[float] = None,
+                 cache_mode: Optional[str] = None, cache_dir: Optional[str] = None):
+        """
+        Args:
+            max_workers: Number of zip codes searched in parallel
+            details_workers: Number of place details lookups running in parallel
+            qps: Maximum Places API requests per second across all workers
+            base_url: Places API base URL (e.g. a local stub server for offline benchmarks)
+            data_dir: Directory holding the zip code list and collected data (defaults to DATA_DIR)
+            stale_after_days: Age after which an already collected restaurant is fetched again
+            cache_mode: Places response cache mode ("passthrough", "record" or "replay")
+            cache_dir: Directory of the Places response cache (defaults to PLACES_CACHE_DIR)
+        """
         self.api_key = GOOGLE_PLACES_API_KEY
         if not self.api_key:
             raise ValueError("Google Places API key is not set in environment variables")
         
+        self.max_workers = max_workers or COLLECTOR_MAX_WORKERS
+        self.details_workers = details_workers or COLLECTOR_DETAILS_WORKERS
+        
+        # Optional response cache so runs can be recorded and replayed offline
+        cache = PlacesResponseCache(
+            cache_dir or PLACES_CACHE_DIR,
+            mode=cache_mode or PLACES_CACHE_MODE,
+            ttl_seconds=PLACES_CACHE_TTL_DAYS * 86400,
+            max_bytes=PLACES_CACHE_MAX_MB * 1024 * 1024
+        )
+        
+        # One pooled, rate-limited session shared by all worker threads
+        self.client = PlacesClient(
+            self.api_key,
+            base_url=base_url,
+            qps=qps,
+            pool_size=self.max_workers + self.details_workers,
+            cache=cache
+        )
+        
         # Ensure data directory exists
-        os.makedirs(DATA_DIR, exist_ok=True)
+        self.data_dir = data_dir or DATA_DIR
+        os.makedirs(self.data_dir, exist_ok=True)
         
         # Load Ohio zip codes
         self.ohio_zipcodes = self._load_zipcodes()
+        self.zipcode_to_city = {}
+        for city, city_zipcodes in self.ohio_zipcodes.items():
+            for zipcode in city_zipcodes:
+                self.zipcode_to_city.setdefault(zipcode, city)
+        
+        # Collected records are appended to a checkpoint and merged into the dataset at the end
+        self.restaurants_path = os.path.join(self.data_dir, "restaurants.json")
+        self.checkpoint = CheckpointStore(os.path.join(self.data_dir, "restaurants.checkpoint.jsonl"))
+        self.checkpointed_ids = set()
+        self._save_lock = threading.Lock()
+        
+        # Global seen-set of place_id -> fetch timestamp, checked before any details request
+        self.stale_after_days = DETAILS_STALE_AFTER_DAYS if stale_after_days is None else stale_after_days
+        self.seen_places = {}
+        self._seen_lock = threading.Lock()
+        self.skipped_details = 0
+        
+        # Grid cells along the border reach into neighbouring states; places found
+        # there are dropped, and statewide runs also drop zip codes not in the list
+        self.statewide = False
+        self.out_of_state = 0
+        
+        # Per-zipcode progress, so interrupted runs can skip completed work
+        self.ledger_path = os.path.join(self.data_dir, "collection_ledger.jsonl")
+        self.ledger = None
     
     def _load_zipcodes(self) -> Dict[str, List[str]]:
         """Load Ohio zip codes from JSON file"""
-        zipcode_path = os.path.join(DATA_DIR, "ohio_zipcodes.json")
+        zipcode_path = os.path.join(self.data_dir, "ohio_zipcodes.json")
         if os.path.exists(zipcode_path):
             with open(zipcode_path, 'r') as f:
                 return json.load(f)
         else:
             raise FileNotFoundError(f"Ohio zip codes file not found at {zipcode_path}")
     
-    def _search_restaurants_by_zipcode(self, zipcode: str) -> List[Dict[str, Any]]:
+    def _search_restaurants_by_zipcode(self, zipcode: str) -> List[str]:
         """
         Search for restaurants in a specific zip code using Google Places API
-        """
-        base_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
         
+        Returns:
+            List of place_ids found in this zip code
+        """
         # Search for restaurants in this zip code
         params = {
             "query": f"restaurants in {zipcode} ohio",
-            "type": "restaurant",
-            "key": self.api_key
+            "type": "restaurant"
         }
         
-        results = []
-        next_page_token = None
+        # Collect up to MAX_RESTAURANTS_PER_ZIP establishments or max 20 pages
+        place_ids = self._paginated_search(zipcode, zipcode, "place/textsearch/json", params, max_pages=20)
+        return place_ids[:MAX_RESTAURANTS_PER_ZIP]
+    
+    def _search_restaurants_in_cell(self, cell: Tuple[float, float, float, float]) -> List[str]:
+        """
+        Search for restaurants in a grid cell using a Places nearby search
+        
+        The search circle covers the whole cell; only places inside the cell are
+        kept so neighbouring cells don't claim the same restaurant.
         
-        # Collect up to MAX_RESTAURANTS_PER_ZIP establishments or max 3 pages
-        page_count = 0
-        max_pages = 20
+        Args:
+            cell: Cell bounds as (south, west, north, east)
+            
+        Returns:
+            List of place_ids found in this cell
+        """
+        south, west, north, east = cell
+        center_lat = (south + north) / 2
+        center_lng = (west + east) / 2
+        
+        # Half the cell diagonal, in meters
+        height_m = (north - south) * METERS_PER_DEGREE
+        width_m = (east - west) * METERS_PER_DEGREE * math.cos(math.radians(center_lat))
+        radius = min(50000, math.ceil(math.hypot(height_m, width_m) / 2))
+        
+        params = {
+            "location": f"{center_lat},{center_lng}",
+            "radius": radius,
+            "type": "restaurant"
+        }
+        
+        def in_cell(place: Dict[str, Any]) -> bool:
+            location = place.get("geometry", {}).get("location", {})
+            lat, lng = location.get("lat"), location.get("lng")
+            if lat is None or lng is None:
+                return False
+            return south <= lat < north and west <= lng < east
+        
+        key = self._cell_key(cell)
+        return self._paginated_search(key, f"cell {key[5:]}", "place/nearbysearch/json", params,
+                                      max_pages=NEARBY_SEARCH_MAX_PAGES, place_filter=in_cell)
+    
+    def _paginated_search(self, key: str, label: str, endpoint: str, first_page_params: Dict[str, Any],
+                          max_pages: int, place_filter: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[str]:
+        """
+        Run a paginated Places search, recording each page in the progress ledger
+        
+        If a previous run stopped part way through the pagination, the search
+        continues from its last page token. When the search finishes, the ledger
+        also records whether it hit the Places result cap.
         
+        Args:
+            key: Ledger key of the zip code or grid cell being searched
+            label: Description used in progress messages
+            endpoint: Places search endpoint
+            first_page_params: Query parameters of the first page
+            max_pages: Maximum number of pages to fetch
+            place_filter: Optional predicate deciding which results to keep
+            
+        Returns:
+            List of place_ids found
+        """
+        progress = self.ledger.get(key)
+        results = list(progress["place_ids"])
+        if progress["search_complete"]:
+            return results
+        
+        next_page_token = progress["next_page_token"]
+        page_count = len(progress["page_tokens"])
+        resumed = False
+        if page_count and not next_page_token:
+            # The last page was fetched but the run stopped before marking the search done
+            self.ledger.record_search_complete(key)
+            return results
+        elif page_count:
+            print(f"Resuming search in {label} from page {page_count + 1}")
+            resumed = True
+        
+        page_size = 0
         while page_count < max_pages and len(results) < MAX_RESTAURANTS_PER_ZIP:
             # If we have a page token from a previous request, use it
+            # Google requires a short delay before using the next_page_token.
+            # This only blocks the worker handling this search.
+            delay = 0
             if next_page_token and page_count > 0:
-                # Google requires a short delay before using the next_page_token
-                time.sleep(2)
-                params = {"pagetoken": next_page_token, "key": self.api_key}
+                delay = PLACES_PAGE_TOKEN_DELAY
+                params = {"pagetoken": next_page_token}
+            else:
+                params = first_page_params
             
-            response = requests.get(base_url, params=params)
-            data = response.json()
+            status_code, data = self.client.get(endpoint, params, delay=delay)
             
-            if response.status_code != 200 or "error_message" in data:
+            if status_code != 200 or "error_message" in data:
+                if resumed and data.get("status") == "INVALID_REQUEST":
+                    # Page tokens from an earlier run expire; restart this search
+                    print(f"Saved page token for {label} has expired, restarting its search")
+                    self.ledger.reset_search(key)
+                    results, page_count, next_page_token = [], 0, None
+                    resumed = False
+                    continue
+                
                 error_msg = data.get("error_message", "Unknown error")
-                print(f"Error searching restaurants in {zipcode}: {error_msg}")
-                break
+                print(f"Error searching restaurants in {label}: {error_msg}")
+                return results
             
             # Add results to our list
-            if "results" in data:
-                results.extend(data["results"])
-                print(f"Found {len(data['results'])} restaurants in {zipcode} (page {page_count + 1})")
+            page_results = data.get("results", [])
+            page_size = len(page_results)
+            if place_filter:
+                page_results = [r for r in page_results if place_filter(r)]
+            page_place_ids = [r["place_id"] for r in page_results if r.get("place_id")]
+            results.extend(page_place_ids)
+            print(f"Found {len(page_place_ids)} restaurants in {label} (page {page_count + 1})")
             
-            # Get next page token if available
+            # Record the page, the token used to fetch it and the token for the next one
+            page_token = params.get("pagetoken")
             next_page_token = data.get("next_page_token")
+            self.ledger.record_page(key, page_token, page_place_ids, next_page_token)
             page_count += 1
+            resumed = False
             
-            # If we've collected enough restaurants, stop
-            if len(results) >= MAX_RESTAURANTS_PER_ZIP:
-                results = results[:MAX_RESTAURANTS_PER_ZIP]
+            if not next_page_token:
                 break
         
+        # A full last page at the page limit means Places had more results than it returned
+        saturated = page_count >= max_pages and page_size >= PLACES_PAGE_SIZE
+        self.ledger.record_search_complete(key, saturated=saturated)
         return results
     
     def _get_place_details(self, place_id: str) -> Dict[str, Any]:
@@ -91,71 +262,131 @@ class GooglePlacesCollector:
         Get detailed information about a place using its place_id
         Optimized to only request the essential fields needed
         """
-        base_url = "https://maps.googleapis.com/maps/api/place/details/json"
-        
         # Request only the fields we need for the recommendation system
         params = {
             "place_id": place_id,
-            "fields": "name,place_id,formatted_address,rating,user_ratings_total,price_level,types,reviews",
-            "key": self.api_key
+            "fields": "name,place_id,formatted_address,geometry,address_components,"
+                      "rating,user_ratings_total,price_level,types,reviews"
         }
         
-        response = requests.get(base_url, params=params)
-        data = response.json()
+        status_code, data = self.client.get("place/details/json", params)
         
-        if response.status_code != 200 or "error_message" in data:
+        if status_code != 200 or "error_message" in data:
             error_msg = data.get("error_message", "Unknown error")
             print(f"Error getting details for place {place_id}: {error_msg}")
             return {}
         
         return data.get("result", {})
     
-    def collect_restaurants(self, cities: Optional[List[str]] = None, zipcodes: Optional[List[str]] = None) -> None:
+    def collect_restaurants(self, cities: Optional[List[str]] = None, zipcodes: Optional[List[str]] = None,
+                            force: bool = False, mode: str = "zipcode", refetch_details: bool = False) -> None:
         """
         Collect restaurant data by cities or zipcodes
         
         Args:
             cities: List of city names to collect data for
             zipcodes: List of specific zip codes to collect data for
+            force: Discard the progress of an interrupted run instead of resuming it
+            refetch_details: Fetch details again for every place found, even ones
+                             already in the dataset and not yet stale
+            mode: "zipcode" to text search each zip code, or "grid" to tile the area
+                  with nearby searches (the whole state when no cities or zip codes are given)
         """
+        if mode not in ("zipcode", "grid"):
+            raise ValueError(f"Unknown collection mode: {mode}")
+        
         all_restaurants = []
         
+        if force:
+            print("Discarding saved collection progress")
+            if os.path.exists(self.ledger_path):
+                os.remove(self.ledger_path)
+            if self.checkpoint.exists():
+                os.remove(self.checkpoint.path)
+        
+        self.ledger = CollectionLedger(self.ledger_path)
+        
+        # Resume from the checkpoint of an interrupted run, if any
+        self.checkpointed_ids = self.checkpoint.load_place_ids()
+        if self.checkpointed_ids:
+            print(f"Resuming from checkpoint with {len(self.checkpointed_ids)} restaurants already collected")
+        
+        # Seed the seen-set so places already in the dataset aren't fetched again until stale
+        self.seen_places = {} if refetch_details else self._load_seen_places()
+        now = time.time()
+        for place_id in self.checkpointed_ids:
+            self.seen_places[place_id] = now
+        self.skipped_details = 0
+        self.out_of_state = 0
+        self.statewide = mode == "grid" and not (cities or zipcodes)
+        
+        # Tile the whole state, or the areas of the requested zip codes, in grid mode
+        if mode == "grid":
+            selected = list(zipcodes or [])
+            for city in cities or []:
+                if city not in self.ohio_zipcodes:
+                    print(f"City {city} not found in Ohio zip codes list")
+                    continue
+                selected.extend(self.ohio_zipcodes[city])
+            
+            if selected:
+                print(f"Collecting restaurant data by grid for zip codes: {', '.join(selected)}")
+                regions = [b for b in (self._geocode_bounds(z) for z in dict.fromkeys(selected)) if b]
+            else:
+                print("Collecting restaurant data by grid for all of Ohio")
+                regions = [OHIO_BOUNDS]
+            
+            self._process_grid(regions, all_restaurants)
         # Process by zipcodes if provided
-        if zipcodes:
+        elif zipcodes:
             print(f"Collecting restaurant data for specific zipcodes: {', '.join(zipcodes)}")
-            # Find city for each zipcode if possible
-            zipcode_to_city = {}
-            for city, city_zipcodes in self.ohio_zipcodes.items():
-                for zipcode in city_zipcodes:
-                    zipcode_to_city[zipcode] = city
-            
-            self._process_zipcodes(zipcodes, None, all_restaurants, zipcode_to_city)
+            self._process_zipcodes(zipcodes, None, all_restaurants, self.zipcode_to_city)
         # Otherwise process by cities
         else:
             cities_to_process = cities if cities else list(self.ohio_zipcodes.keys())
             print(f"Collecting restaurant data for cities: {', '.join(cities_to_process)}")
             
+            # Gather the zip codes of every city so they share one worker pool
+            city_zipcodes = []
+            zipcode_to_city = {}
             for city in cities_to_process:
                 if city not in self.ohio_zipcodes:
                     print(f"City {city} not found in Ohio zip codes list")
                     continue
                     
                 print(f"Collecting restaurants for {city}...")
-                zipcodes = self.ohio_zipcodes[city]
-                
-                # Process each zipcode in this city
-                self._process_zipcodes(zipcodes, city, all_restaurants)
+                for zipcode in self.ohio_zipcodes[city]:
+                    if zipcode not in zipcode_to_city:
+                        zipcode_to_city[zipcode] = city
+                        city_zipcodes.append(zipcode)
+            
+            self._process_zipcodes(city_zipcodes, None, all_restaurants, zipcode_to_city)
         
         print(f"Collected data for {len(all_restaurants)} restaurants")
+        print(f"Skipped {self.skipped_details} details lookups for places already collected")
+        if self.out_of_state:
+            print(f"Dropped {self.out_of_state} places outside Ohio")
+        self.client.report()
+        if self.client.cache.mode == "record":
+            self.client.cache.evict()
+        
+        # Merge the checkpoint into the canonical dataset once, at the end of the run
+        self.checkpoint.compact(self.restaurants_path)
+        
+        # Progress is no longer needed once every zip code is in the dataset
+        self.ledger.clear_if_complete()
+        print("Run 'python app.py --process' next to process this data for LLM recommendations")
     
     # Compatibility methods that use the new unified collect_restaurants method
-    def collect_all_restaurants(self, cities: Optional[List[str]] = None) -> None:
+    def collect_all_restaurants(self, cities: Optional[List[str]] = None, force: bool = False,
+                                mode: str = "zipcode", refetch_details: bool = False) -> None:
         """Collect restaurant data for all Ohio zip codes or specified cities"""
-        self.collect_restaurants(cities=cities)
+        self.collect_restaurants(cities=cities, force=force, mode=mode, refetch_details=refetch_details)
     
-    def collect_by_zipcodes(self, zipcodes: List[str]) -> None:
+    def collect_by_zipcodes(self, zipcodes: List[str], force: bool = False, mode: str = "zipcode",
+                            refetch_details: bool = False) -> None:
         """Collect restaurant data for specific zip codes"""
-        self.collect_restaurants(zipcodes=zipcodes)
+        self.collect_restaurants(zipcodes=zipcodes, force=force, mode=mode, refetch_details=refetch_details)
     
     def _process_zipcodes(self, zipcodes: List[str], default_city: Optional[str] = None, 
                           all_restaurants: Optional[List[Dict[str, Any]]] = None,
@@ -163,6 +394,10 @@ class GooglePlacesCollector:
         """
         Helper method to process a list of zipcodes and collect restaurant data
         
+        Zip codes are searched concurrently by a pool of workers, and the details
+        lookups for every place found are fanned out over a shared details pool.
+        All requests go through the shared rate limiter.
+        
         Args:
             zipcodes: List of zip codes to process
             default_city: Default city name to assign (used when collecting by city)
@@ -171,97 +406,381 @@ class GooglePlacesCollector:
         """
         if all_restaurants is None:
             all_restaurants = []
+        
+        with ThreadPoolExecutor(max_workers=self.details_workers) as details_pool, \
+             ThreadPoolExecutor(max_workers=self.max_workers) as search_pool:
+            futures = {}
+            for zipcode in zipcodes:
+                # Determine city for this zipcode
+                city = default_city
+                if city is None and zipcode_to_city and zipcode in zipcode_to_city:
+                    city = zipcode_to_city[zipcode]
+                elif city is None:
+                    city = "unknown"  # Fallback if we can't determine the city
+                
+                future = search_pool.submit(self._process_zipcode, zipcode, city, details_pool)
+                futures[future] = zipcode
             
-        for zipcode in zipcodes:
-            print(f"Processing zip code: {zipcode}")
-            restaurants = self._search_restaurants_by_zipcode(zipcode)
+            # Results are checkpointed by the workers; gather them as each zip code finishes
+            for future in as_completed(futures):
+                zipcode = futures[future]
+                try:
+                    restaurants = future.result()
+                except Exception as e:
+                    print(f"Error processing zip code {zipcode}: {e}")
+                    continue
+                
+                all_restaurants.extend(restaurants)
+    
+    def _process_zipcode(self, zipcode: str, city: str,
+                         details_pool: ThreadPoolExecutor) -> List[Dict[str, Any]]:
+        """
+        Search a single zip code and fetch details for every place found
+        
+        Work recorded in the progress ledger is skipped, so an in-progress
+        zip code restarts from where it stopped.
+        
+        Args:
+            zipcode: Zip code to search
+            city: City name to assign to the restaurants found
+            details_pool: Executor used to fan out the place details lookups
             
-            # Determine city for this zipcode
-            city = default_city
-            if city is None and zipcode_to_city and zipcode in zipcode_to_city:
-                city = zipcode_to_city[zipcode]
-            elif city is None:
-                city = "unknown"  # Fallback if we can't determine the city
+        Returns:
+            List of place details for the restaurants in this zip code
+        """
+        if self.ledger.is_complete(zipcode):
+            print(f"Skipping zip code {zipcode}: already collected")
+            return []
+        
+        print(f"Processing zip code: {zipcode}")
+        place_ids = self._search_restaurants_by_zipcode(zipcode)
+        return self._collect_details(zipcode, place_ids, details_pool, city=city, zipcode=zipcode)
+    
+    def _collect_details(self, key: str, place_ids: List[str], details_pool: ThreadPoolExecutor,
+                         city: Optional[str] = None, zipcode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch and checkpoint details for the places found by one search
+        
+        Args:
+            key: Ledger key of the zip code or grid cell the places were found in
+            place_ids: Place IDs returned by the search
+            details_pool: Executor used to fan out the place details lookups
+            city: City to assign; looked up from the place's address when None,
+                  and places outside Ohio are dropped
+            zipcode: Zip code to assign; taken from the place's address when None
             
-            # Get detailed information for each restaurant
-            for restaurant in restaurants:
-                place_id = restaurant.get("place_id")
-                if place_id:
-                    details = self._get_place_details(place_id)
-                    if details:
-                        # Add city and zip code info
-                        details["city"] = city
-                        details["zipcode"] = zipcode
-                        all_restaurants.append(details)
+        Returns:
+            List of place details fetched
+        """
+        # Get detailed information for each restaurant in parallel, skipping places
+        # already detailed for this search or already collected from any other one
+        detailed = self.ledger.get(key)["detailed"]
+        pending = [
+            place_id for place_id in dict.fromkeys(place_ids)
+            if place_id not in detailed and self._claim_place(place_id)
+        ]
+        
+        results = []
+        batch = []
+        dropped = []
+        futures = {details_pool.submit(self._get_place_details, place_id): place_id for place_id in pending}
+        for future in as_completed(futures):
+            place_id = futures[future]
+            try:
+                details = future.result()
+            except Exception as e:
+                print(f"Error getting details for place {place_id}: {e}")
+                details = None
+            if not details:
+                # Let another search (or the next run) fetch the place again
+                self._release_place(place_id)
+                continue
             
-            # Save intermediate results in case of failures
-            self._save_restaurants(all_restaurants)
+            # Add city and zip code info
+            place_city, place_zipcode, place_state = self._locate_place(details)
+            if city is None and not self._in_ohio(place_state, place_zipcode):
+                dropped.append(place_id)
+                continue
+            details["city"] = city or place_city
+            details["zipcode"] = zipcode or place_zipcode
+            results.append(details)
+            batch.append(details)
             
-            # Respect API rate limits
-            time.sleep(2)
+            # Checkpoint details in batches so an interruption loses little work
+            if len(batch) >= DETAILS_CHECKPOINT_BATCH:
+                self._save_restaurants(key, batch)
+                batch = []
+        
+        self._save_restaurants(key, batch)
+        
+        # Dropped places are done with too, so a resumed run doesn't fetch them again
+        if dropped:
+            self.ledger.record_detailed(key, dropped)
+            with self._save_lock:
+                self.out_of_state += len(dropped)
+        
+        if self.ledger.get(key)["search_complete"] and len(results) + len(dropped) == len(pending):
+            self.ledger.record_complete(key)
+        
+        return results
     
-    def _save_restaurants(self, restaurants: List[Dict[str, Any]]) -> None:
+    def _locate_place(self, details: Dict[str, Any]) -> Tuple[str, str, str]:
         """
-        Save restaurant data to JSON file
-        Formats data to include only essential fields needed for recommendations
+        Get the city, zip code and state of a place from its address components
+        The city comes from the Ohio zip code list when the zip code is in it
         """
-        output_path = os.path.join(DATA_DIR, "restaurants.json")
+        zipcode = ""
+        locality = ""
+        state = ""
+        for component in details.get("address_components", []):
+            types = component.get("types", [])
+            if "postal_code" in types:
+                zipcode = component.get("short_name", "")
+            elif "locality" in types:
+                locality = component.get("long_name", "").lower()
+            elif "administrative_area_level_1" in types:
+                state = component.get("short_name", "")
         
-        # First, load existing restaurants to avoid duplicates when appending new data
-        existing_restaurants = []
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-            try:
-                with open(output_path, 'r', encoding='utf-8') as f:
-                    existing_restaurants = json.load(f)
-                print(f"Loaded {len(existing_restaurants)} existing restaurants")
-            except json.JSONDecodeError:
-                print("Warning: Existing restaurant data file is corrupted. Starting with empty dataset.")
+        city = self.zipcode_to_city.get(zipcode) or locality or "unknown"
+        return city, zipcode, state
+    
+    def _in_ohio(self, state: str, zipcode: str) -> bool:
+        """
+        Check that a place found by a grid search belongs in the dataset
+        Statewide runs also require its zip code to be in the Ohio zip code list
+        """
+        if state != "OH":
+            return False
+        return not self.statewide or zipcode in self.zipcode_to_city
+    
+    def _process_grid(self, regions: List[Tuple[float, float, float, float]],
+                      all_restaurants: List[Dict[str, Any]]) -> None:
+        """
+        Collect restaurants by adaptive spatial tiling
         
-        # Track existing place_ids to avoid duplicates
-        existing_place_ids = {r.get("place_id") for r in existing_restaurants}
+        Each region is divided into cells that are searched with nearby searches.
+        A cell whose search hits the Places result cap is split into four
+        quadrants, so dense areas are covered fully while sparse areas need
+        only one search per cell.
         
-        # Convert to a consistent structure with only the fields we need
-        formatted_restaurants = existing_restaurants.copy()
-        new_count = 0
+        Args:
+            regions: Bounding boxes as (south, west, north, east)
+            all_restaurants: List to append restaurant data to
+        """
+        cells = []
+        for region in regions:
+            cells.extend(c for c in self._initial_cells(region) if c not in cells)
+        print(f"Searching {len(cells)} initial grid cells")
         
-        for restaurant in restaurants:
-            place_id = restaurant.get("place_id", "")
+        with ThreadPoolExecutor(max_workers=self.details_workers) as details_pool, \
+             ThreadPoolExecutor(max_workers=self.max_workers) as search_pool:
+            pending = {search_pool.submit(self._process_cell, cell, details_pool): cell for cell in cells}
+            cell_count = len(cells)
             
-            # Skip if this restaurant is already in our dataset
-            if place_id in existing_place_ids:
-                continue
-                
-            existing_place_ids.add(place_id)
-            new_count += 1
+            # Split cells are scheduled as soon as their parent finishes
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    cell = pending.pop(future)
+                    try:
+                        restaurants, children = future.result()
+                    except Exception as e:
+                        print(f"Error processing cell {self._cell_key(cell)}: {e}")
+                        continue
+                    
+                    all_restaurants.extend(restaurants)
+                    for child in children:
+                        pending[search_pool.submit(self._process_cell, child, details_pool)] = child
+                    cell_count += len(children)
+        
+        print(f"Searched {cell_count} grid cells")
+    
+    def _process_cell(self, cell: Tuple[float, float, float, float],
+                      details_pool: ThreadPoolExecutor) -> Tuple[List[Dict[str, Any]], List[Tuple[float, float, float, float]]]:
+        """
+        Search a single grid cell and fetch details for every place found
+        
+        Returns:
+            Tuple of (place details fetched, child cells to search if the cell was saturated)
+        """
+        key = self._cell_key(cell)
+        if self.ledger.is_complete(key):
+            results = []
+        else:
+            place_ids = self._search_restaurants_in_cell(cell)
+            results = self._collect_details(key, place_ids, details_pool)
+        
+        south, west, north, east = cell
+        progress = self.ledger.get(key)
+        if not progress["saturated"] or min(north - south, east - west) / 2 < GRID_MIN_CELL_DEG:
+            return results, []
+        
+        mid_lat = (south + north) / 2
+        mid_lng = (west + east) / 2
+        children = [
+            (south, west, mid_lat, mid_lng),
+            (south, mid_lng, mid_lat, east),
+            (mid_lat, west, north, mid_lng),
+            (mid_lat, mid_lng, north, east)
+        ]
+        return results, children
+    
+    @staticmethod
+    def _initial_cells(region: Tuple[float, float, float, float]) -> List[Tuple[float, float, float, float]]:
+        """
+        Cover a bounding box with cells aligned to a fixed grid of GRID_INITIAL_CELL_DEG
+        Aligning to a global grid lets overlapping regions share cells
+        """
+        south, west, north, east = region
+        size = GRID_INITIAL_CELL_DEG
+        cells = []
+        row = math.floor(south / size)
+        while row * size < north:
+            col = math.floor(west / size)
+            while col * size < east:
+                cells.append((round(row * size, 6), round(col * size, 6),
+                              round((row + 1) * size, 6), round((col + 1) * size, 6)))
+                col += 1
+            row += 1
+        return cells
+    
+    @staticmethod
+    def _cell_key(cell: Tuple[float, float, float, float]) -> str:
+        """Ledger key of a grid cell"""
+        return "cell:" + ",".join(f"{value:.6f}" for value in cell)
+    
+    def _geocode_bounds(self, zipcode: str) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Get the bounding box of a zip code using the Geocoding API
+        
+        Returns:
+            Bounds as (south, west, north, east), or None if the zip code wasn't found
+        """
+        params = {"components": f"postal_code:{zipcode}|country:US"}
+        status_code, data = self.client.get("geocode/json", params)
+        results = data.get("results", [])
+        
+        if status_code != 200 or not results:
+            error_msg = data.get("error_message", data.get("status", "Unknown error"))
+            print(f"Error geocoding zip code {zipcode}: {error_msg}")
+            return None
+        
+        geometry = results[0].get("geometry", {})
+        box = geometry.get("bounds") or geometry.get("viewport")
+        if not box:
+            return None
+        
+        return (box["southwest"]["lat"], box["southwest"]["lng"],
+                box["northeast"]["lat"], box["northeast"]["lng"])
+    
+    def _load_seen_places(self) -> Dict[str, float]:
+        """
+        Load the place_ids in the existing dataset with the time each was fetched
+        Records collected before fetch times were stored use the dataset's modification time
+        """
+        if not os.path.exists(self.restaurants_path) or os.path.getsize(self.restaurants_path) == 0:
+            return {}
+        
+        try:
+            with open(self.restaurants_path, 'r', encoding='utf-8') as f:
+                restaurants = json.load(f)
+        except json.JSONDecodeError:
+            print("Warning: Existing restaurant data file is corrupted. Not skipping any places.")
+            return {}
+        
+        default_fetched_at = os.path.getmtime(self.restaurants_path)
+        return {
+            r["place_id"]: r.get("fetched_at") or default_fetched_at
+            for r in restaurants if r.get("place_id")
+        }
+    
+    def _claim_place(self, place_id: str) -> bool:
+        """
+        Check the global seen-set before a details request goes out
+        
+        Returns:
+            True if the place is new or stale and should be fetched, False if it
+            was already collected within the staleness window or claimed by another worker
+        """
+        max_age = self.stale_after_days * 86400
+        with self._seen_lock:
+            fetched_at = self.seen_places.get(place_id)
+            now = time.time()
+            if fetched_at is not None and now - fetched_at < max_age:
+                self.skipped_details += 1
+                return False
             
-            # Extract only the essential fields we need
-            formatted = {
-                "place_id": place_id,
-                "name": restaurant.get("name", ""),
-                "address": restaurant.get("formatted_address", ""),
-                "city": restaurant.get("city", ""),
-                "zipcode": restaurant.get("zipcode", ""),
-                "rating": restaurant.get("rating", 0),
-                "user_ratings_total": restaurant.get("user_ratings_total", 0),
-                "price_level": restaurant.get("price_level", 0),
-                "types": restaurant.get("types", []),
-                "reviews": []
-            }
+            # Mark the place as fetched now so concurrent zip codes don't request it too
+            self.seen_places[place_id] = now
+            return True
+    
+    def _release_place(self, place_id: str) -> None:
+        """
+        Undo the claim of a place whose details request failed
+        Claims only succeed for new or stale places, so forgetting it lets the next search fetch it
+        """
+        with self._seen_lock:
+            self.seen_places.pop(place_id, None)
+    
+    def _save_restaurants(self, zipcode: str, restaurants: List[Dict[str, Any]]) -> None:
+        """
+        Append newly collected restaurants to the checkpoint
+        Only records not already checkpointed are written, and the saved
+        place_ids are marked as detailed in the progress ledger
+        """
+        if not restaurants:
+            return
+        
+        with self._save_lock:
+            new_records = []
             
-            # Add reviews if available - only keep author_name, rating, and text
-            if "reviews" in restaurant:
-                for review in restaurant["reviews"]:
-                    formatted["reviews"].append({
-                        "author_name": review.get("author_name", ""),
-                        "rating": review.get("rating", 0),
-                        "text": review.get("text", ""),
-                        "time": review.get("time", 0)
-                    })
+            for restaurant in restaurants:
+                place_id = restaurant.get("place_id", "")
+                
+                # Skip if this restaurant is already in the checkpoint
+                if place_id in self.checkpointed_ids:
+                    continue
+                
+                self.checkpointed_ids.add(place_id)
+                new_records.append(self._format_restaurant(restaurant))
             
-            formatted_restaurants.append(formatted)
+            self.checkpoint.append(new_records)
+            print(f"Checkpointed {len(new_records)} new restaurants ({len(self.checkpointed_ids)} total)")
+        
+        # The checkpoint is durable before the ledger marks the places as done
+        self.ledger.record_detailed(zipcode, [r.get("place_id") for r in restaurants])
+    
+    @staticmethod
+    def _format_restaurant(restaurant: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert place details to a consistent structure
+        Keeps only the essential fields needed for recommendations
+        """
+        location = restaurant.get("geometry", {}).get("location", {})
+        formatted = {
+            "place_id": restaurant.get("place_id", ""),
+            "name": restaurant.get("name", ""),
+            "address": restaurant.get("formatted_address", ""),
+            "city": restaurant.get("city", ""),
+            "zipcode": restaurant.get("zipcode", ""),
+            "lat": location.get("lat", 0),
+            "lng": location.get("lng", 0),
+            "rating": restaurant.get("rating", 0),
+            "user_ratings_total": restaurant.get("user_ratings_total", 0),
+            "price_level": restaurant.get("price_level", 0),
+            "types": restaurant.get("types", []),
+            "fetched_at": int(time.time()),
+            "reviews": []
+        }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(formatted_restaurants, f, ensure_ascii=False, indent=2)
+        # Add reviews if available - only keep author_name, rating, and text
+        if "reviews" in restaurant:
+            for review in restaurant["reviews"]:
+                formatted["reviews"].append({
+                    "author_name": review.get("author_name", ""),
+                    "rating": review.get("rating", 0),
+                    "text": review.get("text", ""),
+                    "time": review.get("time", 0)
+                })
         
-        print(f"Saved {len(formatted_restaurants)} restaurants to {output_path} ({new_count} new)")
-        print("Run 'python app.py --process' next to process this data for LLM recommendations")
\ No newline at end of file
+        return formatted
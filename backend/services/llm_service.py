@@ -1,12 +1,46 @@
 import os
+import copy
 import json
+import time
+import asyncio
+import weakref
+import threading
+from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import google.generativeai as genai
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Iterator
 import sys
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import DATA_DIR
+from config import (
+    DATA_DIR, LLM_MAX_CONTEXT_RESTAURANTS, LLM_RETRIEVAL_TOP_K, LLM_RETRIEVAL_FILTER_OVERFETCH,
+    LLM_PROMPT_TOKEN_BUDGET, LLM_REVIEW_MAX_CHARS,
+    LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS, LLM_CACHE_SIMILARITY, LLM_CACHE_PATH,
+    LLM_MODEL_NAME, LLM_MAX_CONCURRENCY, LLM_TIMEOUT_SECONDS,
+    LLM_BATCH_QUERIES_PER_PROMPT, LLM_BATCH_PROMPT_TOKEN_BUDGET,
+    LLM_SIMILAR_TOP_K, SIMILAR_ANSWER_LOCALLY
+)
+from utils.restaurant import Restaurant
+from utils.search_index import SearchIndex
+from utils.json_stream import JSONStreamParser
+from services.catalog import RestaurantCatalog
+from services.catalog_manager import CatalogManager, CatalogState
+from services.response_cache import RecommendationCache, normalize_query
+
+# Rough characters per token for English text, used to estimate prompt size
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in a text"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Shorten text to at most max_chars, cutting at a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 3].rsplit(" ", 1)[0].rstrip(" ,.;:")
+    return cut + "..."
 
 class LLMService:
     """
@@ -25,20 +59,71 @@ class LLMService:
         if not self.api_key:
             raise ValueError("Google Gemini API key not provided and not found in environment variables")
         
-        # Configure the Google Generative AI library
+        # Configure the Google Generative AI library and create the model client
+        # once; it is shared by every request
         genai.configure(api_key=self.api_key)
+        self.model = genai.GenerativeModel(LLM_MODEL_NAME)
+        
+        # Runs the blocking Gemini calls of the sync path, so they can be timed out;
+        # the SDK version we pin takes no per-request timeout. A timed-out call
+        # can't be stopped and keeps its thread until Gemini answers, so each call
+        # holds a slot until it really ends, and there is one thread per slot
+        self._sync_calls = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="gemini")
+        self._sync_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
         
-        # Load the restaurant data
+        # Bounds the Gemini calls in flight on the async path
+        self.max_concurrency = LLM_MAX_CONCURRENCY
+        self._llm_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+        
+        # Answer "similar to X" queries from the similarity index instead of the LLM
+        self.answer_similar_locally = SIMILAR_ANSWER_LOCALLY
+        
+        # Load the restaurant data; the catalog manager swaps in new versions on reload
         self.restaurants_path = os.path.join(DATA_DIR, "restaurants.json")
-        self.restaurants = self._load_restaurants()
-    
-    def _load_restaurants(self) -> List[Dict[str, Any]]:
-        """Load restaurant data from JSON file."""
-        if not os.path.exists(self.restaurants_path):
-            raise FileNotFoundError(f"Restaurant data not found at {self.restaurants_path}")
+        self.search_index_path = os.path.join(DATA_DIR, "search_index.json")
+        self.catalog_manager = CatalogManager(self.restaurants_path, self.search_index_path)
         
-        with open(self.restaurants_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # Responses are cached per dataset version, so a reload never serves stale results
+        self.response_cache = RecommendationCache(
+            max_entries=LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=LLM_CACHE_TTL_SECONDS,
+            similarity=LLM_CACHE_SIMILARITY,
+            path=LLM_CACHE_PATH
+        )
+    
+    @property
+    def llm_slots(self) -> asyncio.Semaphore:
+        """Semaphore bounding the Gemini calls in flight, one per event loop"""
+        loop = asyncio.get_running_loop()
+        slots = self._llm_slots.get(loop)
+        if slots is None:
+            slots = self._llm_slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        return slots
+    
+    @property
+    def restaurants(self) -> List[Restaurant]:
+        """Restaurants of the current dataset version"""
+        return self.catalog_manager.current.restaurants
+    
+    @property
+    def catalog(self) -> RestaurantCatalog:
+        """Catalog indexes of the current dataset version"""
+        return self.catalog_manager.current.catalog
+    
+    @property
+    def search_index(self) -> SearchIndex:
+        """Search index of the current dataset version"""
+        return self.catalog_manager.current.search_index
+    
+    @property
+    def prompt_fragments(self) -> Dict[str, Tuple[str, str]]:
+        """Prompt fragments cached for the current dataset version"""
+        return self.catalog_manager.current.prompt_fragments
+    
+    def reload(self) -> bool:
+        """Load the restaurant data and its indexes again; see CatalogManager.reload."""
+        return self.catalog_manager.reload()
     
     def get_recommendations(self, user_query: str, 
                            num_results: int = 3, 
@@ -56,91 +141,605 @@ class LLMService:
         Returns:
             Dict containing recommendations and query analysis.
         """
-        # Filter restaurants by city and price level if provided
-        filtered_restaurants = self.restaurants
+        # Take the current dataset version once, so a reload mid-request can't mix versions
+        state = self.catalog_manager.current
+        cache_args = (user_query, city, price_level, num_results, state.version)
+        anchor, ready = self._ready_response(state, cache_args)
+        if ready is not None:
+            return ready
+        
+        prompt, metadata = self._prepare_prompt(state, user_query, num_results, city, price_level, anchor)
         
-        if city:
-            city = city.lower()
-            filtered_restaurants = [r for r in filtered_restaurants if r.get("city", "").lower() == city]
+        # Generate recommendations using Gemini
+        start = time.perf_counter()
+        response = self._generate_recommendations(prompt)
+        return self._finish_response(response, metadata, cache_args, time.perf_counter() - start)
+    
+    async def get_recommendations_async(self, user_query: str, 
+                                        num_results: int = 3, 
+                                        city: Optional[str] = None,
+                                        price_level: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Get restaurant recommendations without blocking the event loop.
         
-        if price_level:
-            filtered_restaurants = [r for r in filtered_restaurants if r.get("price_level", 0) in price_level]
+        At most LLM_MAX_CONCURRENCY Gemini calls run at once; the others wait
+        for a slot. Raises asyncio.TimeoutError when the wait and the call take
+        longer than LLM_TIMEOUT_SECONDS. Retrieval, prompt building and cache
+        writes run in worker threads, so they don't hold up other requests.
         
-        # Prepare the context for the LLM prompt
-        context = self._prepare_context(filtered_restaurants, user_query)
+        Args:
+            user_query: Natural language query from the user.
+            num_results: Number of restaurant recommendations to return.
+            city: Optional city filter.
+            price_level: Optional price level filter (list of integers 1-4).
+            
+        Returns:
+            Dict containing recommendations and query analysis.
+        """
+        state = self.catalog_manager.current
+        cache_args = (user_query, city, price_level, num_results, state.version)
+        anchor, ready = await asyncio.to_thread(self._ready_response, state, cache_args)
+        if ready is not None:
+            return ready
         
-        # Generate recommendations using Gemini
-        response = self._generate_recommendations(context, user_query, num_results)
+        prompt, metadata = await asyncio.to_thread(self._prepare_prompt, state, user_query, num_results,
+                                                   city, price_level, anchor)
         
-        return response
+        start = time.perf_counter()
+        response = await asyncio.wait_for(self._generate_recommendations_async(prompt), LLM_TIMEOUT_SECONDS)
+        return await asyncio.to_thread(self._finish_response, response, metadata, cache_args,
+                                       time.perf_counter() - start)
     
-    def _prepare_context(self, restaurants: List[Dict[str, Any]], 
-                        user_query: str) -> str:
+    async def stream_recommendations(self, user_query: str, 
+                                     num_results: int = 3, 
+                                     city: Optional[str] = None,
+                                     price_level: Optional[List[int]] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
         """
-        Prepare the context for the LLM prompt.
+        Stream restaurant recommendations while Gemini generates them.
+        
+        Yields ("query_analysis", {...}) first, then one ("recommendation", {...})
+        as soon as each recommendation is complete in the model output, and
+        finally ("done", metadata). An unusable response yields ("error", {...})
+        before "done". Cached and locally answered responses are replayed the same way. Concurrency
+        and the timeout are limited as in get_recommendations_async.
         
         Args:
-            restaurants: List of restaurant data.
             user_query: Natural language query from the user.
+            num_results: Number of restaurant recommendations to return.
+            city: Optional city filter.
+            price_level: Optional price level filter (list of integers 1-4).
+        """
+        state = self.catalog_manager.current
+        cache_args = (user_query, city, price_level, num_results, state.version)
+        anchor, ready = await asyncio.to_thread(self._ready_response, state, cache_args)
+        if ready is not None:
+            for event in self._response_events(ready):
+                yield event
+            return
+        
+        prompt, metadata = await asyncio.to_thread(self._prepare_prompt, state, user_query, num_results,
+                                                   city, price_level, anchor)
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LLM_TIMEOUT_SECONDS
+        start = time.perf_counter()
+        parser = JSONStreamParser()
+        response = {"query_analysis": None, "recommendations": []}
+        prompt_token_count = None
+        
+        await asyncio.wait_for(self.llm_slots.acquire(), LLM_TIMEOUT_SECONDS)
+        try:
+            stream = await asyncio.wait_for(
+                self.model.generate_content_async(prompt, stream=True),
+                deadline - loop.time()
+            )
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                
+                usage = getattr(chunk, "usage_metadata", None)
+                prompt_token_count = getattr(usage, "prompt_token_count", None) or prompt_token_count
+                
+                # Emit each part of the JSON document as soon as it is complete
+                for kind, key, value in parser.feed(chunk.text):
+                    if kind == "field" and key == "query_analysis":
+                        response["query_analysis"] = value
+                        yield "query_analysis", {"query_analysis": value}
+                    elif kind == "item" and key == "recommendations" and isinstance(value, dict):
+                        response["recommendations"].append(value)
+                        yield "recommendation", value
+        finally:
+            self.llm_slots.release()
+        
+        # Output that wasn't a plain JSON object is parsed as a whole instead
+        if not parser.done:
+            parsed = self._parse_response(parser.text)
+            if response["query_analysis"] is None:
+                response["query_analysis"] = parsed.get("query_analysis")
+                yield "query_analysis", {"query_analysis": response["query_analysis"]}
+            for recommendation in parsed.get("recommendations", [])[len(response["recommendations"]):]:
+                response["recommendations"].append(recommendation)
+                yield "recommendation", recommendation
+            if parsed.get("error"):
+                response["error"] = parsed["error"]
+                yield "error", {"error": parsed["error"]}
+        
+        if prompt_token_count:
+            metadata["llm_prompt_tokens"] = prompt_token_count
+        response = await asyncio.to_thread(self._finish_response, response, metadata, cache_args,
+                                           time.perf_counter() - start)
+        yield "done", response["metadata"]
+    
+    def _ready_response(self, state: CatalogState,
+                        cache_args: tuple) -> Tuple[Optional[Restaurant], Optional[Dict[str, Any]]]:
+        """
+        Get the restaurant a query names and the response to it, if it needs no LLM call.
+        
+        "Similar to X" queries can be answered from the similarity index alone,
+        and identical or near-identical queries are served from the cache. The
+        named restaurant is looked up once here and reused to build the prompt.
+        
+        Returns:
+            Tuple of (restaurant named in the query or None, response or None).
+        """
+        user_query, city, price_level, num_results, _ = cache_args
+        anchor = state.catalog.find_anchor(user_query)
+        local = self._similar_response(state, anchor, num_results, city, price_level)
+        if local is not None:
+            return anchor, local
+        return anchor, self.response_cache.get(*cache_args)
+    
+    @staticmethod
+    def _response_events(response: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream events for a complete response."""
+        yield "query_analysis", {"query_analysis": response.get("query_analysis")}
+        for recommendation in response.get("recommendations", []):
+            yield "recommendation", recommendation
+        if response.get("error"):
+            yield "error", {"error": response["error"]}
+        yield "done", response.get("metadata", {})
+    
+    def get_recommendations_batch(self, requests: List[Dict[str, Any]],
+                                  queries_per_prompt: int = LLM_BATCH_QUERIES_PER_PROMPT) -> Dict[str, Any]:
+        """
+        Get recommendations for many queries; see get_recommendations_batch_async.
+        
+        For scripts and offline jobs; it must not be called from a running event loop.
+        """
+        return asyncio.run(self.get_recommendations_batch_async(requests, queries_per_prompt))
+    
+    async def get_recommendations_batch_async(self, requests: List[Dict[str, Any]],
+                                              queries_per_prompt: int = LLM_BATCH_QUERIES_PER_PROMPT) -> Dict[str, Any]:
+        """
+        Get recommendations for many queries with as few Gemini calls as possible.
+        
+        Cached queries are answered from the cache (and "similar to X" queries
+        locally, when enabled) and repeated queries are asked once. The others are grouped by city, price levels and number of
+        results, and up to queries_per_prompt queries of a group share one
+        prompt: the candidates of all of them are interleaved into one context,
+        and the model answers each query separately. Prompts run concurrently, at most LLM_MAX_CONCURRENCY at a
+        time. Queries missing from a batch answer are retried on their own.
+        
+        Args:
+            requests: Dicts with a "query" and optional "num_results", "city" and "price_levels".
+            queries_per_prompt: Maximum number of queries sent in one prompt.
             
         Returns:
-            String context for the LLM prompt.
-        """
-        # Limit the number of restaurants to avoid token limits (adjust as needed)
-        max_restaurants = 100
-        if len(restaurants) > max_restaurants:
-            # Sort by rating and number of reviews to prioritize popular restaurants
-            restaurants = sorted(
-                restaurants, 
-                key=lambda r: (r.get("rating", 0) * min(r.get("user_ratings_total", 0), 500) / 500), 
-                reverse=True
-            )[:max_restaurants]
+            Dict with "results", one response per request in request order, and
+            "metadata" on the whole batch (queries per second included).
+        """
+        start = time.perf_counter()
+        state = self.catalog_manager.current
+        results, groups, duplicates, answered_locally = await asyncio.to_thread(self._plan_batch, state, requests)
+        cached_count = sum(1 for result in results if result is not None) - answered_locally
         
-        restaurant_profiles = []
-        for idx, restaurant in enumerate(restaurants):
-            name = restaurant.get("name", "N/A")
-            address = restaurant.get("address", "N/A")
-            rating = restaurant.get("rating", "N/A")
-            # Prefer price_display if available, otherwise price_level
-            price = restaurant.get("price_display") or restaurant.get("price_level", "N/A")
-            profile = restaurant.get("profile", "")
+        size = max(1, queries_per_prompt)
+        batches = [items[j:j + size] for items in groups.values() for j in range(0, len(items), size)]
+        calls = await asyncio.gather(*(self._run_batch(state, batch, results) for batch in batches))
+        for i, first in duplicates:
+            results[i] = copy.deepcopy(results[first])
+        
+        elapsed = time.perf_counter() - start
+        return {
+            "results": results,
+            "metadata": {
+                "queries": len(requests),
+                "cached": cached_count,
+                "answered_locally": answered_locally,
+                "prompts": len(batches),
+                "llm_calls": sum(calls),
+                "seconds": round(elapsed, 3),
+                "queries_per_second": round(len(requests) / elapsed, 1) if elapsed else None,
+                "dataset_version": state.version
+            }
+        }
+    
+    def _plan_batch(self, state: CatalogState, requests: List[Dict[str, Any]]) -> tuple:
+        """
+        Answer the batch queries that need no LLM call and group the others by filters.
+        
+        Returns:
+            The results so far, the groups of queries to ask, the (index, first
+            index) pairs of repeated queries, and the number answered locally.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        groups: Dict[tuple, List[Tuple[int, tuple, Optional[Restaurant]]]] = {}
+        first_asked: Dict[tuple, int] = {}
+        duplicates: List[Tuple[int, int]] = []
+        answered_locally = 0
+        for i, request in enumerate(requests):
+            city = request.get("city")
+            price_level = request.get("price_levels")
+            num_results = request.get("num_results", 3)
+            cache_args = (request["query"], city, price_level, num_results, state.version)
+            anchor = state.catalog.find_anchor(request["query"])
+            local = self._similar_response(state, anchor, num_results, city, price_level)
+            if local is not None:
+                results[i] = local
+                answered_locally += 1
+                continue
+            cached = self.response_cache.get(*cache_args)
+            if cached is not None:
+                results[i] = cached
+                continue
+            prices = tuple(sorted(set(price_level))) if price_level else None
+            group = ((city or "").lower(), prices, num_results)
+            
+            # A query repeated in the batch is only asked once
+            asked = (normalize_query(request["query"]), group)
+            if asked in first_asked:
+                duplicates.append((i, first_asked[asked]))
+                continue
+            first_asked[asked] = i
+            groups.setdefault(group, []).append((i, cache_args, anchor))
+        return results, groups, duplicates, answered_locally
+    
+    async def _run_batch(self, state: CatalogState, batch: List[Tuple[int, tuple, Optional[Restaurant]]],
+                         results: List[Optional[Dict[str, Any]]]) -> int:
+        """
+        Answer a group of queries sharing the same filters and store the responses in results.
+        
+        Returns:
+            Number of Gemini calls made.
+        """
+        _, city, price_level, num_results, _ = batch[0][1]
+        if len(batch) == 1:
+            pending = batch
+            calls = 0
+        else:
+            queries = [cache_args[0] for _, cache_args, _ in batch]
+            anchors = [anchor for _, _, anchor in batch]
+            prompt, metadata = await asyncio.to_thread(self._prepare_batch_prompt, state, queries, num_results,
+                                                       city, price_level, anchors)
+            metadata["batch_size"] = len(batch)
+            
+            start = time.perf_counter()
+            try:
+                response = await self._generate_recommendations_async(prompt, timeout=LLM_TIMEOUT_SECONDS)
+            except Exception as e:
+                for i, _, _ in batch:
+                    results[i] = self._error_response(e)
+                return 1
+            elapsed = time.perf_counter() - start
+            calls = 1
+            
+            # Fan the answers back out by query number
+            answers = {}
+            for answer in response.get("results") or []:
+                try:
+                    answers[int(answer.get("query"))] = answer
+                except (AttributeError, TypeError, ValueError):
+                    continue
+            
+            pending = []
+            for number, (i, cache_args, anchor) in enumerate(batch, 1):
+                answer = answers.get(number)
+                if not isinstance(answer.get("recommendations") if answer else None, list):
+                    pending.append((i, cache_args, anchor))
+                    continue
+                result = {
+                    "query_analysis": str(answer.get("query_analysis", "")),
+                    "recommendations": answer["recommendations"]
+                }
+                results[i] = await asyncio.to_thread(self._finish_response, result, dict(metadata), cache_args,
+                                                     elapsed / len(batch))
+        
+        # Queries answered on their own: single-query groups and those missing from the batch answer
+        for i, cache_args, anchor in pending:
+            user_query, city, price_level, num_results, _ = cache_args
+            prompt, metadata = await asyncio.to_thread(self._prepare_prompt, state, user_query, num_results,
+                                                       city, price_level, anchor)
+            start = time.perf_counter()
+            try:
+                response = await self._generate_recommendations_async(prompt, timeout=LLM_TIMEOUT_SECONDS)
+            except Exception as e:
+                results[i] = self._error_response(e)
+            else:
+                results[i] = await asyncio.to_thread(self._finish_response, response, metadata, cache_args,
+                                                     time.perf_counter() - start)
+            calls += 1
+        return calls
+    
+    @staticmethod
+    def _error_response(error: Exception) -> Dict[str, Any]:
+        """Response for a query that could not be answered."""
+        message = "Timed out waiting for recommendations" if isinstance(error, asyncio.TimeoutError) else str(error)
+        return {"query_analysis": "", "recommendations": [], "error": message}
+    
+    def _prepare_batch_prompt(self, state: CatalogState, queries: List[str], num_results: int,
+                              city: Optional[str], price_level: Optional[List[int]],
+                              anchors: List[Optional[Restaurant]]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build one prompt answering several queries that share the same filters.
+        
+        The candidates of each query are interleaved, so every query's best
+        candidates are packed before anyone's weaker ones. anchors holds the
+        restaurant each query names, if any.
+        
+        Returns:
+            Tuple of (prompt, metadata shared by the responses).
+        """
+        candidate_lists = [
+            self._retrieve_candidates(state, query, city, price_level, anchor)
+            for query, anchor in zip(queries, anchors)
+        ]
+        candidates = []
+        seen = set()
+        for group in zip_longest(*candidate_lists):
+            for restaurant in group:
+                if restaurant is not None and restaurant.place_id not in seen:
+                    seen.add(restaurant.place_id)
+                    candidates.append(restaurant)
+        
+        overhead = estimate_tokens(self._build_batch_prompt("", queries, num_results))
+        context, packed = self._prepare_context(candidates, "", LLM_BATCH_PROMPT_TOKEN_BUDGET - overhead, state)
+        prompt = self._build_batch_prompt(context, queries, num_results)
+        
+        metadata = {
+            "prompt_tokens": estimate_tokens(prompt),
+            "prompt_token_budget": LLM_BATCH_PROMPT_TOKEN_BUDGET,
+            "candidates": len(candidates),
+            "candidates_in_prompt": packed,
+            "dataset_version": state.version
+        }
+        return prompt, metadata
+    
+    def _retrieve_candidates(self, state: CatalogState, user_query: str, city: Optional[str],
+                             price_level: Optional[List[int]], anchor: Optional[Restaurant] = None) -> List[Restaurant]:
+        """
+        Get the prompt candidates for a query, best first.
+        
+        These are the restaurants most relevant to the query that pass the city
+        and price level filters. If nothing matches the query, they are the most
+        popular ones instead, limited to avoid token limits. With the anchor of
+        a query naming a restaurant ("similar to X but not X"), they are that
+        restaurant's nearest neighbours instead, without the restaurant or its
+        other branches.
+        """
+        if anchor is not None:
+            neighbours = state.catalog.similar(anchor.place_id, LLM_SIMILAR_TOP_K, city=city, price_levels=price_level)
+            if neighbours:
+                return [restaurant for restaurant, _ in neighbours]
+        
+        # Only the best matches are scored in full; filters need a few more to choose from
+        filtered = bool(city or price_level)
+        limit = LLM_RETRIEVAL_TOP_K * (LLM_RETRIEVAL_FILTER_OVERFETCH if filtered else 1)
+        matches = state.search_index.search(user_query, limit)
+        if matches:
+            candidates = state.catalog.top_k_relevant(matches, LLM_RETRIEVAL_TOP_K, city=city, price_levels=price_level)
+            if filtered and len(matches) == limit:
+                matched = {place_id for place_id, _ in matches}
+                if sum(1 for r in candidates if r.place_id in matched) < LLM_RETRIEVAL_TOP_K:
+                    # Too few of the best matches pass the filters; search all of them
+                    matches = state.search_index.search(user_query)
+                    candidates = state.catalog.top_k_relevant(matches, LLM_RETRIEVAL_TOP_K, city=city,
+                                                              price_levels=price_level)
+            return candidates
+        return state.catalog.top_k(LLM_MAX_CONTEXT_RESTAURANTS, city=city, price_levels=price_level)
+    
+    def _prepare_prompt(self, state: CatalogState, user_query: str, num_results: int, city: Optional[str],
+                        price_level: Optional[List[int]], anchor: Optional[Restaurant]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Retrieve the candidates for a query from a dataset version and build the prompt.
+        
+        anchor is the restaurant the query names (see RestaurantCatalog.find_anchor), if any.
+        
+        Returns:
+            Tuple of (prompt, response metadata describing it).
+        """
+        candidates = self._retrieve_candidates(state, user_query, city, price_level, anchor)
+        
+        # Pack the context into what is left of the token budget after the prompt itself
+        overhead = estimate_tokens(self._build_prompt("", user_query, num_results))
+        context, packed = self._prepare_context(candidates, user_query, LLM_PROMPT_TOKEN_BUDGET - overhead, state)
+        prompt = self._build_prompt(context, user_query, num_results)
+        
+        metadata = {
+            "prompt_tokens": estimate_tokens(prompt),
+            "prompt_token_budget": LLM_PROMPT_TOKEN_BUDGET,
+            "candidates": len(candidates),
+            "candidates_in_prompt": packed,
+            "dataset_version": state.version
+        }
+        if anchor is not None:
+            metadata["similar_to"] = {"place_id": anchor.place_id, "name": anchor.name}
+        return prompt, metadata
+    
+    def _similar_response(self, state: CatalogState, anchor: Optional[Restaurant], num_results: int,
+                          city: Optional[str], price_level: Optional[List[int]]) -> Optional[Dict[str, Any]]:
+        """
+        Answer a "similar to X" query from the similarity index, without an LLM call.
+        
+        Args:
+            anchor: The restaurant the query names, if any.
+        
+        Returns:
+            The response, or None when local answers are off, the query
+            names no restaurant or no neighbour passes the filters.
+        """
+        if not self.answer_similar_locally or anchor is None:
+            return None
+        
+        start = time.perf_counter()
+        neighbours = state.catalog.similar(anchor.place_id, num_results, city=city, price_levels=price_level)
+        if not neighbours:
+            return None
+        
+        recommendations = []
+        for restaurant, score in neighbours:
+            reasons = state.catalog.similarity_reasons(anchor, restaurant)
+            recommendations.append({
+                "place_id": restaurant.place_id,
+                "name": restaurant.name,
+                "address": restaurant.address,
+                "rating": f"{restaurant.rating}/5",
+                "price_level": restaurant.price_display or "Unknown",
+                "match_reasons": self._similarity_explanation(anchor, reasons),
+                "details": self._similarity_details(restaurant),
+                "similarity": round(score, 3)
+            })
+        
+        return {
+            "query_analysis": f"Restaurants similar to {anchor.name}, not including {anchor.name} itself.",
+            "recommendations": recommendations,
+            "metadata": {
+                "source": "similarity",
+                "similar_to": {"place_id": anchor.place_id, "name": anchor.name},
+                "seconds": round(time.perf_counter() - start, 6),
+                "dataset_version": state.version
+            }
+        }
+    
+    @staticmethod
+    def _similarity_explanation(anchor: Restaurant, reasons: Dict[str, Any]) -> str:
+        """Describe what a neighbour has in common with the restaurant it is similar to."""
+        parts = []
+        shared = list(dict.fromkeys(reasons["cuisines"] + reasons["names"] + reasons["dishes"]))
+        if shared:
+            parts.append(f"Like {anchor.name}, it is about {', '.join(shared)}.")
+        if reasons["descriptors"]:
+            descriptors = ", ".join(d.replace("_", " ") for d in reasons["descriptors"])
+            parts.append(f"Both are {descriptors}.")
+        anchor_price, price = reasons["price_levels"]
+        if anchor_price and price == anchor_price:
+            parts.append("Same price range.")
+        elif anchor_price and price:
+            parts.append("Cheaper." if price < anchor_price else "Pricier.")
+        if "distance_km" in reasons:
+            parts.append(f"{reasons['distance_km']} km away.")
+        return " ".join(parts)
+    
+    @staticmethod
+    def _similarity_details(restaurant: Restaurant) -> str:
+        """Cuisine, popular dishes and rating of a restaurant in one line."""
+        details = [f"Cuisine: {', '.join(restaurant.cuisine_types or []) or 'Unknown'}."]
+        if restaurant.popular_dishes:
+            details.append(f"Popular dishes include {', '.join(restaurant.popular_dishes[:3])}.")
+        details.append(f"Rated {restaurant.rating}/5 by {restaurant.user_ratings_total} reviewers.")
+        return " ".join(details)
+    
+    def _finish_response(self, response: Dict[str, Any], metadata: Dict[str, Any],
+                         cache_args: tuple, elapsed: float) -> Dict[str, Any]:
+        """Add the prompt metadata to a generated response and cache it."""
+        response.setdefault("metadata", {}).update(metadata)
+        self.response_cache.put(*cache_args, response, elapsed)
+        response["metadata"]["cache"] = {"status": "miss"}
+        return response
+    
+    def _render_fragment(self, restaurant: Restaurant, review_chars: int) -> str:
+        """
+        Format one restaurant for the prompt, without its "Restaurant {idx}:" line.
+        
+        Args:
+            restaurant: Restaurant to format.
+            review_chars: Maximum characters per review; 0 leaves reviews out.
+        """
+        # Prefer price_display if available, otherwise price_level
+        price = restaurant.price_display or restaurant.price_level
+        lines = [
+            f"Name: {restaurant.name}",
+            f"Address: {restaurant.address}",
+            f"Rating: {restaurant.rating}/5",
+            f"Price Level: {price}"
+        ]
+        if review_chars:
             # Include up to the first two reviews for context
-            reviews_list = restaurant.get("reviews", [])
-            review_texts = " | ".join([review.get("text", "") for review in reviews_list[:2]])
+            review_texts = " | ".join(truncate_text(review.text, review_chars) for review in restaurant.reviews[:2])
+            lines.append(f"Reviews: {review_texts}")
+        lines.append(f"Profile: {restaurant.profile or ''}")
+        return "\n".join(lines)
+    
+    def _prompt_fragments(self, restaurant: Restaurant, cache: Dict[str, Tuple[str, str]]) -> Tuple[str, str]:
+        """
+        Get a restaurant's prompt fragments, with and without reviews.
+        
+        Each restaurant is rendered the first time it is a candidate and then
+        served from the cache of its dataset version.
+        """
+        fragments = cache.get(restaurant.place_id)
+        if fragments is None:
+            fragments = (self._render_fragment(restaurant, LLM_REVIEW_MAX_CHARS), self._render_fragment(restaurant, 0))
+            cache[restaurant.place_id] = fragments
+        return fragments
+    
+    def _prepare_context(self, restaurants: List[Restaurant], 
+                        user_query: str,
+                        token_budget: int = LLM_PROMPT_TOKEN_BUDGET,
+                        state: Optional[CatalogState] = None) -> Tuple[str, int]:
+        """
+        Prepare the context for the LLM prompt within a token budget.
+        
+        Restaurants are packed in order, so the highest-ranked come first. Reviews
+        are truncated to LLM_REVIEW_MAX_CHARS; a restaurant that doesn't fit with
+        reviews is included without them, and packing stops at the first one that
+        doesn't fit either way. The top-ranked restaurant is always included, cut
+        down to the budget if need be. Only the "Restaurant {idx}:" lines are
+        formatted per request, the rest comes from the cached fragments.
+        
+        Args:
+            restaurants: Restaurants to include, best first.
+            user_query: Natural language query from the user.
+            token_budget: Maximum estimated tokens for the context.
+            state: Dataset version the restaurants come from (the current one by default).
             
-            profile_str = (
-                f"Restaurant {idx+1}:\n"
-                f"Name: {name}\n"
-                f"Address: {address}\n"
-                f"Rating: {rating}/5\n"
-                f"Price Level: {price}\n"
-                f"Reviews: {review_texts}\n"
-                f"Profile: {profile}"
-            )
-            restaurant_profiles.append(profile_str)
+        Returns:
+            Tuple of (context for the LLM prompt, number of restaurants included).
+        """
+        cache = (state or self.catalog_manager.current).prompt_fragments
+        restaurant_profiles = []
+        used = 0
+        for restaurant in restaurants:
+            header = f"Restaurant {len(restaurant_profiles) + 1}:\n"
+            # Count the blank line separating profiles
+            for fragment in self._prompt_fragments(restaurant, cache):
+                cost = -(-(len(header) + len(fragment)) // CHARS_PER_TOKEN) + 1
+                if used + cost <= token_budget:
+                    break
+            else:
+                if restaurant_profiles:
+                    break
+                fragment = truncate_text(fragment, max(3, (token_budget - 1) * CHARS_PER_TOKEN - len(header)))
+                cost = -(-(len(header) + len(fragment)) // CHARS_PER_TOKEN) + 1
+            
+            restaurant_profiles.append(header + fragment)
+            used += cost
         
         context = "\n\n".join(restaurant_profiles)
-        return context
+        return context, len(restaurant_profiles)
     
-    def _generate_recommendations(self, context: str, 
-                                user_query: str, 
-                                num_results: int = 3) -> Dict[str, Any]:
+    def _build_prompt(self, context: str, user_query: str, num_results: int = 3) -> str:
         """
-        Generate restaurant recommendations using Google Gemini.
+        Construct the recommendation prompt.
         
         Args:
             context: Restaurant data context.
             user_query: Natural language query from the user.
             num_results: Number of restaurant recommendations to return.
-            
-        Returns:
-            Dict containing recommendations and query analysis.
         """
-        # Load the model
-        model = genai.GenerativeModel('gemini-2.5-pro-exp-03-25')
-        
-        # Construct the improved prompt with updated expected output
-        prompt = f"""
+        return f"""
 You are a restaurant recommendation assistant.
 Your task is to recommend restaurants based on the user's query.
 Use only the restaurant information provided below. Do not make up any restaurants.
@@ -179,35 +778,166 @@ Format your response as a JSON object with the following structure:
 
 Ensure your response is valid JSON with all values as strings.
 """
+    
+    def _build_batch_prompt(self, context: str, queries: List[str], num_results: int = 3) -> str:
+        """
+        Construct a prompt answering several queries at once.
         
-        # Generate the response
-        response = model.generate_content(prompt)
+        Args:
+            context: Restaurant data context shared by the queries.
+            queries: Natural language queries, numbered from 1 in the prompt.
+            num_results: Number of restaurant recommendations per query.
+        """
+        numbered_queries = "\n".join(f'QUERY {number}: "{query}"' for number, query in enumerate(queries, 1))
+        return f"""
+You are a restaurant recommendation assistant.
+Your task is to recommend restaurants for each of several user queries, independently of each other.
+Use only the restaurant information provided below. Do not make up any restaurants.
+
+{numbered_queries}
+
+RESTAURANT DATABASE:
+{context}
+
+For each query, identify the top {num_results} most relevant restaurants.
+For each restaurant, provide:
+1. Restaurant name
+2. Address
+3. Rating (out of 5)
+4. Price level
+5. A brief explanation of why this restaurant is a good match for the query. Focus on the positive aspects and highlight what makes this restaurant appealing. Do not reference "the user's request" or "what the user wants" directly, just describe the restaurant's qualities.
+6. Key details about the restaurant (cuisine, popular dishes, etc.) written in a clear, concise format.
+
+Also provide a brief analysis of what each query is looking for.
+
+Format your response as a JSON object with one entry per query, in order, with the following structure:
+{{
+  "results": [
+    {{
+      "query": 1,
+      "query_analysis": "Brief analysis of what the query is looking for",
+      "recommendations": [
+        {{
+          "name": "Restaurant Name",
+          "address": "Restaurant Address",
+          "rating": "4.5/5",
+          "price_level": "$",
+          "match_reasons": "Why this restaurant matches the query.",
+          "details": "Cuisine: Italian. Known for house-made pasta. Popular dishes include Carbonara and Tiramisu."
+        }},
+        ...
+      ]
+    }},
+    ...
+  ]
+}}
+
+Ensure your response is valid JSON with all values as strings, except the query numbers.
+"""
+    
+    def _generate_recommendations(self, prompt: str) -> Dict[str, Any]:
+        """
+        Generate restaurant recommendations using Google Gemini.
+        
+        Args:
+            prompt: Complete recommendation prompt.
+            
+        Returns:
+            Dict containing recommendations and query analysis.
+            
+        A call that times out is cancelled if it has not started yet. Once
+        started it can't be stopped: it keeps its thread and its slot until
+        Gemini answers, so at most LLM_MAX_CONCURRENCY calls run at once and
+        new calls wait for a slot (within the same timeout) instead of piling up.
+        
+        Raises:
+            TimeoutError: Gemini did not answer within LLM_TIMEOUT_SECONDS.
+        """
+        deadline = time.monotonic() + LLM_TIMEOUT_SECONDS
+        if not self._sync_slots.acquire(timeout=LLM_TIMEOUT_SECONDS):
+            raise TimeoutError("No Gemini slot freed up within the timeout")
+        try:
+            call = self._sync_calls.submit(self.model.generate_content, prompt)
+        except BaseException:
+            self._sync_slots.release()
+            raise
+        call.add_done_callback(lambda _: self._sync_slots.release())
+        try:
+            result = call.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            call.cancel()
+            raise TimeoutError("Gemini did not answer within the timeout") from None
+        return self._read_response(result)
+    
+    async def _generate_recommendations_async(self, prompt: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Generate restaurant recommendations with Gemini's async API.
+        
+        Args:
+            prompt: Complete recommendation prompt.
+            timeout: Optional limit in seconds on the call, not counting the wait for a slot.
+            
+        Returns:
+            Dict containing recommendations and query analysis.
+        """
+        async with self.llm_slots:
+            call = self.model.generate_content_async(prompt)
+            response = await (asyncio.wait_for(call, timeout) if timeout else call)
+        return self._read_response(response)
+    
+    def _read_response(self, response: Any) -> Dict[str, Any]:
+        """
+        Parse a Gemini response, with its prompt token count when reported.
         
+        Args:
+            response: Response returned by the model.
+        """
         # Parse the JSON from the response
+        result = self._parse_response(response.text)
+        
+        # Report Gemini's own prompt token count when it is available
+        usage = getattr(response, "usage_metadata", None)
+        if getattr(usage, "prompt_token_count", None):
+            result.setdefault("metadata", {})["llm_prompt_tokens"] = usage.prompt_token_count
+        
+        return result
+    
+    @staticmethod
+    def _parse_response(text: str) -> Dict[str, Any]:
+        """
+        Parse the JSON recommendations from the LLM response text.
+        
+        Args:
+            text: Raw response text.
+            
+        Returns:
+            Dict containing recommendations and query analysis.
+        """
         try:
-            json_response = json.loads(response.text)
-            return json_response
+            json_response = json.loads(text)
+            if isinstance(json_response, dict):
+                return json_response
         except json.JSONDecodeError:
             # If the response isn't proper JSON, try to extract it from the text
             try:
                 import re
-                json_match = re.search(r'```json\s*(.*?)\s*```', response.text, re.DOTALL)
+                json_match = re.search(r'```json\s*(.*?)\s*```', text, re.DOTALL)
                 if json_match:
                     json_str = json_match.group(1)
                     return json.loads(json_str)
                 
-                json_match = re.search(r'({[\s\S]*})', response.text)
+                json_match = re.search(r'({[\s\S]*})', text)
                 if json_match:
                     json_str = json_match.group(1)
                     return json.loads(json_str)
             except (json.JSONDecodeError, AttributeError):
                 pass
-            
-            return {
-                "query_analysis": "Unable to analyze query properly",
-                "recommendations": [],
-                "error": "Failed to parse LLM response"
-            }
+        
+        return {
+            "query_analysis": "Unable to analyze query properly",
+            "recommendations": [],
+            "error": "Failed to parse LLM response"
+        }
     
     def get_restaurant_details(self, restaurant_id: str) -> Dict[str, Any]:
         """
@@ -219,8 +949,45 @@ Ensure your response is valid JSON with all values as strings.
         Returns:
             Full restaurant details.
         """
-        for restaurant in self.restaurants:
-            if restaurant.get("place_id") == restaurant_id:
-                return restaurant
+        restaurant = self.catalog.get(restaurant_id)
+        if restaurant is not None:
+            return restaurant.to_dict()
+        
+        return {"error": "Restaurant not found"}
+    
+    def get_similar_restaurants(self, restaurant_id: str, limit: int = 10, city: Optional[str] = None,
+                                price_level: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Get the restaurants most similar to one restaurant, without its other branches.
+        
+        Args:
+            restaurant_id: The place_id of the restaurant.
+            limit: Maximum number of restaurants to return.
+            city: Optional city filter.
+            price_level: Optional price level filter (list of integers 1-4).
+            
+        Returns:
+            Dict with the restaurant and its neighbours, most similar first,
+            each with a score and what they have in common.
+        """
+        catalog = self.catalog
+        anchor = catalog.get(restaurant_id)
+        if anchor is None:
+            return {"error": "Restaurant not found"}
         
-        return {"error": "Restaurant not found"}
\ No newline at end of file
+        return {
+            "restaurant": {"place_id": anchor.place_id, "name": anchor.name},
+            "results": [
+                {
+                    "place_id": restaurant.place_id,
+                    "name": restaurant.name,
+                    "address": restaurant.address,
+                    "city": restaurant.city,
+                    "rating": restaurant.rating,
+                    "price_level": restaurant.price_level,
+                    "score": round(score, 3),
+                    "reasons": catalog.similarity_reasons(anchor, restaurant)
+                }
+                for restaurant, score in catalog.similar(restaurant_id, limit, city=city, price_levels=price_level)
+            ]
+        }
\ No newline at end of file
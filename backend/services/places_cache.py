@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+# Parameters that don't change the response and must not end up on disk
+IGNORED_PARAMS = {"key"}
+
+CACHE_MODES = ("passthrough", "record", "replay")
+
+
+class PlacesResponseCache:
+    """
+    Content-addressed on-disk cache of Places API responses.
+
+    Responses are keyed by a hash of the endpoint and the normalized query
+    parameters (sorted, API key removed) and stored one JSON file each.
+
+    Modes:
+        passthrough: the cache is not used
+        record: serve cached responses when fresh, store every live response.
+                A cached page with a next_page_token is only served when the
+                pages after it are cached too: page tokens expire, so a live
+                request for the next page would fail with INVALID_REQUEST
+        replay: serve only from the cache and never touch the network; the
+                cache is read-only, so expired entries are still served and
+                nothing is evicted
+    """
+
+    def __init__(self, cache_dir: str, mode: str = "record", ttl_seconds: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        """
+        Args:
+            cache_dir: Directory holding the cached responses
+            mode: One of "passthrough", "record" or "replay"
+            ttl_seconds: Age after which cached responses are evicted (None keeps them forever)
+            max_bytes: Maximum total size of the cache; oldest entries are evicted first
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.mode == "record":
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.evict()
+
+    @staticmethod
+    def cache_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """Hash of the endpoint and the normalized request parameters"""
+        normalized = {k: str(v) for k, v in params.items() if k not in IGNORED_PARAMS}
+        payload = json.dumps([endpoint.strip("/"), normalized], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """Path of a cache entry, sharded by the first two hex digits"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Look up a cached response
+
+        Returns:
+            Tuple of (HTTP status code, decoded JSON body), or None on a miss
+        """
+        if self.mode == "passthrough":
+            return None
+
+        entry = self._load(endpoint, params)
+        if entry is not None and self.mode == "record" and not self._later_pages_cached(endpoint, entry["data"]):
+            # Fetch this page live instead, for a next_page_token that still works
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry["status_code"], entry["data"]
+
+    def _load(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Read a cache entry, or None if it is missing (or expired in record mode)"""
+        path = self._path(self.cache_key(endpoint, params))
+        try:
+            if (self.mode == "record" and self.ttl_seconds is not None
+                    and time.time() - os.path.getmtime(path) > self.ttl_seconds):
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _later_pages_cached(self, endpoint: str, data: Dict[str, Any]) -> bool:
+        """Check that every page after this one is cached, following the next_page_tokens"""
+        seen = set()
+        token = data.get("next_page_token")
+        while token:
+            if token in seen:
+                return True
+            seen.add(token)
+            entry = self._load(endpoint, {"pagetoken": token})
+            if entry is None:
+                return False
+            token = entry["data"].get("next_page_token")
+        return True
+
+    def put(self, endpoint: str, params: Dict[str, Any], status_code: int, data: Dict[str, Any]) -> None:
+        """Store a live response; only successful responses are recorded"""
+        if self.mode != "record" or status_code != 200 or data.get("status") not in ("OK", "ZERO_RESULTS"):
+            return
+
+        path = self._path(self.cache_key(endpoint, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"endpoint": endpoint, "status_code": status_code, "data": data}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then the oldest entries until the cache fits its size cap
+        Nothing is removed in replay mode
+
+        Returns:
+            Number of entries removed
+        """
+        if self.mode != "record":
+            return 0
+
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        now = time.time()
+        removed = 0
+        kept = []
+        for mtime, size, path in entries:
+            if self.ttl_seconds is not None and now - mtime > self.ttl_seconds:
+                os.remove(path)
+                removed += 1
+            else:
+                kept.append((mtime, size, path))
+
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in kept)
+            for mtime, size, path in sorted(kept):
+                if total <= self.max_bytes:
+                    break
+                os.remove(path)
+                total -= size
+                removed += 1
+
+        if removed:
+            print(f"Evicted {removed} cached Places responses")
+        return removed
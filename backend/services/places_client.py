@@ -0,0 +1,170 @@
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional, Tuple, Callable
+import os
+import sys
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    PLACES_API_BASE_URL, PLACES_API_TIMEOUT, PLACES_API_MAX_RETRIES,
+    PLACES_API_BACKOFF_BASE, PLACES_API_BACKOFF_MAX, PLACES_API_QPS
+)
+from utils.rate_limiter import TokenBucket
+from services.places_cache import PlacesResponseCache
+
+# HTTP status codes and Places API statuses that are worth retrying
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_API_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+
+
+class PlacesClient:
+    """
+    HTTP client for the Google Places API.
+
+    Uses one pooled keep-alive session shared by all worker threads, applies a
+    timeout to every request and retries throttled or failed requests with
+    exponential backoff and full jitter. Request latencies and retry counts are
+    tracked so they can be reported at the end of a run. An optional response
+    cache lets runs be recorded and replayed without the network.
+    """
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, qps: Optional[float] = None,
+                 pool_size: int = 10, timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, cache: Optional[PlacesResponseCache] = None,
+                 rng: Optional[random.Random] = None, sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            api_key: Google Places API key
+            base_url: Places API base URL (point it at a local stub server for offline runs)
+            qps: Maximum requests per second across all threads
+            pool_size: Number of keep-alive connections to keep open
+            timeout: Per-request timeout in seconds
+            max_retries: Number of retries for throttled or failed requests
+            cache: Optional response cache consulted before every request
+            rng: Random generator for the backoff jitter (seed it for reproducible delays)
+            sleep: Function used to wait between attempts
+        """
+        self.api_key = api_key
+        self.base_url = (base_url or PLACES_API_BASE_URL).rstrip("/")
+        self.timeout = timeout or PLACES_API_TIMEOUT
+        self.max_retries = PLACES_API_MAX_RETRIES if max_retries is None else max_retries
+        self.rate_limiter = TokenBucket(qps or PLACES_API_QPS)
+        self.cache = cache
+        self.rng = rng or random.Random()
+        self._sleep = sleep
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Run statistics
+        self._stats_lock = threading.Lock()
+        self.latencies = []
+        self.request_count = 0
+        self.retry_count = 0
+        self.failure_count = 0
+
+    def get(self, endpoint: str, params: Dict[str, Any], delay: float = 0) -> Tuple[int, Dict[str, Any]]:
+        """
+        Call a Places API endpoint, retrying throttled and failed requests
+
+        Args:
+            endpoint: Endpoint path relative to the base URL (e.g. "place/textsearch/json")
+            params: Query parameters, without the API key
+            delay: Seconds to wait before a live request (page tokens only become
+                   valid after a short delay); skipped when served from the cache
+
+        Returns:
+            Tuple of (HTTP status code, decoded JSON body). Requests that fail
+            at the network level are returned with status code 0.
+        """
+        if self.cache:
+            cached = self.cache.get(endpoint, params)
+            if cached:
+                return cached
+            if self.cache.mode == "replay":
+                return 0, {"status": "CACHE_MISS", "error_message": f"No cached response for {endpoint} in replay mode"}
+
+        if delay:
+            self._sleep(delay)
+
+        status_code, data = self._request(endpoint, params)
+        if self.cache:
+            self.cache.put(endpoint, params, status_code, data)
+        return status_code, data
+
+    def _request(self, endpoint: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Make a live request with retries"""
+        url = f"{self.base_url}/{endpoint}"
+        params = dict(params, key=self.api_key)
+
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                status_code = response.status_code
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = {"error_message": f"Invalid JSON response (HTTP {status_code})"}
+            except requests.RequestException as e:
+                status_code = 0
+                data = {"status": "REQUEST_FAILED", "error_message": str(e)}
+            latency = time.perf_counter() - start
+
+            retryable = (
+                status_code == 0
+                or status_code in RETRY_STATUS_CODES
+                or data.get("status") in RETRY_API_STATUSES
+            )
+
+            with self._stats_lock:
+                self.latencies.append(latency)
+                self.request_count += 1
+                if retryable and attempt < self.max_retries:
+                    self.retry_count += 1
+                elif retryable:
+                    self.failure_count += 1
+
+            if not retryable or attempt >= self.max_retries:
+                return status_code, data
+
+            # Exponential backoff with full jitter
+            delay = min(PLACES_API_BACKOFF_MAX, PLACES_API_BACKOFF_BASE * (2 ** attempt))
+            self._sleep(self.rng.uniform(0, delay))
+            attempt += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request count, retry count and latency percentiles (in milliseconds)"""
+        with self._stats_lock:
+            latencies = sorted(self.latencies)
+            stats = {
+                "requests": self.request_count,
+                "retries": self.retry_count,
+                "failures": self.failure_count
+            }
+
+        for label, pct in (("p50", 50), ("p90", 90), ("p99", 99)):
+            if latencies:
+                index = min(len(latencies) - 1, int(round(pct / 100 * (len(latencies) - 1))))
+                stats[f"{label}_ms"] = round(latencies[index] * 1000, 1)
+            else:
+                stats[f"{label}_ms"] = 0.0
+
+        return stats
+
+    def report(self) -> None:
+        """Print request statistics for the run"""
+        stats = self.get_stats()
+        print(f"Places API requests: {stats['requests']} "
+              f"({stats['retries']} retries, {stats['failures']} failed after retries)")
+        if self.cache and self.cache.mode != "passthrough":
+            print(f"Response cache ({self.cache.mode}): {self.cache.hits} hits, {self.cache.misses} misses")
+        print(f"Latency: p50 {stats['p50_ms']} ms, p90 {stats['p90_ms']} ms, p99 {stats['p99_ms']} ms")
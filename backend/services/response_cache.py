@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Iterable, Tuple
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.search_index import tokenize, TOKEN_REGEX
+
+# Words the search tokenizer drops that change what a query asks for
+NEGATIONS = {"not", "no", "without", "never", "isnt", "dont"}
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase the query and collapse whitespace"""
+    return " ".join(query.lower().split())
+
+
+def query_terms(query: str) -> frozenset:
+    """Search terms of a query, keeping negations so "spicy" and "not spicy" stay apart"""
+    words = set(TOKEN_REGEX.findall(query.lower().replace("'", "")))
+    return frozenset(tokenize(query)) | (NEGATIONS & words)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two term sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class RecommendationCache:
+    """
+    Response cache for LLM recommendations.
+
+    Entries are keyed by the normalized query, the city and price level
+    filters, the number of results and the dataset version, and kept in an
+    LRU with a TTL. A query with no exact entry can be served by a cached
+    query with the same filters whose search terms (stopwords removed,
+    plurals folded, negations kept) are similar enough, measured by Jaccard
+    similarity.
+
+    With a path, entries are also written to a SQLite database and loaded
+    back on startup, so the cache survives restarts.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: Optional[float] = None,
+                 similarity: Optional[float] = None, path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Maximum number of cached responses; least recently used are evicted first
+            ttl_seconds: Age after which a response is no longer served (None keeps them forever)
+            similarity: Minimum term similarity for a near-duplicate hit (None for exact matches only)
+            path: Optional SQLite database to persist the cache in
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.path = path
+        self._lock = threading.Lock()
+        # key -> (partition, terms, response JSON, created at, generation seconds)
+        self._entries: "OrderedDict[str, Tuple[str, frozenset, str, float, float]]" = OrderedDict()
+        # partition -> keys of its entries, for near-duplicate lookups
+        self._partitions: Dict[str, set] = {}
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        self._db = None
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, partition TEXT, query TEXT, "
+                "response TEXT, created REAL, seconds REAL)"
+            )
+            self._db.commit()
+            self._load()
+
+    @staticmethod
+    def partition_key(city: Optional[str], price_levels: Optional[Iterable[int]], num_results: int,
+                      version: str) -> str:
+        """Everything but the query that the response depends on"""
+        prices = sorted(set(price_levels)) if price_levels else None
+        return json.dumps([(city or "").lower() or None, prices, num_results, version])
+
+    @staticmethod
+    def cache_key(query: str, partition: str) -> str:
+        """Hash of the normalized query and its partition"""
+        return hashlib.sha256(f"{normalize_query(query)}\0{partition}".encode("utf-8")).hexdigest()
+
+    def _load(self) -> None:
+        """Load the unexpired persisted entries, most recent last"""
+        rows = self._db.execute(
+            "SELECT key, partition, query, response, created, seconds FROM responses ORDER BY created DESC LIMIT ?",
+            (self.max_entries,)
+        ).fetchall()
+        now = time.time()
+        for key, partition, query, response, created, seconds in reversed(rows):
+            if self._expired(created, now):
+                continue
+            self._store(key, partition, query, response, created, seconds)
+        self._db.execute("DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses "
+                         "ORDER BY created DESC LIMIT ?)", (self.max_entries,))
+        self._db.commit()
+        print(f"Loaded {len(self._entries)} cached recommendation responses")
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def _store(self, key: str, partition: str, query: str, response: str, created: float, seconds: float) -> None:
+        """Add an entry in memory, evicting the least recently used over the limit"""
+        self._remove(key)
+        self._entries[key] = (partition, query_terms(query), response, created, seconds)
+        self._partitions.setdefault(partition, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry from memory and from the database"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._partitions.get(entry[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._partitions[entry[0]]
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _similar_key(self, terms: frozenset, partition: str, now: float) -> Tuple[Optional[str], float]:
+        """Most similar unexpired entry of a partition, if it passes the threshold"""
+        best_key, best_score = None, 0.0
+        for key in self._partitions.get(partition, ()):
+            _, entry_terms, _, created, _ = self._entries[key]
+            if self._expired(created, now):
+                continue
+            score = jaccard(terms, entry_terms)
+            if score > best_score:
+                best_key, best_score = key, score
+        if best_key is None or best_score < self.similarity:
+            return None, best_score
+        return best_key, best_score
+
+    def get(self, query: str, city: Optional[str], price_levels: Optional[Iterable[int]], num_results: int,
+            version: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+
+        Returns:
+            The cached response with a "cache" entry in its metadata, or None on a miss
+        """
+        partition = self.partition_key(city, price_levels, num_results, version)
+        key = self.cache_key(query, partition)
+        now = time.time()
+
+        with self._lock:
+            status, similarity = "hit", 1.0
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[3], now):
+                self._remove(key)
+                if self._db is not None:
+                    self._db.commit()
+                entry = None
+
+            if entry is None and self.similarity is not None:
+                similar_key, similarity = self._similar_key(query_terms(query), partition, now)
+                if similar_key is not None:
+                    key, entry, status = similar_key, self._entries[similar_key], "similar"
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if status == "hit":
+                self.hits += 1
+            else:
+                self.similar_hits += 1
+            self.saved_seconds += entry[4]
+
+        response = json.loads(entry[2])
+        response.setdefault("metadata", {})["cache"] = {
+            "status": status,
+            "similarity": round(similarity, 3),
+            "saved_seconds": round(entry[4], 3)
+        }
+        return response
+
+    def put(self, query: str, city: Optional[str], price_levels: Optional[Iterable[int]], num_results: int,
+            version: str, response: Dict[str, Any], seconds: float) -> None:
+        """
+        Store a response; failed responses are not cached
+
+        Args:
+            seconds: Time it took to generate the response, counted as saved on each hit
+        """
+        if response.get("error"):
+            return
+
+        partition = self.partition_key(city, price_levels, num_results, version)
+        key = self.cache_key(query, partition)
+        query = normalize_query(query)
+        created = time.time()
+        payload = json.dumps(response, ensure_ascii=False)
+
+        with self._lock:
+            self._store(key, partition, query, payload, created, seconds)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, partition, query, response, created, seconds) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, partition, query, payload, created, seconds)
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock:
+            self._entries.clear()
+            self._partitions.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size, hit rate and the generation time saved by hits"""
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.similar_hits) / lookups, 3) if lookups else None,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "persistent": self._db is not None
+            }
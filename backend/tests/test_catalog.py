@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from utils.restaurant import Restaurant
+from services.catalog import RestaurantCatalog
+
+CITIES = ["Columbus", "columbus", "Dayton", "Akron", ""]
+
+
+def build_restaurants(count=300, seed=7):
+    rng = random.Random(seed)
+    return [
+        Restaurant.from_dict({
+            "place_id": f"p{i}",
+            "name": f"Place {i}",
+            "city": rng.choice(CITIES),
+            # Few distinct values, so popularity ties are common
+            "rating": rng.choice([3.5, 4.0, 4.5, 5.0]),
+            "user_ratings_total": rng.choice([0, 50, 500, 900]),
+            "price_level": rng.choice([0, 1, 2, 3, 4]),
+        })
+        for i in range(count)
+    ]
+
+
+def sorted_filter(restaurants, k, city=None, price_levels=None):
+    """The filter-then-sort that top_k replaced"""
+    matches = restaurants
+    if city:
+        matches = [r for r in matches if r.get("city", "").lower() == city.lower()]
+    if price_levels:
+        matches = [r for r in matches if r.get("price_level", 0) in price_levels]
+    if len(matches) > k:
+        matches = sorted(
+            matches,
+            key=lambda r: r.get("rating", 0) * min(r.get("user_ratings_total", 0), 500) / 500,
+            reverse=True
+        )[:k]
+    return matches
+
+
+@pytest.mark.parametrize("city", [None, "columbus", "DAYTON", "Toledo"])
+@pytest.mark.parametrize("price_levels", [None, [2], [1, 3], [4, 0, 2], [9]])
+@pytest.mark.parametrize("k", [1, 10, 100, 1000])
+def test_top_k_matches_the_sorted_filter(city, price_levels, k):
+    restaurants = build_restaurants()
+    catalog = RestaurantCatalog(restaurants)
+
+    expected = [r.place_id for r in sorted_filter(restaurants, k, city, price_levels)]
+    assert [r.place_id for r in catalog.top_k(k, city, price_levels)] == expected
+
+
+def test_top_k_relevant_puts_matches_first_then_fills_by_popularity():
+    restaurants = build_restaurants()
+    catalog = RestaurantCatalog(restaurants)
+    columbus = [r.place_id for r in catalog.top_k(len(restaurants), "columbus")]
+    matches = [(columbus[-1], 3.0), ("missing", 2.5), (columbus[-1], 2.0), (columbus[-2], 1.0)]
+
+    chosen = [r.place_id for r in catalog.top_k_relevant(matches, 5, city="Columbus")]
+    assert chosen[:2] == [columbus[-1], columbus[-2]]
+    popular = [r.place_id for r in sorted_filter(restaurants, 5, "columbus")]
+    assert chosen[2:] == [place_id for place_id in popular if place_id not in chosen[:2]][:3]
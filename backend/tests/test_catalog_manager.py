@@ -0,0 +1,44 @@
+import gc
+import json
+
+from utils.snapshot import write_snapshot, snapshot_path_for
+from utils.search_index import SearchIndex
+from services.catalog_manager import CatalogManager
+
+RESTAURANTS = [
+    {"place_id": "p1", "name": "Zundo Ramen", "city": "Columbus", "rating": 4.6, "user_ratings_total": 800,
+     "cuisine_types": ["Ramen"], "reviews": [{"author_name": "A", "rating": 5, "text": "Great broth", "time": 1}]},
+    {"place_id": "p2", "name": "Taco Time", "city": "Dayton", "rating": 4.1, "user_ratings_total": 90,
+     "cuisine_types": ["Tacos"], "reviews": []},
+]
+
+
+def write_dataset(tmp_path, restaurants):
+    path = tmp_path / "restaurants.json"
+    path.write_text(json.dumps(restaurants))
+    write_snapshot(restaurants, snapshot_path_for(str(path)))
+    # A saved index, so loading doesn't decode the reviews to build one
+    SearchIndex.build(restaurants).save(str(tmp_path / "search_index.json"))
+    return str(path)
+
+
+def test_snapshot_stays_mapped_while_a_restaurant_uses_it(tmp_path):
+    path = write_dataset(tmp_path, RESTAURANTS)
+    manager = CatalogManager(path, str(tmp_path / "search_index.json"))
+    mapping = manager.current.reader._mmap
+
+    # A request looks a restaurant up, then a reload swaps the version before it reads the record
+    restaurant = manager.current.catalog.get("p1")
+    write_dataset(tmp_path, RESTAURANTS[:1])
+    assert manager.reload()
+    gc.collect()
+
+    assert not mapping.closed
+    assert restaurant.to_dict()["reviews"][0]["text"] == "Great broth"
+
+    # The previous snapshot is unmapped once its last restaurant is gone
+    del restaurant
+    gc.collect()
+    assert mapping.closed
+    assert not manager.current.reader._mmap.closed
+    assert manager.current.catalog.get("p1").reviews[0].text == "Great broth"
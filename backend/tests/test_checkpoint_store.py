@@ -0,0 +1,32 @@
+import json
+
+from services.checkpoint_store import CheckpointStore
+
+
+def test_replay_skips_a_torn_final_line(tmp_path):
+    store = CheckpointStore(str(tmp_path / "restaurants.checkpoint.jsonl"))
+    assert not store.exists() and store.load_place_ids() == set()
+
+    store.append([{"place_id": "p1", "name": "A"}, {"place_id": "p2", "name": "B"}])
+    with open(store.path, "a", encoding="utf-8") as f:
+        f.write('{"place_id": "p3", "na')
+
+    assert store.exists()
+    assert store.load_place_ids() == {"p1", "p2"}
+
+
+def test_compact_merges_into_the_dataset_and_removes_the_checkpoint(tmp_path):
+    output = tmp_path / "restaurants.json"
+    output.write_text(json.dumps([{"place_id": "p1", "name": "Old"}, {"place_id": "p0", "name": "Kept"}]))
+    store = CheckpointStore(str(tmp_path / "restaurants.checkpoint.jsonl"))
+    store.append([{"place_id": "p2", "name": "New"}])
+    store.append([{"place_id": "p1", "name": "Refreshed"}])
+
+    assert store.compact(str(output)) == 1
+    # Refreshed records stay in place, new ones are appended
+    assert json.loads(output.read_text()) == [
+        {"place_id": "p1", "name": "Refreshed"},
+        {"place_id": "p0", "name": "Kept"},
+        {"place_id": "p2", "name": "New"},
+    ]
+    assert not store.exists()
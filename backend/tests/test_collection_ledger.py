@@ -0,0 +1,46 @@
+from services.collection_ledger import CollectionLedger
+
+
+def test_replay_rebuilds_the_progress_of_an_interrupted_run(tmp_path):
+    path = str(tmp_path / "collection_ledger.jsonl")
+    ledger = CollectionLedger(path)
+    ledger.record_page("43201", None, ["p1", "p2"], "token-2")
+    ledger.record_page("43201", "token-2", ["p2", "p3"], None)
+    ledger.record_search_complete("43201", saturated=True)
+    ledger.record_detailed("43201", ["p1", "p3"])
+    ledger.record_page("43202", None, ["p9"], "token-x")
+    ledger.record_complete("43203")
+
+    # A torn final line from an interrupted write is skipped
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"zipcode": "43202", "ev')
+
+    replayed = CollectionLedger(path)
+    entry = replayed.get("43201")
+    assert entry["place_ids"] == ["p1", "p2", "p3"]
+    assert entry["page_tokens"] == [None, "token-2"]
+    assert entry["search_complete"] and entry["saturated"] and entry["next_page_token"] is None
+    assert entry["detailed"] == {"p1", "p3"} and not entry["complete"]
+    assert replayed.get("43202")["next_page_token"] == "token-x"
+    assert replayed.is_complete("43203") and not replayed.is_complete("43299")
+
+
+def test_reset_discards_search_progress(tmp_path):
+    path = str(tmp_path / "collection_ledger.jsonl")
+    ledger = CollectionLedger(path)
+    ledger.record_page("43201", None, ["p1"], "expired")
+    ledger.reset_search("43201")
+
+    assert CollectionLedger(path).get("43201") == CollectionLedger._new_entry()
+
+
+def test_ledger_is_cleared_only_once_everything_is_complete(tmp_path):
+    path = tmp_path / "collection_ledger.jsonl"
+    ledger = CollectionLedger(str(path))
+    ledger.record_complete("43201")
+    ledger.record_page("43202", None, ["p1"], None)
+
+    assert not ledger.clear_if_complete() and path.exists()
+    ledger.record_complete("43202")
+    assert ledger.clear_if_complete() and not path.exists()
+    assert ledger.state == {}
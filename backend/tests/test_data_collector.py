@@ -0,0 +1,189 @@
+import json
+import math
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from services import data_collector
+from services.collection_ledger import CollectionLedger
+
+
+def make_collector(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_collector, "GOOGLE_PLACES_API_KEY", "test-key")
+    (tmp_path / "ohio_zipcodes.json").write_text(json.dumps({"columbus": ["43201"]}))
+    collector = data_collector.GooglePlacesCollector(data_dir=str(tmp_path), cache_mode="passthrough")
+    collector.ledger = CollectionLedger(str(tmp_path / "collection_ledger.jsonl"))
+    return collector
+
+
+def test_failed_details_requests_release_their_claim(tmp_path, monkeypatch):
+    collector = make_collector(tmp_path, monkeypatch)
+    requested = []
+
+    def get_place_details(place_id):
+        requested.append(place_id)
+        if place_id == "broken":
+            raise ConnectionError("connection reset")
+        if place_id == "denied":
+            return {}
+        return {"place_id": place_id, "name": place_id.title()}
+
+    monkeypatch.setattr(collector, "_get_place_details", get_place_details)
+    place_ids = ["ok", "broken", "denied"]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = collector._collect_details("43201", place_ids, pool, city="columbus", zipcode="43201")
+        assert [r["place_id"] for r in results] == ["ok"]
+        assert set(collector.seen_places) == {"ok"}
+        assert not collector.ledger.is_complete("43201")
+
+        # Another search finding the same places retries only the failed ones
+        requested.clear()
+        collector._collect_details("43202", place_ids, pool, city="columbus", zipcode="43202")
+        assert sorted(requested) == ["broken", "denied"]
+
+
+class StubPlacesClient:
+    """Serves nearby searches and details for a fixed set of places, like the benchmark stub server"""
+
+    cache = types.SimpleNamespace(mode="passthrough")
+
+    def __init__(self, places):
+        # place_id -> (lat, lng, state, zip code)
+        self.places = places
+        self.requests = []
+        self.searches = []
+
+    def report(self):
+        pass
+
+    def get(self, endpoint, params, delay=0):
+        self.requests.append(endpoint)
+        if endpoint.endswith("geocode/json"):
+            south, west, north, east = CELL
+            return 200, {"status": "OK", "results": [{"geometry": {"bounds": {
+                "southwest": {"lat": south, "lng": west},
+                "northeast": {"lat": north, "lng": east}
+            }}}]}
+        if endpoint.endswith("nearbysearch/json"):
+            if "pagetoken" in params:
+                lat, lng, radius, page = params["pagetoken"].split(":")
+                page = int(page)
+            else:
+                lat, lng = params["location"].split(",")
+                radius, page = params["radius"], 0
+                self.searches.append(params["location"])
+            lat, lng, radius = float(lat), float(lng), float(radius)
+            matches = [
+                place_id for place_id, (p_lat, p_lng, _, _) in self.places.items()
+                if math.hypot((p_lat - lat) * 111320, (p_lng - lng) * 111320 * math.cos(math.radians(lat))) <= radius
+            ]
+            page_matches = matches[:60][page * 20:(page + 1) * 20]
+            body = {"status": "OK", "results": [
+                {"place_id": place_id, "geometry": {"location": {"lat": self.places[place_id][0],
+                                                                 "lng": self.places[place_id][1]}}}
+                for place_id in page_matches
+            ]}
+            if page < 2 and len(matches) > (page + 1) * 20:
+                body["next_page_token"] = f"{lat}:{lng}:{radius}:{page + 1}"
+            return 200, body
+        place_id = params["place_id"]
+        _, _, state, zipcode = self.places[place_id]
+        return 200, {"status": "OK", "result": {
+            "place_id": place_id,
+            "name": place_id,
+            "address_components": [
+                {"long_name": state, "short_name": state, "types": ["administrative_area_level_1", "political"]},
+                {"long_name": zipcode, "short_name": zipcode, "types": ["postal_code"]}
+            ]
+        }}
+
+
+def make_grid_collector(tmp_path, monkeypatch, places):
+    collector = make_collector(tmp_path, monkeypatch)
+    collector.client = StubPlacesClient(places)
+    monkeypatch.setattr(data_collector, "PLACES_PAGE_TOKEN_DELAY", 0)
+    return collector
+
+
+CELL = (40.0, -83.0, 40.2, -82.8)
+
+
+def test_grid_drops_places_outside_ohio(tmp_path, monkeypatch):
+    places = {
+        "columbus": (40.05, -82.95, "OH", "43201"),
+        "indiana": (40.06, -82.94, "IN", "47001"),
+        "unlisted": (40.07, -82.93, "OH", "45999"),
+    }
+    collector = make_grid_collector(tmp_path, monkeypatch, places)
+
+    collector.statewide = True
+    all_restaurants = []
+    collector._process_grid([CELL], all_restaurants)
+    assert [r["place_id"] for r in all_restaurants] == ["columbus"]
+    assert collector.out_of_state == 2
+    # Dropped places count as done, so the cell is complete and isn't searched again
+    assert collector.ledger.is_complete(collector._cell_key(CELL))
+
+    # Regions from a zip code list only require the state to be Ohio
+    (tmp_path / "zipcodes").mkdir()
+    collector = make_grid_collector(tmp_path / "zipcodes", monkeypatch, places)
+    collector.statewide = False
+    all_restaurants = []
+    collector._process_grid([CELL], all_restaurants)
+    assert sorted(r["place_id"] for r in all_restaurants) == ["columbus", "unlisted"]
+
+
+def test_saturated_cells_split_into_quadrants(tmp_path, monkeypatch):
+    # 70 places in a 0.01 degree block: more than one nearby search returns
+    places = {f"p{i}": (40.01 + (i // 10) * 0.001, -82.99 + (i % 10) * 0.001, "OH", "43201") for i in range(70)}
+    collector = make_grid_collector(tmp_path, monkeypatch, places)
+
+    all_restaurants = []
+    collector._process_grid([CELL], all_restaurants)
+    assert sorted(r["place_id"] for r in all_restaurants) == sorted(places)
+
+    # The first cell saturated, so each of its quadrants was searched
+    south, west, north, east = CELL
+    mid_lat, mid_lng = (south + north) / 2, (west + east) / 2
+    quadrant_centers = {f"{(s + n) / 2},{(w + e) / 2}" for s, w, n, e in [
+        (south, west, mid_lat, mid_lng), (south, mid_lng, mid_lat, east),
+        (mid_lat, west, north, mid_lng), (mid_lat, mid_lng, north, east)
+    ]}
+    assert quadrant_centers <= set(collector.client.searches)
+    assert len(collector.client.searches) > 5
+
+    # Resuming searches nothing: every cell, split ones included, is complete in the ledger
+    resumed = make_grid_collector(tmp_path, monkeypatch, places)
+    resumed.ledger = CollectionLedger(str(tmp_path / "collection_ledger.jsonl"))
+    all_restaurants = []
+    resumed._process_grid([CELL], all_restaurants)
+    assert resumed.client.requests == []
+
+
+def test_cells_at_the_minimum_size_do_not_split(tmp_path, monkeypatch):
+    size = data_collector.GRID_MIN_CELL_DEG * 1.5
+    cell = (40.0, -83.0, 40.0 + size, -83.0 + size)
+    places = {f"p{i}": (40.0 + size * (i // 10 + 0.5) / 8, -83.0 + size * (i % 10 + 0.5) / 10, "OH", "43201")
+              for i in range(70)}
+    collector = make_grid_collector(tmp_path, monkeypatch, places)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results, children = collector._process_cell(cell, pool)
+    assert collector.ledger.get(collector._cell_key(cell))["saturated"]
+    assert len(results) == 60
+    assert children == []
+
+
+def test_force_keeps_the_seen_set_and_refetch_details_clears_it(tmp_path, monkeypatch):
+    places = {"known": (40.05, -82.95, "OH", "43201"), "new": (40.06, -82.94, "OH", "43201")}
+    (tmp_path / "restaurants.json").write_text(json.dumps([{"place_id": "known", "fetched_at": time.time()}]))
+
+    def details_requested(refetch_details):
+        collector = make_grid_collector(tmp_path, monkeypatch, places)
+        collector.collect_restaurants(zipcodes=["43201"], force=True, mode="grid", refetch_details=refetch_details)
+        return collector.client.requests.count("place/details/json")
+
+    # --force redoes the searches but still skips places collected recently
+    assert details_requested(refetch_details=False) == 1
+    assert details_requested(refetch_details=True) == 2
@@ -0,0 +1,100 @@
+import json
+
+from utils import data_processor
+from utils.data_processor import DataProcessor
+
+REVIEW_TEXTS = [
+    "The Carbonara was amazing, cozy spot for a date",
+    "Cheap tacos and fast service, the Al Pastor is great",
+    "Authentic Pad Thai, open late on weekends",
+    "Overpriced and slow, the pizza was cold",
+]
+
+
+def synthetic_restaurants(count):
+    restaurants = []
+    for i in range(count):
+        restaurants.append({
+            "place_id": f"p{i}",
+            "name": f"Restaurant {i}",
+            "city": ["columbus", "dayton", "akron"][i % 3],
+            "rating": round(3 + (i % 20) / 10, 1),
+            "price_level": i % 5,
+            "types": ["restaurant", ["italian_restaurant", "mexican_restaurant", "thai_restaurant"][i % 3]],
+            "reviews": [
+                {"author_name": f"Author {j}", "rating": 1 + (i + j) % 5, "text": REVIEW_TEXTS[(i + j) % 4], "time": j}
+                for j in range(i % 4)
+            ]
+        })
+    # A duplicate of an earlier place is skipped
+    restaurants.append(dict(restaurants[3], name="Duplicate"))
+    return restaurants
+
+
+def make_processor(data_dir, monkeypatch):
+    data_dir.mkdir(exist_ok=True)
+    monkeypatch.setattr(data_processor, "DATA_DIR", str(data_dir))
+    return DataProcessor()
+
+
+def count_enrichments(monkeypatch):
+    """Record the name of every restaurant enriched from its reviews"""
+    enriched = []
+    create_profile = DataProcessor.create_restaurant_profile
+
+    def spy(self, restaurant):
+        enriched.append(restaurant["name"])
+        return create_profile(self, restaurant)
+
+    monkeypatch.setattr(DataProcessor, "create_restaurant_profile", spy)
+    return enriched
+
+
+def test_parallel_clean_matches_serial(tmp_path, monkeypatch):
+    source = tmp_path / "input.json"
+    source.write_text(json.dumps(synthetic_restaurants(23)))
+
+    serial = make_processor(tmp_path / "serial", monkeypatch)
+    serial.clean_data(workers=1, chunk_size=100, input_path=str(source))
+    parallel = make_processor(tmp_path / "parallel", monkeypatch)
+    parallel.clean_data(workers=3, chunk_size=2, input_path=str(source))
+
+    serial_records = (tmp_path / "serial" / "restaurants.json").read_text(encoding="utf-8")
+    assert (tmp_path / "parallel" / "restaurants.json").read_text(encoding="utf-8") == serial_records
+    assert [r["place_id"] for r in json.loads(serial_records)] == [f"p{i}" for i in range(23)]
+    for name in ("search_index.json", "name_index.json"):
+        assert (tmp_path / "parallel" / name).read_bytes() == (tmp_path / "serial" / name).read_bytes()
+
+
+def test_unchanged_records_are_reused(tmp_path, monkeypatch):
+    processor = make_processor(tmp_path, monkeypatch)
+    (tmp_path / "restaurants.json").write_text(json.dumps(synthetic_restaurants(8)))
+    processor.clean_data(workers=1)
+    first_run = (tmp_path / "restaurants.json").read_text(encoding="utf-8")
+
+    enriched = count_enrichments(monkeypatch)
+    processor.clean_data(workers=1)
+    assert enriched == []
+    assert (tmp_path / "restaurants.json").read_text(encoding="utf-8") == first_run
+
+
+def test_changed_records_and_version_bumps_are_re_enriched(tmp_path, monkeypatch):
+    processor = make_processor(tmp_path, monkeypatch)
+    (tmp_path / "restaurants.json").write_text(json.dumps(synthetic_restaurants(8)))
+    processor.clean_data(workers=1)
+
+    # A new review changes the content hash of that restaurant only
+    restaurants = json.loads((tmp_path / "restaurants.json").read_text(encoding="utf-8"))
+    old_hash = restaurants[2]["content_hash"]
+    restaurants[2]["reviews"].append({"author_name": "New", "rating": 5, "text": "Best Tiramisu ever", "time": 9})
+    (tmp_path / "restaurants.json").write_text(json.dumps(restaurants))
+    enriched = count_enrichments(monkeypatch)
+    processor.clean_data(workers=1)
+    assert enriched == ["Restaurant 2"]
+    assert json.loads((tmp_path / "restaurants.json").read_text())[2]["content_hash"] != old_hash
+
+    # A new extraction version re-enriches everything with reviews
+    enriched.clear()
+    monkeypatch.setattr(data_processor, "ENRICHMENT_VERSION", data_processor.ENRICHMENT_VERSION + 1)
+    make_processor(tmp_path, monkeypatch).clean_data(workers=1)
+    assert sorted(enriched) == sorted(r["name"] for r in restaurants if r["reviews"])
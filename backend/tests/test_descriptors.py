@@ -0,0 +1,50 @@
+import pytest
+
+from utils.data_processor import DataProcessor, DESCRIPTOR_PATTERNS
+
+# Texts the previous substring scan mislabelled, with the descriptors they should produce
+FALSE_POSITIVE_CASES = [
+    ("The chocolate cake was rich", []),
+    ("It was really good", []),
+    ("Updated menu, same great staff", []),
+    ("They have a kidney bean soup", []),
+    ("A true gem, truly", ["authentic"]),
+    ("Open late on weekends", ["late_night"]),
+    ("Our kids loved it", ["family_friendly"]),
+    ("Great for a date, very cozy", ["casual", "romantic"]),
+    ("Good value for money", ["affordable"]),
+    ("Grabbed take-out after work", ["takeout"]),
+]
+
+# Real matches both matchers must find
+MATCH_CASES = [
+    ("Cheap and fast, perfect for families", ["affordable", "family_friendly", "quick_service"]),
+    ("Pricey but elegant, fine dining at its best", ["expensive", "fancy"]),
+    ("Authentic homemade pasta", ["comfort_food", "authentic"]),
+    ("Great vegan options and delivery", ["takeout", "healthy"]),
+    ("Romantic ambiance, open 24 hours", ["late_night", "romantic"]),
+]
+
+
+def substring_scan(reviews):
+    """The matcher extract_descriptors replaced: one substring search per pattern"""
+    all_text = " ".join(review.get("text", "").lower() for review in reviews)
+    return [category for category, patterns in DESCRIPTOR_PATTERNS.items()
+            if any(pattern in all_text for pattern in patterns)]
+
+
+@pytest.mark.parametrize("text,expected", FALSE_POSITIVE_CASES)
+def test_false_positives_are_gone(text, expected):
+    assert DataProcessor().extract_descriptors([{"text": text}]) == expected
+
+
+@pytest.mark.parametrize("text,expected", MATCH_CASES)
+def test_real_matches_are_kept(text, expected):
+    reviews = [{"text": text}]
+    assert DataProcessor().extract_descriptors(reviews) == expected
+    assert substring_scan(reviews) == expected
+
+
+def test_reviews_are_matched_together_in_a_fixed_order():
+    reviews = [{"text": "Very cozy"}, {"text": "Good value"}, {}]
+    assert DataProcessor().extract_descriptors(reviews) == ["affordable", "casual", "romantic"]
@@ -0,0 +1,39 @@
+import json
+
+from utils.data_processor import DataProcessor
+from config import DATA_DIR
+
+REVIEWS = [
+    {"text": "Loved the Arancini and my cheese burger. Delicious! Dave was nice"},
+    {"text": "Arancini again, and a cheese burger for my son. Delicious. Dave is great"},
+    {"text": "The Arancini were cold, but the fish tacos are ok"},
+]
+
+SHIPPED_LEXICON = f"{DATA_DIR}/food_lexicon.json"
+
+
+def test_dishes_mentioned_more_than_once_are_kept():
+    # Without a lexicon any capitalized name can be a dish; common words and single mentions are left out
+    assert DataProcessor().extract_popular_dishes(REVIEWS) == ["Arancini", "Dave", "Cheese Burger"]
+
+
+def test_lexicon_is_opt_in_and_keeps_only_food_phrases(tmp_path):
+    assert DataProcessor().food_lexicon is None
+
+    processor = DataProcessor(food_lexicon_path=SHIPPED_LEXICON)
+    assert processor.extract_popular_dishes(REVIEWS) == ["Arancini", "Cheese Burger"]
+
+    # A different lexicon changes the content hash, so records are re-enriched
+    lexicon = tmp_path / "lexicon.json"
+    lexicon.write_text(json.dumps(["Burger"]))
+    custom = DataProcessor(food_lexicon_path=str(lexicon))
+    assert custom.extract_popular_dishes(REVIEWS) == ["Cheese Burger"]
+    record = {"name": "Zundo", "reviews": REVIEWS}
+    assert len({p.compute_content_hash(record) for p in (DataProcessor(), processor, custom)}) == 3
+
+
+def test_batch_matches_one_call_per_restaurant():
+    review_lists = [REVIEWS, REVIEWS[:1], [], REVIEWS[1:] * 2]
+    for processor in (DataProcessor(), DataProcessor(food_lexicon_path=SHIPPED_LEXICON)):
+        expected = [processor.extract_popular_dishes(reviews) for reviews in review_lists]
+        assert processor.extract_popular_dishes_batch(review_lists) == expected
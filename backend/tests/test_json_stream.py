@@ -0,0 +1,82 @@
+import json
+import random
+
+from utils.json_stream import JSONStreamParser
+
+DOCUMENT = {
+    "query_analysis": "Looking for {cheap} \"authentic\" ramen, not [too] spicy \\ at all",
+    "recommendations": [
+        {"name": "Zundo Ramen", "rating": "4.5/5", "details": "Bowls: {tonkotsu, shoyu}, \"spicy\" miso"},
+        {"name": "Ramen Kai", "tags": [["late", "night"], []], "nested": {"a": [1, 2, {"b": "]}"}]}},
+        {"name": "Sushi é Ramen", "rating": 4.2, "open": True, "note": None},
+    ],
+    "count": 3,
+}
+
+
+def feed_in_chunks(text, sizes):
+    parser = JSONStreamParser()
+    events = []
+    position = 0
+    for size in sizes:
+        events += parser.feed(text[position:position + size])
+        position += size
+    events += parser.feed(text[position:])
+    return parser, events
+
+
+def expected_events(document):
+    events = []
+    for key, value in document.items():
+        if isinstance(value, list):
+            events += [("item", key, item) for item in value]
+        events.append(("field", key, value))
+    return events
+
+
+def test_whole_document():
+    parser, events = feed_in_chunks(json.dumps(DOCUMENT), [])
+    assert parser.done
+    assert events == expected_events(DOCUMENT)
+
+
+def test_document_split_at_every_character():
+    text = json.dumps(DOCUMENT, indent=2)
+    parser, events = feed_in_chunks(text, [1] * len(text))
+    assert parser.done
+    assert events == expected_events(DOCUMENT)
+
+
+def test_random_chunk_boundaries():
+    rng = random.Random(0)
+    text = json.dumps(DOCUMENT)
+    for _ in range(200):
+        sizes = [rng.randint(1, 12) for _ in range(len(text))]
+        _, events = feed_in_chunks(text, sizes)
+        assert events == expected_events(DOCUMENT)
+
+
+def test_items_are_reported_before_the_document_ends():
+    text = json.dumps(DOCUMENT)
+    second = text.index('{"name": "Ramen Kai"')
+    parser = JSONStreamParser()
+    events = parser.feed(text[:second])
+    assert events == [
+        ("field", "query_analysis", DOCUMENT["query_analysis"]),
+        ("item", "recommendations", DOCUMENT["recommendations"][0]),
+    ]
+    assert not parser.done
+
+
+def test_code_fence_and_prose_preamble_are_skipped():
+    text = "Here are my picks:\n```json\n" + json.dumps(DOCUMENT) + "\n```\nEnjoy!"
+    parser, events = feed_in_chunks(text, [5] * len(text))
+    assert parser.done
+    assert events == expected_events(DOCUMENT)
+
+
+def test_incomplete_document_is_not_done():
+    text = json.dumps(DOCUMENT)
+    parser, _ = feed_in_chunks(text[:len(text) // 2], [7] * len(text))
+    assert not parser.done
+    assert parser.text == text[:len(text) // 2]
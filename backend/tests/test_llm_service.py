@@ -0,0 +1,231 @@
+import asyncio
+import json
+import re
+import threading
+import time
+import types
+
+import pytest
+
+from utils.snapshot import write_snapshot, snapshot_path_for
+from services import llm_service
+
+RESTAURANTS = [
+    {"place_id": "p1", "name": "Zundo Ramen", "city": "Columbus", "rating": 4.6, "user_ratings_total": 800,
+     "price_level": 2, "cuisine_types": ["Ramen"],
+     "reviews": [{"author_name": "A", "rating": 5, "text": "Great spicy ramen broth", "time": 1}]},
+    {"place_id": "p2", "name": "Taco Time", "city": "Dayton", "rating": 4.1, "user_ratings_total": 90,
+     "price_level": 1, "cuisine_types": ["Tacos"],
+     "reviews": [{"author_name": "B", "rating": 4, "text": "Cheap tacos, quick service", "time": 2}]},
+]
+
+
+class FakeModel:
+    """Stands in for the Gemini model: answers every prompt with one recommendation"""
+
+    def __init__(self, name=None):
+        self.prompts = []
+
+    def answer(self, prompt):
+        self.prompts.append(prompt)
+        text = json.dumps({"query_analysis": "q", "recommendations": [{"name": "Zundo Ramen"}]})
+        return types.SimpleNamespace(text=text, usage_metadata=None)
+
+    def generate_content(self, prompt):
+        return self.answer(prompt)
+
+    async def generate_content_async(self, prompt, stream=False):
+        return self.answer(prompt)
+
+
+def write_dataset(data_dir, restaurants):
+    path = data_dir / "restaurants.json"
+    path.write_text(json.dumps(restaurants))
+    write_snapshot(restaurants, snapshot_path_for(str(path)))
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    write_dataset(tmp_path, RESTAURANTS)
+    monkeypatch.setattr(llm_service, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(llm_service.genai, "GenerativeModel", FakeModel)
+    return llm_service.LLMService(api_key="test")
+
+
+def test_prompt_building_does_not_block_the_event_loop(service):
+    events = []
+    prepare_prompt = service._prepare_prompt
+
+    def slow_prepare_prompt(*args):
+        time.sleep(0.3)
+        events.append("prepared")
+        return prepare_prompt(*args)
+
+    service._prepare_prompt = slow_prepare_prompt
+
+    async def tick():
+        await asyncio.sleep(0.01)
+        events.append("tick")
+
+    async def main():
+        return await asyncio.gather(service.get_recommendations_async("spicy ramen"), tick())
+
+    response, _ = asyncio.run(main())
+    assert events == ["tick", "prepared"]
+    assert response["recommendations"][0]["name"] == "Zundo Ramen"
+
+
+def test_timed_out_sync_calls_hold_their_slot_until_they_end(service, monkeypatch):
+    monkeypatch.setattr(llm_service, "LLM_TIMEOUT_SECONDS", 0.1)
+    service._sync_slots = threading.BoundedSemaphore(1)
+    answered = threading.Event()
+    generate_content = service.model.generate_content
+
+    def stuck_generate_content(prompt):
+        answered.wait(5)
+        return generate_content(prompt)
+
+    service.model.generate_content = stuck_generate_content
+    with pytest.raises(TimeoutError):
+        service._generate_recommendations("first")
+    # The abandoned call still runs, so there is no slot for another one
+    with pytest.raises(TimeoutError):
+        service._generate_recommendations("second")
+
+    answered.set()
+    service.model.generate_content = generate_content
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            assert service._generate_recommendations("third")["recommendations"]
+            break
+        except TimeoutError:
+            continue
+    else:
+        pytest.fail("The slot of the abandoned call was never released")
+
+
+
+def long_restaurant(i, profile_words):
+    return {
+        "place_id": f"long{i}", "name": f"Noodle House {i}", "city": "Columbus", "rating": 4.0,
+        "user_ratings_total": 100 - i, "price_level": 2, "cuisine_types": ["Noodles"],
+        "profile": " ".join(["Hand pulled noodles in a rich broth."] * profile_words),
+        "reviews": [{"author_name": "C", "rating": 5, "text": "Noodles " * 80, "time": i}]
+    }
+
+
+def test_packed_prompt_stays_within_the_budget(service, tmp_path, monkeypatch):
+    write_dataset(tmp_path, [long_restaurant(i, profile_words=5) for i in range(30)])
+    assert service.reload()
+    monkeypatch.setattr(llm_service, "LLM_PROMPT_TOKEN_BUDGET", 1500)
+
+    prompt, metadata = service._prepare_prompt(service.catalog_manager.current, "noodles", 3, None, None, None)
+    assert llm_service.estimate_tokens(prompt) <= 1500
+    assert metadata["prompt_tokens"] <= metadata["prompt_token_budget"] == 1500
+    assert 0 < metadata["candidates_in_prompt"] < metadata["candidates"]
+
+
+def test_top_candidate_is_always_in_the_prompt(service, tmp_path, monkeypatch):
+    # The best match alone is larger than the whole budget
+    write_dataset(tmp_path, [long_restaurant(i, profile_words=400 if i == 0 else 5) for i in range(5)])
+    assert service.reload()
+
+    state = service.catalog_manager.current
+    context, packed = service._prepare_context(state.restaurants, "noodles", 1000, state)
+    assert packed == 1
+    assert context.startswith("Restaurant 1:\nName: Noodle House 0")
+    assert llm_service.estimate_tokens(context) + 1 <= 1000
+
+    # With room to spare, the smaller ones that fit follow it
+    context, packed = service._prepare_context(state.restaurants[1:] + state.restaurants[:1], "noodles", 1000, state)
+    assert packed == 4 and "Noodle House 0" not in context
+
+
+def test_prompt_fragments_are_dropped_on_reload(service, tmp_path):
+    prompt, _ = service._prepare_prompt(service.catalog_manager.current, "ramen", 3, None, None, None)
+    assert "Great spicy ramen broth" in prompt
+    assert "p1" in service.prompt_fragments
+
+    review = {"author_name": "A", "rating": 5, "text": "Ramen with a new miso broth", "time": 3}
+    changed = [dict(RESTAURANTS[0], reviews=[review], content_hash="changed")] + RESTAURANTS[1:]
+    write_dataset(tmp_path, changed)
+    assert service.reload()
+    assert service.prompt_fragments == {}
+
+    prompt, _ = service._prepare_prompt(service.catalog_manager.current, "ramen", 3, None, None, None)
+    assert "new miso broth" in prompt and "Great spicy ramen broth" not in prompt
+
+
+class FakeBatchModel(FakeModel):
+    """Answers each numbered query with a recommendation named after it; "malformed" gets a broken answer"""
+
+    def answer(self, prompt):
+        self.prompts.append(prompt)
+        queries = re.findall(r'^QUERY (\d+): "(.*)"$', prompt, re.MULTILINE)
+        if queries:
+            results = [
+                {"query": int(number), "query_analysis": query,
+                 "recommendations": "not a list" if query == "malformed" else [{"name": query}]}
+                for number, query in queries
+            ]
+            return types.SimpleNamespace(text=json.dumps({"results": results}), usage_metadata=None)
+        query = re.search(r'^USER QUERY: "(.*)"$', prompt, re.MULTILINE).group(1)
+        if query == "malformed":
+            raise ValueError("The model failed on this query")
+        text = json.dumps({"query_analysis": query, "recommendations": [{"name": query}]})
+        return types.SimpleNamespace(text=text, usage_metadata=None)
+
+
+def test_batch_queries_fan_out_and_back_in_order(service):
+    service.model = FakeBatchModel()
+    requests = [
+        {"query": "spicy ramen", "city": "Columbus"},
+        {"query": "cheap tacos", "city": "Dayton"},
+        {"query": "quiet brunch", "city": "columbus"},
+        {"query": "malformed", "city": "Columbus"},
+        {"query": "late pizza", "city": "Columbus"},
+        {"query": "Spicy  Ramen", "city": "Columbus"},
+        {"query": "craft beer", "city": "Dayton"},
+        {"query": "fresh sushi", "city": "Columbus", "price_levels": [2]},
+    ]
+
+    batch = asyncio.run(service.get_recommendations_batch_async(requests, queries_per_prompt=2))
+
+    # Results come back in request order, the repeated query included
+    results = batch["results"]
+    for request, result in zip(requests, results):
+        if request["query"] != "malformed":
+            assert result["recommendations"] == [{"name": " ".join(request["query"].lower().split())}]
+    assert results[5]["recommendations"] == results[0]["recommendations"]
+
+    # Queries with the same filters share prompts of at most two queries; the price filter is its own group
+    batch_prompts = [re.findall(r'^QUERY \d+: "(.*)"$', p, re.MULTILINE) for p in service.model.prompts]
+    batch_prompts = [queries for queries in batch_prompts if queries]
+    assert sorted(map(sorted, batch_prompts)) == [
+        ["cheap tacos", "craft beer"], ["late pizza", "malformed"], ["quiet brunch", "spicy ramen"]
+    ]
+
+    # The broken answer is retried on its own and fails only its own query
+    assert "The model failed" in results[3]["error"] and results[3]["recommendations"] == []
+    assert not any("error" in result for i, result in enumerate(results) if i != 3)
+    assert batch["metadata"]["prompts"] == 4
+    assert batch["metadata"]["llm_calls"] == 5
+
+
+def test_the_named_restaurant_is_looked_up_once_per_query(service, monkeypatch):
+    catalog = service.catalog_manager.current.catalog
+    lookups = []
+    find_anchor = catalog.find_anchor
+
+    def counting_find_anchor(query):
+        lookups.append(query)
+        return find_anchor(query)
+
+    monkeypatch.setattr(catalog, "find_anchor", counting_find_anchor)
+    service.answer_similar_locally = True
+
+    # No neighbour shares a feature with the anchor, so the query goes to the model
+    response = service.get_recommendations("something similar to Zundo Ramen but cheaper")
+    assert response["metadata"]["similar_to"]["place_id"] == "p1"
+    assert len(lookups) == 1
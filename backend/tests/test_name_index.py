@@ -0,0 +1,49 @@
+import threading
+
+from utils.name_index import NameIndex
+
+NAMES = ["Zundo Ramen", "Ramen Kai", "Hounddog's Pizza", "Domino's Pizza", "Dave's Hot Chicken"]
+
+
+def build_index():
+    return NameIndex(NAMES, [f"id-{i}" for i in range(len(NAMES))])
+
+
+def test_prefix_and_autocomplete():
+    index = build_index()
+    assert index.prefix("ram") == [0, 1]
+    assert index.prefix("pizz") == [2, 3]
+    assert index.autocomplete("ram", limit=2) == [1, 0]
+    assert index.search("id-4") == [4]
+
+
+def test_concurrent_first_lookups():
+    index = NameIndex([f"{name} {i}" for i in range(2000) for name in NAMES],
+                      [f"id-{i}" for i in range(2000 * len(NAMES))])
+    barrier = threading.Barrier(8)
+    results, errors = [], []
+
+    def lookup():
+        barrier.wait()
+        try:
+            results.append((len(index.prefix("ramen")), len(index.search("pizza"))))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert set(results) == {(4000, 4000)}
+
+
+def test_search_matches_a_scan_of_the_names():
+    names = [f"{name} {i}" for i in range(50) for name in NAMES] + ["", "Pizzeria Ramenesque"]
+    index = NameIndex(names, [f"id-{i}" for i in range(len(names))])
+    for query in ["ramen", "PIZZ", "s pizza 1", "hot chicken 4", "amen", "zz", "a", "", "no such name", "id-3"]:
+        expected = [i for i, name in enumerate(names) if query.lower() in name.lower()]
+        if query == "id-3":
+            expected = [3]
+        assert index.search(query) == expected, query
@@ -0,0 +1,73 @@
+import os
+
+from services.places_cache import PlacesResponseCache
+
+PARAMS = {"query": "restaurants in 43201", "key": "secret"}
+BODY = {"status": "OK", "results": [{"place_id": "p1"}]}
+
+
+def cache_files(cache_dir):
+    return sorted(os.path.join(root, name) for root, _, files in os.walk(cache_dir) for name in files)
+
+
+def age(cache_dir, seconds):
+    for path in cache_files(cache_dir):
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime - seconds, stat.st_mtime - seconds))
+
+
+def test_record_ignores_the_api_key_and_expires_entries(tmp_path):
+    cache = PlacesResponseCache(str(tmp_path), mode="record", ttl_seconds=60)
+    cache.put("textsearch/json", PARAMS, 200, BODY)
+    cache.put("textsearch/json", {"query": "denied"}, 200, {"status": "REQUEST_DENIED"})
+
+    assert cache.get("/textsearch/json", dict(PARAMS, key="other")) == (200, BODY)
+    assert "secret" not in open(cache_files(str(tmp_path))[0]).read()
+    assert cache.get("textsearch/json", {"query": "denied"}) is None
+
+    age(str(tmp_path), 120)
+    assert cache.get("textsearch/json", PARAMS) is None
+    assert cache_files(str(tmp_path)) == []
+
+
+def test_replay_never_modifies_the_cache(tmp_path):
+    PlacesResponseCache(str(tmp_path), mode="record").put("textsearch/json", PARAMS, 200, BODY)
+    age(str(tmp_path), 120)
+    files = cache_files(str(tmp_path))
+
+    cache = PlacesResponseCache(str(tmp_path), mode="replay", ttl_seconds=60, max_bytes=0)
+    assert cache.get("textsearch/json", PARAMS) == (200, BODY)
+    cache.put("textsearch/json", {"query": "new"}, 200, BODY)
+    assert cache.evict() == 0
+    assert cache_files(str(tmp_path)) == files
+
+    PlacesResponseCache(str(tmp_path / "missing"), mode="replay")
+    assert not (tmp_path / "missing").exists()
+
+
+def test_record_refetches_a_first_page_whose_later_pages_are_missing(tmp_path):
+    first = {"status": "OK", "results": [{"place_id": "p1"}], "next_page_token": "t2"}
+    second = {"status": "OK", "results": [{"place_id": "p2"}], "next_page_token": "t3"}
+    last = {"status": "OK", "results": [{"place_id": "p3"}]}
+    cache = PlacesResponseCache(str(tmp_path), mode="record")
+    cache.put("nearbysearch/json", PARAMS, 200, first)
+    cache.put("nearbysearch/json", {"pagetoken": "t2"}, 200, second)
+
+    # Page 3 was never recorded, so page 1's token chain would lead to a live request with an expired token
+    assert cache.get("nearbysearch/json", PARAMS) is None
+    assert cache.get("nearbysearch/json", {"pagetoken": "t2"}) is None
+
+    cache.put("nearbysearch/json", {"pagetoken": "t3"}, 200, last)
+    assert cache.get("nearbysearch/json", PARAMS) == (200, first)
+    assert cache.get("nearbysearch/json", {"pagetoken": "t2"}) == (200, second)
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    # An expired later page sends the search back to the network from page 1
+    path = cache._path(cache.cache_key("nearbysearch/json", {"pagetoken": "t3"}))
+    os.utime(path, (0, 0))
+    cache.ttl_seconds = 60
+    assert cache.get("nearbysearch/json", PARAMS) is None
+
+    # Replay serves whatever was recorded
+    replay = PlacesResponseCache(str(tmp_path), mode="replay")
+    assert replay.get("nearbysearch/json", PARAMS) == (200, first)
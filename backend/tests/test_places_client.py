@@ -0,0 +1,90 @@
+import random
+
+import requests
+
+from services import places_client
+from services.places_client import PlacesClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("No JSON object could be decoded")
+        return self.body
+
+
+class FakeSession:
+    """Answers requests from a script of (HTTP status, body) pairs; an exception is raised instead"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params))
+        answer = self.script.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return FakeResponse(*answer)
+
+
+def make_client(script, max_retries=5, seed=0):
+    sleeps = []
+    client = PlacesClient("test-key", base_url="http://stub", qps=1000, max_retries=max_retries,
+                          rng=random.Random(seed), sleep=sleeps.append)
+    client.session = FakeSession(script)
+    return client, sleeps
+
+
+def test_retries_server_errors_and_throttling():
+    client, sleeps = make_client([
+        (503, {}),
+        requests.ConnectionError("connection reset"),
+        (200, {"status": "OVER_QUERY_LIMIT"}),
+        (200, {"status": "OK", "results": []}),
+    ])
+
+    assert client.get("place/textsearch/json", {"query": "tacos"}) == (200, {"status": "OK", "results": []})
+    assert len(client.session.calls) == 4
+    assert len(sleeps) == 3
+    url, params = client.session.calls[0]
+    assert url == "http://stub/place/textsearch/json" and params == {"query": "tacos", "key": "test-key"}
+
+
+def test_does_not_retry_invalid_requests():
+    for answer in [(200, {"status": "INVALID_REQUEST"}), (400, {"error_message": "Bad request"}), (403, None)]:
+        client, sleeps = make_client([answer])
+        status_code, data = client.get("place/details/json", {"place_id": "p1"})
+        assert status_code == answer[0]
+        assert len(client.session.calls) == 1 and sleeps == []
+        assert client.get_stats()["retries"] == 0 and client.get_stats()["failures"] == 0
+
+
+def test_backoff_is_capped_with_seeded_jitter(monkeypatch):
+    monkeypatch.setattr(places_client, "PLACES_API_BACKOFF_BASE", 1)
+    monkeypatch.setattr(places_client, "PLACES_API_BACKOFF_MAX", 4)
+    client, sleeps = make_client([(500, {})] * 7, max_retries=6, seed=42)
+
+    assert client.get("place/details/json", {"place_id": "p1"})[0] == 500
+
+    # Full jitter over 1, 2, 4 seconds, then capped at 4
+    caps = [1, 2, 4, 4, 4, 4]
+    rng = random.Random(42)
+    assert sleeps == [rng.uniform(0, cap) for cap in caps]
+    assert all(0 <= delay <= cap for delay, cap in zip(sleeps, caps))
+
+
+def test_stats_count_requests_retries_and_failures():
+    client, _ = make_client([(500, {}), (200, {"status": "OK"}), (502, {}), (502, {}), (502, {})], max_retries=2)
+
+    client.get("place/details/json", {"place_id": "p1"})
+    client.get("place/details/json", {"place_id": "p2"})
+
+    stats = client.get_stats()
+    assert (stats["requests"], stats["retries"], stats["failures"]) == (5, 3, 1)
+    assert len(client.latencies) == 5
+    assert stats["p50_ms"] >= 0
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from utils.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """Clock that only moves when the bucket sleeps or the test advances it"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_bursts_up_to_capacity_without_waiting():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=5, clock=clock, sleep=clock.sleep)
+
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    # The sixth token has to be waited for: half a second at 2 tokens per second
+    bucket.acquire()
+    assert clock.sleeps == [0.5]
+
+
+def test_refills_at_the_configured_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4, capacity=4, clock=clock, sleep=clock.sleep)
+    for _ in range(4):
+        bucket.acquire()
+
+    # One second refills four tokens, and idle time never refills past capacity
+    clock.now += 1
+    for _ in range(4):
+        bucket.acquire()
+    assert clock.sleeps == []
+    clock.now += 60
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.sleeps == [0.25]
+
+    # Waiting callers are spaced out at the rate
+    clock.sleeps.clear()
+    start = clock.now
+    for _ in range(8):
+        bucket.acquire()
+    assert clock.now - start == 2.0
+
+
+def test_threads_sharing_a_bucket_do_not_exceed_the_rate():
+    rate, capacity = 100, 10
+    bucket = TokenBucket(rate=rate, capacity=capacity)
+    acquired = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(10):
+            bucket.acquire()
+            with lock:
+                acquired.append(time.monotonic())
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    # 80 tokens: the first 10 are the burst, the other 70 come at 100 per second
+    assert len(acquired) == 80
+    assert elapsed >= (80 - capacity) / rate - 0.01
+    acquired.sort()
+    for count, moment in enumerate(acquired, 1):
+        assert count <= capacity + (moment - start) * rate + 1
@@ -0,0 +1,67 @@
+import types
+
+from services import response_cache
+from services.response_cache import RecommendationCache
+from config import LLM_CACHE_SIMILARITY
+
+RESPONSE = {"recommendations": [{"name": "Zundo Ramen"}], "metadata": {}}
+
+
+def lookup(cache, query, city="Columbus"):
+    return cache.get(query, city, None, 5, "v1")
+
+
+def store(cache, query, city="Columbus"):
+    cache.put(query, city, None, 5, "v1", RESPONSE, seconds=2.0)
+
+
+def test_exact_hits_ignore_case_and_spacing():
+    cache = RecommendationCache()
+    store(cache, "Spicy ramen downtown")
+
+    response = lookup(cache, "  spicy   RAMEN downtown ")
+    assert response["recommendations"] == RESPONSE["recommendations"]
+    assert response["metadata"]["cache"] == {"status": "hit", "similarity": 1.0, "saved_seconds": 2.0}
+    assert lookup(cache, "spicy ramen downtown", city="Dayton") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    cache = RecommendationCache(ttl_seconds=60)
+    store(cache, "tacos")
+
+    now[0] += 59
+    assert lookup(cache, "tacos") is not None
+    now[0] += 2
+    assert lookup(cache, "tacos") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = RecommendationCache(max_entries=2)
+    store(cache, "tacos")
+    store(cache, "sushi")
+    assert lookup(cache, "tacos") is not None
+    store(cache, "pizza")
+
+    assert lookup(cache, "sushi") is None
+    assert lookup(cache, "tacos") is not None and lookup(cache, "pizza") is not None
+
+
+def test_near_duplicates_are_served_but_negations_are_not():
+    cache = RecommendationCache(similarity=LLM_CACHE_SIMILARITY)
+    store(cache, "cheap spicy tacos")
+
+    response = lookup(cache, "spicy taco that is cheap")
+    assert response["metadata"]["cache"]["status"] == "similar"
+    assert lookup(cache, "cheap tacos not spicy") is None
+    assert lookup(cache, "cheap spicy tacos", city="Dayton") is None
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    store(RecommendationCache(path=path), "tacos")
+
+    assert lookup(RecommendationCache(path=path), "tacos")["recommendations"] == RESPONSE["recommendations"]
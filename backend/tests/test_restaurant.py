@@ -0,0 +1,31 @@
+from utils.restaurant import Restaurant
+
+RECORD = {
+    "place_id": "p1",
+    "name": "Zundo Ramen",
+    "city": "Columbus",
+    "rating": 4.6,
+    "types": ["restaurant", "food"],
+    "cuisine_types": ["Japanese", "Ramen"],
+    "reviews": [{"author_name": "A", "rating": 5, "text": "Great broth", "time": 1, "language": "en"}],
+    "custom": {"kept": True},
+}
+
+
+def test_to_dict_returns_only_the_fields_given():
+    restaurant = Restaurant.from_dict(RECORD)
+    assert restaurant.to_dict() == RECORD
+    assert "website" not in restaurant and restaurant.get("website", "n/a") == "n/a"
+    assert restaurant.website == "" and restaurant.lat == 0
+
+
+def test_equal_lists_are_shared_as_tuples_within_one_load():
+    shared = {}
+    first = Restaurant.from_dict(RECORD, shared)
+    second = Restaurant.from_dict(dict(RECORD, place_id="p2"), shared)
+    assert first.cuisine_types == ("Japanese", "Ramen")
+    assert first.cuisine_types is second.cuisine_types
+
+    # Another load starts from its own table, so nothing outlives a reload
+    third = Restaurant.from_dict(dict(RECORD, place_id="p3"), {})
+    assert third.cuisine_types is not first.cuisine_types
@@ -0,0 +1,80 @@
+from utils.data_processor import PRICE_MAPPING
+from utils.restaurant_stats import RestaurantStats
+
+RESTAURANTS = [
+    {"place_id": "p1", "city": "columbus", "rating": 4.6, "user_ratings_total": 800, "price_level": 2,
+     "cuisine_types": ["Ramen", "Japanese"], "popular_dishes": ["Tonkotsu"], "descriptors": ["casual"]},
+    {"place_id": "p2", "city": "dayton", "rating": 4.1, "user_ratings_total": 90, "price_level": 1,
+     "cuisine_types": ["Tacos"], "popular_dishes": [], "descriptors": ["affordable"]},
+    {"place_id": "p3", "city": "columbus", "rating": 3.7, "user_ratings_total": 12, "price_level": 4,
+     "cuisine_types": ["Japanese"], "popular_dishes": ["Omakase"]},
+    {"place_id": "p4", "city": "akron", "rating": 4.9, "user_ratings_total": 2000, "price_level": 0,
+     "cuisine_types": ["Tacos", "Mexican"]},
+    {"place_id": "p5", "city": "columbus", "rating": 4.1, "user_ratings_total": 5, "price_level": 2},
+]
+
+# Records the previous passes could not read: missing and null ratings, unknown price levels
+IRREGULAR = [
+    {"place_id": "p6", "city": "dayton", "price_level": 7, "cuisine_types": ["Tacos"]},
+    {"place_id": "p7", "city": None, "rating": None, "price_level": None},
+    {"place_id": "p8", "rating": 0, "user_ratings_total": 0, "price_level": -1},
+]
+
+
+def multi_pass_stats(restaurants):
+    """The statistics --stats printed before, one pass per statistic"""
+    cuisine_counts = {}
+    for restaurant in restaurants:
+        for cuisine in restaurant.get("cuisine_types", []):
+            cuisine_counts[cuisine] = cuisine_counts.get(cuisine, 0) + 1
+    cuisines = {k: v for k, v in sorted(cuisine_counts.items(), key=lambda item: item[1], reverse=True)}
+
+    price_counts = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0}
+    for restaurant in restaurants:
+        price_counts[restaurant.get("price_level", 0)] += 1
+
+    ratings = {}
+    for r in restaurants:
+        rating_key = round(r.get("rating", 0) * 2) / 2
+        ratings[rating_key] = ratings.get(rating_key, 0) + 1
+
+    return {
+        "total": len(restaurants),
+        "cuisines": cuisines,
+        "price_levels": {PRICE_MAPPING[k]: v for k, v in price_counts.items()},
+        "rating_distribution": {str(rating): ratings[rating] for rating in sorted(ratings)},
+        "with_dishes": sum(1 for r in restaurants if r.get("popular_dishes")),
+        "with_descriptors": sum(1 for r in restaurants if r.get("descriptors")),
+    }
+
+
+def test_single_pass_matches_the_previous_passes():
+    stats = RestaurantStats.from_restaurants(RESTAURANTS, PRICE_MAPPING).to_dict()
+    expected = multi_pass_stats(RESTAURANTS)
+
+    for key in ("total", "cuisines", "price_levels", "rating_distribution"):
+        assert stats[key] == expected[key]
+    assert list(stats["cuisines"]) == list(expected["cuisines"])
+    assert stats["coverage"]["popular_dishes"] == expected["with_dishes"]
+    assert stats["coverage"]["descriptors"] == expected["with_descriptors"]
+
+    assert stats["rating"] == {"rated": 5, "average": 4.28, "p25": 4.1, "p50": 4.1, "p75": 4.6, "p90": 4.9}
+    assert stats["review_count"] == {"p25": 12, "p50": 90, "p75": 800, "p90": 2000}
+    assert list(stats["cities"]) == ["columbus", "akron", "dayton"]
+    assert stats["cities"]["columbus"]["price_levels"]["$$"] == 2
+
+
+def test_missing_ratings_and_unknown_price_levels():
+    stats = RestaurantStats.from_restaurants(RESTAURANTS + IRREGULAR, PRICE_MAPPING).to_dict()
+    regular = RestaurantStats.from_restaurants(RESTAURANTS, PRICE_MAPPING).to_dict()
+
+    # Price levels outside 0-4 (and missing ones) count as Unknown
+    assert list(stats["price_levels"]) == list(PRICE_MAPPING.values())
+    assert stats["price_levels"]["Unknown"] == regular["price_levels"]["Unknown"] + 3
+
+    # Unrated restaurants land in the 0 bucket but stay out of the average and percentiles
+    assert stats["rating_distribution"]["0.0"] == 3
+    assert stats["rating"] == regular["rating"]
+    assert stats["review_count"]["p25"] == 5
+    assert stats["cities"]["unknown"]["total"] == 2
+    assert stats["total"] == 8
@@ -0,0 +1,61 @@
+from utils import search_index
+from utils.search_index import SearchIndex, tokenize
+
+RESTAURANTS = [
+    {"place_id": "zundo", "name": "Zundo Ramen", "cuisine_types": ["Japanese", "Ramen"],
+     "popular_dishes": ["Tonkotsu Ramen"], "descriptors": ["authentic"]},
+    {"place_id": "diner", "name": "Blue Plate Diner", "cuisine_types": ["American"],
+     "reviews": [{"text": "Not a ramen place, but the pancakes are great"}]},
+    {"place_id": "taco", "name": "Taco Time", "cuisine_types": ["Mexican"], "popular_dishes": ["Fish Tacos"],
+     "descriptors": ["late_night"], "profile": "Cheap tacos open late"},
+    {"place_id": "sushi", "name": "Sushi Ten", "cuisine_types": ["Japanese", "Sushi"]},
+    {"place_id": "pizza", "name": "Hounddog's Pizza", "cuisine_types": ["Pizza"], "descriptors": ["late_night"]},
+]
+
+
+def ids(results):
+    return [place_id for place_id, _ in results]
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals():
+    assert tokenize("I'm looking for some Tacos and Hounddog's pizzas") == ["taco", "hounddog", "pizza"]
+
+
+def test_ranking():
+    index = SearchIndex.build(RESTAURANTS)
+    # A ramen shop beats a review that merely mentions ramen
+    assert ids(index.search("ramen")) == ["zundo", "diner"]
+    # Matching more query terms ranks higher
+    assert ids(index.search("late night tacos"))[:2] == ["taco", "pizza"]
+    assert ids(index.search("japanese sushi"))[0] == "sushi"
+    assert index.search("somewhere I would like") == []
+    assert index.search("croissant") == []
+
+
+def test_limit_keeps_the_best_matches_in_order():
+    index = SearchIndex.build(RESTAURANTS * 20)
+    for query in ["japanese ramen", "late night", "pizza tacos sushi"]:
+        full = index.search(query)
+        for limit in [1, 3, 10, 1000]:
+            assert index.search(query, limit=limit) == full[:limit]
+
+
+def test_save_and_load_keep_the_ranking(tmp_path):
+    index = SearchIndex.build(RESTAURANTS)
+    path = str(tmp_path / "search_index.json")
+    index.save(path)
+
+    loaded = SearchIndex.load(path)
+    assert len(loaded) == len(index)
+    for query in ["ramen", "late night tacos", "japanese"]:
+        assert ids(loaded.search(query)) == ids(index.search(query))
+
+
+def test_sparse_and_dense_accumulation_agree(monkeypatch):
+    index = SearchIndex.build(RESTAURANTS * 20)
+    queries = ["japanese ramen", "late night", "pizza tacos sushi", "croissant"]
+    results = {}
+    for share in (0.0, float("inf")):
+        monkeypatch.setattr(search_index, "DENSE_QUERY_SHARE", share)
+        results[share] = [index.search(query, limit=limit) for query in queries for limit in (None, 5)]
+    assert results[0.0] == results[float("inf")]
@@ -0,0 +1,97 @@
+from utils.restaurant import Restaurant
+from utils.similarity_index import brand_name
+from services.catalog import RestaurantCatalog
+
+
+def restaurant(place_id, name, cuisine, dishes, price_level=1, lat=40.0, lng=-83.0):
+    return Restaurant.from_dict({
+        "place_id": place_id,
+        "name": name,
+        "city": "columbus",
+        "lat": lat,
+        "lng": lng,
+        "rating": 4.0,
+        "user_ratings_total": 100,
+        "price_level": price_level,
+        "cuisine_types": ["Restaurant", cuisine],
+        "popular_dishes": dishes,
+        "descriptors": ["casual"],
+    })
+
+
+def build_catalog(extra=()):
+    return RestaurantCatalog(list(extra) + [
+        restaurant("mcd-1", "McDonald's", "Burgers", ["Big Mac", "Fries"]),
+        restaurant("mcd-2", "McDonald's", "Burgers", ["Big Mac", "Fries"], lat=40.1),
+        restaurant("wendys", "Wendy's", "Burgers", ["Frosty", "Fries"]),
+        restaurant("five-guys", "Five Guys", "Burgers", ["Cheeseburger", "Fries"], price_level=2),
+        restaurant("dominos", "Domino's", "Pizza", ["Pepperoni Pizza"]),
+        restaurant("hounddogs", "Hounddog's Pizza", "Pizza", ["Pepperoni Pizza", "Garlic Knots"]),
+        restaurant("zundo", "Zundo Ramen", "Ramen", ["Tonkotsu Ramen"], price_level=2),
+        restaurant("ramen-kai", "Ramen Kai", "Ramen", ["Shoyu Ramen"], price_level=2),
+        restaurant("sushi", "Sushi Ten", "Sushi", ["Salmon Roll"], price_level=3),
+        restaurant("tacos", "Taco Time", "Tacos", ["Fish Tacos"]),
+        restaurant("skyline-12", "Skyline Chili #12", "Chili", ["Coney", "3-Way"]),
+    ])
+
+
+def anchor_name(catalog, query):
+    anchor = catalog.find_anchor(query)
+    return anchor.name if anchor is not None else None
+
+
+def test_similar_to_names_the_anchor():
+    catalog = build_catalog()
+    assert anchor_name(catalog, "something similar to McDonald's but not McDonald's") == "McDonald's"
+    assert anchor_name(catalog, "places like mcdonalds but cheaper") == "McDonald's"
+    assert anchor_name(catalog, "burgers like Five Guys") == "Five Guys"
+
+
+def test_like_as_a_verb_is_not_an_anchor():
+    catalog = build_catalog()
+    assert anchor_name(catalog, "I'd like Zundo Ramen tonight") is None
+    assert anchor_name(catalog, "I would like pizza") is None
+
+
+def test_instead_of_anchors_on_its_object():
+    catalog = build_catalog()
+    assert anchor_name(catalog, "I'd like Hounddog's Pizza instead of Domino's") == "Domino's"
+    assert anchor_name(catalog, "any pizza other than Domino's") == "Domino's"
+
+
+def test_similar_leaves_out_every_branch_of_the_anchor():
+    catalog = build_catalog()
+    neighbours = [r.place_id for r, _ in catalog.similar("mcd-1", k=5)]
+    assert neighbours[:2] == ["wendys", "five-guys"]
+    assert "mcd-1" not in neighbours and "mcd-2" not in neighbours
+
+
+def test_similar_applies_filters():
+    catalog = build_catalog()
+    assert [r.place_id for r, _ in catalog.similar("mcd-1", k=5, price_levels=[2])] == ["five-guys"]
+    assert catalog.similar("unknown") == []
+
+
+def test_brand_name_drops_branch_suffixes():
+    assert brand_name("McDonald's - Downtown") == "mcdonalds"
+    assert brand_name("Skyline Chili #12") == "skyline chili"
+    assert brand_name("Raising Cane's (Short North)") == "raising canes"
+    assert brand_name("Skyline Chili Columbus", "Columbus") == "skyline chili"
+    # Names that are nothing but a "suffix" are kept whole
+    assert brand_name("#1 Pho") == "1 pho"
+    assert brand_name("Columbus Fish Market", "columbus") == "columbus fish market"
+
+
+def test_similar_leaves_out_branches_with_suffixes():
+    catalog = build_catalog([
+        restaurant("mcd-downtown", "McDonald's - Downtown", "Burgers", ["Big Mac", "Fries"]),
+        restaurant("mcd-city", "McDonalds Columbus", "Burgers", ["Big Mac", "Fries"]),
+        restaurant("skyline-3", "Skyline Chili #3", "Chili", ["Coney", "3-Way"]),
+        restaurant("gold-star", "Gold Star Chili", "Chili", ["Coney", "Cheese Coney"]),
+    ])
+    neighbours = [r.place_id for r, _ in catalog.similar("mcd-1", k=10)]
+    assert not {"mcd-1", "mcd-2", "mcd-downtown", "mcd-city"} & set(neighbours)
+    assert neighbours[:2] == ["wendys", "five-guys"]
+
+    assert [r.place_id for r, _ in catalog.similar("skyline-3", k=2)] == ["gold-star"]
+    assert anchor_name(catalog, "something like Skyline Chili") == "Skyline Chili #3"
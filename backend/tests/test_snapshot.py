@@ -0,0 +1,62 @@
+import json
+
+from utils.snapshot import SnapshotReader, write_snapshot
+
+RESTAURANTS = [
+    {
+        "place_id": "p1",
+        "name": "Zundo Ramen",
+        "city": "Columbus",
+        "rating": 4.6,
+        "user_ratings_total": 812,
+        "price_level": 2,
+        "lat": 39.98,
+        "lng": -83.0,
+        "reviews": [{"author_name": "Ana", "rating": 5, "text": "Broth \"to die for\" — ça va", "time": 1}],
+    },
+    # Values the columns can't hold exactly, missing and null fields, a different key order
+    {"name": "No Frills", "place_id": "p2", "rating": 4, "price_level": None, "city": None, "reviews": []},
+    {"place_id": "p3", "name": "Hounddog's Pizza", "city": "Columbus", "lat": 0.0, "lng": 0.0, "custom": {"a": [1, 2]}},
+]
+
+
+def test_records_round_trip_exactly(tmp_path):
+    path = str(tmp_path / "restaurants.snap")
+    assert write_snapshot(RESTAURANTS, path) == len(RESTAURANTS)
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == len(RESTAURANTS)
+        records = reader.load_restaurants(reviews="eager")
+        assert records == RESTAURANTS
+        # Key order is kept, and int/float types are not mixed up by the columns
+        assert [list(r) for r in records] == [list(r) for r in RESTAURANTS]
+        assert type(records[1]["rating"]) is int and type(records[0]["rating"]) is float
+
+
+def test_review_modes(tmp_path):
+    path = str(tmp_path / "restaurants.snap")
+    write_snapshot(RESTAURANTS, path)
+
+    with SnapshotReader(path) as reader:
+        lazy = reader.record(0)
+        assert repr(lazy["reviews"]) == "LazyReviews(<not loaded>)"
+        assert lazy["reviews"] == RESTAURANTS[0]["reviews"]
+        assert "reviews" not in reader.record(0, reviews="skip")
+        assert "reviews" not in reader.record(2, reviews="eager")
+
+
+def test_export_json_matches_json_dump(tmp_path):
+    path = str(tmp_path / "restaurants.snap")
+    write_snapshot(RESTAURANTS, path)
+    exported = tmp_path / "exported.json"
+
+    with SnapshotReader(path) as reader:
+        assert reader.export_json(str(exported)) == len(RESTAURANTS)
+    assert exported.read_text(encoding="utf-8") == json.dumps(RESTAURANTS, ensure_ascii=False, indent=2)
+
+
+def test_empty_snapshot(tmp_path):
+    path = str(tmp_path / "restaurants.snap")
+    write_snapshot([], path)
+    with SnapshotReader(path) as reader:
+        assert reader.load_restaurants() == []
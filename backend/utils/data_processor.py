@@ -1,13 +1,26 @@
 import os
 import json
 import re
-from typing import List, Dict, Any
-from collections import Counter
+import hashlib
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Set
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 import sys
 
+# ijson is optional; without it JSON arrays are loaded in one go
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import DATA_DIR
+from utils.restaurant_stats import RestaurantStats
+from utils.restaurant import Restaurant
+from utils.search_index import SearchIndex
+from utils.name_index import NameIndex
+from utils.snapshot import SnapshotReader, SnapshotWriter, snapshot_path_for, snapshot_is_fresh
+from config import DATA_DIR, PROCESS_WORKERS, PROCESS_CHUNK_SIZE, FOOD_LEXICON_PATH
 
 # Common food-related words to ignore when extracting dishes
 COMMON_FOOD_WORDS = {
@@ -17,11 +30,20 @@ COMMON_FOOD_WORDS = {
     "terrible", "bad", "awful", "okay", "decent", "fine", "average", "mediocre"
 }
 
+# Capitalized words and phrases, which are often dish names. Same matches as
+# \b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b, but starting with a character class
+# lets the regex engine skip ahead to capital letters
+CAPITALIZED_PHRASE_REGEX = re.compile(r'([A-Z](?<!\w[A-Z])[a-z]+(?:\s+[A-Z][a-z]+)*)\b')
+
+# Common food items preceded by whitespace (matched against lowercased text);
+# the word before each one is found by _find_food_phrases
+FOOD_WORD_REGEX = re.compile(r'(?<=\s)(?:burger|pizza|sandwich|salad|pasta|taco|burrito|chicken|steak|fish|soup|dessert)s?\b')
+
 # Keywords for restaurant characteristics
 DESCRIPTOR_PATTERNS = {
     "affordable": ["affordable", "cheap", "inexpensive", "budget", "low price", "good price", "good value", "value for money"],
     "expensive": ["expensive", "pricey", "high-end", "upscale", "fancy", "costly", "overpriced"],
-    "family_friendly": ["family", "kid", "child", "family-friendly", "family friendly", "family oriented"],
+    "family_friendly": ["family", "families", "kid", "child", "children", "family-friendly", "family friendly", "family oriented"],
     "quick_service": ["fast", "quick", "speedy", "rapid", "prompt", "efficient", "quick service"],
     "casual": ["casual", "relaxed", "laid-back", "informal", "chill", "cozy"],
     "fancy": ["fancy", "upscale", "elegant", "sophisticated", "classy", "high-end", "fine dining"],
@@ -33,6 +55,53 @@ DESCRIPTOR_PATTERNS = {
     "authentic": ["authentic", "traditional", "genuine", "real", "original", "true", "legitimate"]
 }
 
+# Bump when the enrichment logic changes so every restaurant is re-enriched
+ENRICHMENT_VERSION = 2
+
+# Fields produced by enrichment that can be reused when a restaurant is unchanged
+ENRICHED_FIELDS = ("popular_dishes", "descriptors", "sentiment", "profile")
+
+def _trie_pattern(terms: List[str]) -> str:
+    """
+    Build a regex alternation of terms structured as a prefix trie, so the regex
+    engine tests each character once instead of retrying every term in turn
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A term ending here makes the rest optional; greedy matching still prefers the longest term
+        return f"(?:{pattern})?" if "" in node else pattern
+    
+    return build(trie)
+
+def _compile_descriptor_matcher(patterns: Dict[str, List[str]]) -> Tuple["re.Pattern", Dict[str, List[str]]]:
+    """
+    Compile all descriptor patterns into one regex that finds every pattern in a
+    single pass. Matches must be whole words (an optional plural "s" is allowed),
+    so "late" no longer matches "chocolate" and "real" no longer matches "really".
+    
+    Returns:
+        Tuple of (compiled regex, mapping of pattern to the categories it signals)
+    """
+    pattern_categories = {}
+    for category, terms in patterns.items():
+        for term in terms:
+            pattern_categories.setdefault(term, []).append(category)
+    
+    regex = re.compile(r"\b(" + _trie_pattern(list(pattern_categories)) + r")s?\b")
+    return regex, pattern_categories
+
+DESCRIPTOR_REGEX, DESCRIPTOR_PATTERN_CATEGORIES = _compile_descriptor_matcher(DESCRIPTOR_PATTERNS)
+
 # Price level mapping
 PRICE_MAPPING = {
     0: "Unknown",
@@ -72,32 +141,186 @@ CUISINE_MAPPING = {
     "vietnamese_restaurant": "Vietnamese"
 }
 
+def _is_word_char(char: str) -> bool:
+    """Same test as the regex word character class"""
+    return char.isalnum() or char == "_"
+
+
+def _find_food_phrases(text: str) -> List[str]:
+    """
+    Find "<word> <food item>" phrases, e.g. "cheese burger"
+    
+    Gives the same phrases as a single "word, whitespace, food item" regex, but
+    only the rare food words are searched for and the word before each one is
+    found by stepping back, instead of trying the whole pattern at every word.
+    """
+    phrases = []
+    last_end = 0
+    for match in FOOD_WORD_REGEX.finditer(text):
+        start = match.start()
+        while start > last_end and text[start - 1].isspace():
+            start -= 1
+        word_end = start
+        while start > last_end and _is_word_char(text[start - 1]):
+            start -= 1
+        
+        # Needs a whole word before it that doesn't overlap the previous phrase
+        if start == word_end or (start > 0 and _is_word_char(text[start - 1])):
+            continue
+        
+        phrases.append(text[start:match.end()])
+        last_end = match.end()
+    
+    return phrases
+
+
+def _clean_chunk(restaurants: List[Dict[str, Any]], force: bool = False,
+                 food_lexicon_path: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Clean and enhance a chunk of restaurants (module level so process pools can pickle it)
+    
+    Returns:
+        Tuple of (cleaned restaurants, number whose enhanced fields were reused)
+    """
+    processor = DataProcessor(food_lexicon_path)
+    cleaned = []
+    reused = 0
+    for restaurant in restaurants:
+        record, was_reused = processor.clean_restaurant(restaurant, force=force)
+        cleaned.append(record)
+        reused += was_reused
+    return cleaned, reused
+
 class DataProcessor:
     """
     Utility class for processing and cleaning restaurant data
     """
     
-    def __init__(self):
+    def __init__(self, food_lexicon_path: Optional[str] = None):
+        """
+        Args:
+            food_lexicon_path: JSON list of food words used to filter dish candidates
+                               (defaults to FOOD_LEXICON_PATH; no filtering when unset)
+        """
         self.restaurants_path = os.path.join(DATA_DIR, "restaurants.json")
+        self.snapshot_path = snapshot_path_for(self.restaurants_path)
+        self.search_index_path = os.path.join(DATA_DIR, "search_index.json")
+        self.name_index_path = os.path.join(DATA_DIR, "name_index.json")
+        self.food_lexicon_path = food_lexicon_path or FOOD_LEXICON_PATH
+        self.food_lexicon = self._load_food_lexicon(self.food_lexicon_path)
+        
+        # Enhanced fields depend on the extraction logic and the lexicon in use
+        self.enrichment_signature = ENRICHMENT_VERSION
+        if self.food_lexicon is not None:
+            lexicon_digest = hashlib.sha256("\n".join(sorted(self.food_lexicon)).encode("utf-8")).hexdigest()
+            self.enrichment_signature = f"{ENRICHMENT_VERSION}:{lexicon_digest[:16]}"
+    
+    @staticmethod
+    def _load_food_lexicon(path: Optional[str]) -> Optional[Set[str]]:
+        """Load the optional food lexicon as a set of lowercase words"""
+        if not path:
+            return None
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            return {word.lower() for word in json.load(f)}
     
-    def load_restaurants(self) -> List[Dict[str, Any]]:
-        """Load restaurants from the JSON file"""
+    def load_restaurants(self) -> List[Restaurant]:
+        """
+        Load restaurants, from the binary snapshot when it is up to date
+        (reviews are then decoded on first access) and from the JSON file otherwise
+        """
+        if snapshot_is_fresh(self.snapshot_path, self.restaurants_path):
+            reader = SnapshotReader(self.snapshot_path)
+            shared = {}
+            return [Restaurant.from_dict(r, shared) for r in reader.iter_restaurants()]
+        
         if not os.path.exists(self.restaurants_path):
             print(f"Restaurant data not found at {self.restaurants_path}")
             return []
         
         with open(self.restaurants_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            shared = {}
+            return [Restaurant.from_dict(r, shared) for r in json.load(f)]
     
-    def clean_data(self) -> None:
-        """Clean the restaurant data to ensure consistency and remove duplicates"""
-        restaurants = self.load_restaurants()
+    def find_restaurants(self, query: str) -> List[Restaurant]:
+        """
+        Find restaurants whose name contains query (case-insensitive) or whose place_id is query
+        
+        With an up-to-date snapshot and name index, only the names are loaded
+        and just the matching records are decoded from the snapshot.
+        """
+        if (snapshot_is_fresh(self.snapshot_path, self.restaurants_path)
+                and snapshot_is_fresh(self.name_index_path, self.restaurants_path)):
+            index = NameIndex.load(self.name_index_path)
+            reader = SnapshotReader(self.snapshot_path)
+            if len(reader) == len(index):
+                return [Restaurant.from_dict(reader.record(position)) for position in index.search(query)]
         
-        if not restaurants:
+        restaurants = self.load_restaurants()
+        index = NameIndex([r.name for r in restaurants], [r.place_id for r in restaurants])
+        return [restaurants[position] for position in index.search(query)]
+    
+    def iter_restaurants(self, path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream restaurants from a JSON array or JSONL file one record at a time
+        JSON arrays are parsed incrementally when ijson is installed
+        """
+        path = path or self.restaurants_path
+        if not os.path.exists(path):
+            print(f"Restaurant data not found at {path}")
             return
         
-        cleaned = []
+        if path.endswith(".jsonl"):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        elif ijson is not None:
+            with open(path, 'rb') as f:
+                yield from ijson.items(f, "item", use_float=True)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                yield from json.load(f)
+    
+    def clean_data(self, workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                   input_path: Optional[str] = None, force: bool = False) -> None:
+        """
+        Clean the restaurant data to ensure consistency and remove duplicates
+        
+        Records are streamed from the input, enriched in chunks (over a process
+        pool when workers > 1) and written out incrementally, so the output is
+        identical to a serial run without holding the whole dataset in memory.
+        Restaurants whose content hash is unchanged since the last run keep their
+        enhanced fields instead of being re-enriched.
+        
+        Args:
+            workers: Number of worker processes used for enrichment
+            chunk_size: Number of restaurants sent to a worker at a time
+            input_path: JSON or JSONL file to read (defaults to restaurants.json)
+            force: Re-enrich every restaurant, even unchanged ones
+        """
+        workers = workers or PROCESS_WORKERS
+        chunk_size = chunk_size or PROCESS_CHUNK_SIZE
+        chunks = self._iter_unique_chunks(self.iter_restaurants(input_path), chunk_size)
+        
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = self._map_bounded(pool, chunks, workers * 2, force, self.food_lexicon_path)
+                count, reused = self._write_restaurants(results)
+        else:
+            count, reused = self._write_restaurants(
+                _clean_chunk(chunk, force, self.food_lexicon_path) for chunk in chunks
+            )
+        
+        if count:
+            print(f"Cleaned and enhanced data for {count} restaurants "
+                  f"({count - reused} re-enriched, {reused} unchanged and reused)")
+    
+    @staticmethod
+    def _iter_unique_chunks(restaurants: Iterator[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Group restaurants into chunks, skipping duplicate place_ids"""
         seen_place_ids = set()
+        chunk = []
         
         for restaurant in restaurants:
             place_id = restaurant.get("place_id")
@@ -107,121 +330,253 @@ class DataProcessor:
                 continue
                 
             seen_place_ids.add(place_id)
+            chunk.append(restaurant)
             
-            # Ensure all fields exist
-            restaurant = {
-                "place_id": restaurant.get("place_id", ""),
-                "name": restaurant.get("name", ""),
-                "address": restaurant.get("address", ""),
-                "city": restaurant.get("city", ""),
-                "zipcode": restaurant.get("zipcode", ""),
-                "lat": restaurant.get("lat", 0),
-                "lng": restaurant.get("lng", 0),
-                "rating": restaurant.get("rating", 0),
-                "user_ratings_total": restaurant.get("user_ratings_total", 0),
-                "price_level": restaurant.get("price_level", 0),
-                "website": restaurant.get("website", ""),
-                "phone": restaurant.get("phone", ""),
-                "types": restaurant.get("types", []),
-                "reviews": restaurant.get("reviews", [])
-            }
-            
-            # Format reviews consistently
-            formatted_reviews = []
-            for review in restaurant["reviews"]:
-                formatted_reviews.append({
-                    "author_name": review.get("author_name", ""),
-                    "rating": review.get("rating", 0),
-                    "text": review.get("text", ""),
-                    "time": review.get("time", 0)
-                })
-            
-            restaurant["reviews"] = formatted_reviews
-            
-            # Extract cuisine types from the 'types' field
-            cuisine_types = set()
-            for type_str in restaurant["types"]:
-                if type_str in CUISINE_MAPPING:
-                    cuisine_types.add(CUISINE_MAPPING[type_str])
-                elif type_str not in ["restaurant", "food", "point_of_interest", "establishment"]:
-                    # Convert snake_case to Title Case for readability
-                    formatted_type = " ".join(word.capitalize() for word in type_str.split("_"))
-                    cuisine_types.add(formatted_type)
-            
-            restaurant["cuisine_types"] = list(cuisine_types)
-            
-            # Format price level
-            restaurant["price_display"] = PRICE_MAPPING.get(restaurant["price_level"], "Unknown")
-            
-            # Add enhanced data if reviews are available
-            if restaurant["reviews"]:
-                # Extract popular dishes, keywords, and create a summary
-                restaurant["popular_dishes"] = self.extract_popular_dishes(restaurant["reviews"])
-                restaurant["descriptors"] = self.extract_descriptors(restaurant["reviews"])
-                restaurant["sentiment"] = self.calculate_sentiment(restaurant["reviews"])
-                restaurant["profile"] = self.create_restaurant_profile(restaurant)
-            else:
-                restaurant["popular_dishes"] = []
-                restaurant["descriptors"] = []
-                restaurant["sentiment"] = "neutral"
-                restaurant["profile"] = f"{restaurant['name']} is a restaurant in {restaurant['city']}."
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        
+        if chunk:
+            yield chunk
+    
+    @staticmethod
+    def _map_bounded(pool: ProcessPoolExecutor, chunks: Iterator[List[Dict[str, Any]]],
+                     max_in_flight: int, force: bool = False,
+                     food_lexicon_path: Optional[str] = None) -> Iterator[Tuple[List[Dict[str, Any]], int]]:
+        """Enrich chunks on the pool in input order, with a bounded number in flight"""
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(_clean_chunk, chunk, force, food_lexicon_path))
+            if len(in_flight) >= max_in_flight:
+                yield in_flight.popleft().result()
+        
+        while in_flight:
+            yield in_flight.popleft().result()
+    
+    def _write_restaurants(self, chunks: Iterator[Tuple[List[Dict[str, Any]], int]]) -> Tuple[int, int]:
+        """
+        Write cleaned chunks to the restaurants file as they arrive
+        The layout matches json.dump(..., indent=2) of the whole list, and the
+        binary snapshot, the search index and the name index are written alongside it
+        
+        Returns:
+            Tuple of (restaurants written, restaurants reused); nothing is written when there are none
+        """
+        tmp_path = self.restaurants_path + ".tmp"
+        count = 0
+        reused = 0
+        
+        snapshot = SnapshotWriter(self.snapshot_path)
+        search_index = SearchIndex()
+        name_index = NameIndex()
+        
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for chunk, chunk_reused in chunks:
+                    reused += chunk_reused
+                    for restaurant in chunk:
+                        f.write("[\n" if count == 0 else ",\n")
+                        record = json.dumps(restaurant, ensure_ascii=False, indent=2)
+                        f.write("  " + record.replace("\n", "\n  "))
+                        snapshot.add(restaurant)
+                        search_index.add(restaurant)
+                        name_index.add(restaurant.get("name", ""), restaurant.get("place_id", ""))
+                        count += 1
+                if count:
+                    f.write("\n]")
+        except BaseException:
+            snapshot.abort()
+            raise
+        
+        # Keep the existing files when there was nothing to clean
+        if count:
+            os.replace(tmp_path, self.restaurants_path)
+            # Written after the JSON file so they are never older than it
+            snapshot.close()
+            search_index.save(self.search_index_path)
+            name_index.save(self.name_index_path)
+        else:
+            os.remove(tmp_path)
+            snapshot.abort()
+        
+        return count, reused
+    
+    def clean_restaurant(self, restaurant: Dict[str, Any], force: bool = False) -> Tuple[Dict[str, Any], bool]:
+        """
+        Normalize a single restaurant record and add the enhanced fields
+        
+        Args:
+            restaurant: Restaurant record as collected or previously processed
+            force: Re-enrich even if the content hash is unchanged
             
-            cleaned.append(restaurant)
+        Returns:
+            Tuple of (cleaned restaurant, whether the enhanced fields were reused)
+        """
+        previous = restaurant
+        
+        # Ensure all fields exist
+        restaurant = {
+            "place_id": restaurant.get("place_id", ""),
+            "name": restaurant.get("name", ""),
+            "address": restaurant.get("address", ""),
+            "city": restaurant.get("city", ""),
+            "zipcode": restaurant.get("zipcode", ""),
+            "lat": restaurant.get("lat", 0),
+            "lng": restaurant.get("lng", 0),
+            "rating": restaurant.get("rating", 0),
+            "user_ratings_total": restaurant.get("user_ratings_total", 0),
+            "price_level": restaurant.get("price_level", 0),
+            "website": restaurant.get("website", ""),
+            "phone": restaurant.get("phone", ""),
+            "types": restaurant.get("types", []),
+            "fetched_at": restaurant.get("fetched_at", 0),
+            "reviews": restaurant.get("reviews", [])
+        }
+        
+        # Format reviews consistently
+        formatted_reviews = []
+        for review in restaurant["reviews"]:
+            formatted_reviews.append({
+                "author_name": review.get("author_name", ""),
+                "rating": review.get("rating", 0),
+                "text": review.get("text", ""),
+                "time": review.get("time", 0)
+            })
         
-        # Save the cleaned data
-        with open(self.restaurants_path, 'w', encoding='utf-8') as f:
-            json.dump(cleaned, f, ensure_ascii=False, indent=2)
+        restaurant["reviews"] = formatted_reviews
+        
+        # Extract cuisine types from the 'types' field
+        cuisine_types = set()
+        for type_str in restaurant["types"]:
+            if type_str in CUISINE_MAPPING:
+                cuisine_types.add(CUISINE_MAPPING[type_str])
+            elif type_str not in ["restaurant", "food", "point_of_interest", "establishment"]:
+                # Convert snake_case to Title Case for readability
+                formatted_type = " ".join(word.capitalize() for word in type_str.split("_"))
+                cuisine_types.add(formatted_type)
+        
+        restaurant["cuisine_types"] = sorted(cuisine_types)
+        
+        # Format price level
+        restaurant["price_display"] = PRICE_MAPPING.get(restaurant["price_level"], "Unknown")
+        
+        # Reuse the enhanced data if nothing it depends on has changed
+        content_hash = self.compute_content_hash(restaurant)
+        reused = (
+            not force
+            and previous.get("content_hash") == content_hash
+            and all(field in previous for field in ENRICHED_FIELDS)
+        )
+        
+        if reused:
+            for field in ENRICHED_FIELDS:
+                restaurant[field] = previous[field]
+        # Add enhanced data if reviews are available
+        elif restaurant["reviews"]:
+            # Extract popular dishes, keywords, and create a summary
+            restaurant["popular_dishes"] = self.extract_popular_dishes(restaurant["reviews"])
+            restaurant["descriptors"] = self.extract_descriptors(restaurant["reviews"])
+            restaurant["sentiment"] = self.calculate_sentiment(restaurant["reviews"])
+            restaurant["profile"] = self.create_restaurant_profile(restaurant)
+        else:
+            restaurant["popular_dishes"] = []
+            restaurant["descriptors"] = []
+            restaurant["sentiment"] = "neutral"
+            restaurant["profile"] = f"{restaurant['name']} is a restaurant in {restaurant['city']}."
         
-        print(f"Cleaned and enhanced data for {len(cleaned)} restaurants")
+        restaurant["content_hash"] = content_hash
+        return restaurant, reused
+    
+    def compute_content_hash(self, restaurant: Dict[str, Any]) -> str:
+        """Hash of the fields and reviews the enhanced data is derived from"""
+        content = [
+            self.enrichment_signature,
+            restaurant.get("name", ""),
+            restaurant.get("city", ""),
+            restaurant.get("rating", 0),
+            restaurant.get("price_level", 0),
+            restaurant.get("types", []),
+            restaurant.get("reviews", [])
+        ]
+        payload = json.dumps(content, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
     
     def extract_popular_dishes(self, reviews: List[Dict[str, Any]]) -> List[str]:
-        """Extract potential popular dishes from reviews using capitalized phrases and frequency"""
-        potential_dishes = []
+        """
+        Extract potential popular dishes from reviews using capitalized phrases and frequency
+        When a food lexicon is loaded, capitalized phrases must contain a known food word
+        """
+        return self._extract_popular_dishes(reviews, {}, {})
+    
+    def extract_popular_dishes_batch(self, review_lists: List[List[Dict[str, Any]]]) -> List[List[str]]:
+        """
+        Extract popular dishes for many restaurants at once, one list of reviews per restaurant
+        
+        The same phrases come up across restaurants ("Chicken Tikka", "cheese burger"),
+        so each distinct phrase is checked and formatted once for the whole batch.
+        """
+        accepted: Dict[str, bool] = {}
+        formatted: Dict[str, str] = {}
+        return [self._extract_popular_dishes(reviews, accepted, formatted) for reviews in review_lists]
+    
+    def _extract_popular_dishes(self, reviews: List[Dict[str, Any]], accepted: Dict[str, bool],
+                                formatted: Dict[str, str]) -> List[str]:
+        """
+        Count the dish candidates of one restaurant's reviews
+        
+        Args:
+            accepted: Capitalized phrase -> whether it is a dish candidate, filled as phrases are seen
+            formatted: Lowercase food phrase -> its capitalized form, filled as phrases are seen
+        """
+        dish_counter = Counter()
         
         # Look for capitalized phrases which are often dishes
         for review in reviews:
             text = review.get("text", "")
             
-            # Find capitalized words (likely to be dish names)
-            capitalized_phrases = re.findall(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b', text)
-            
-            # Also try to find phrases that might be food items
-            food_phrases = re.findall(r'\b(\w+\s+(?:burger|pizza|sandwich|salad|pasta|taco|burrito|chicken|steak|fish|soup|dessert)s?)\b', text.lower())
+            # Add capitalized phrases (likely to be dish names) that aren't common words
+            for phrase in CAPITALIZED_PHRASE_REGEX.findall(text):
+                keep = accepted.get(phrase)
+                if keep is None:
+                    keep = accepted[phrase] = (
+                        len(phrase) > 3 and phrase.lower() not in COMMON_FOOD_WORDS and self._is_food_phrase(phrase)
+                    )
+                if keep:
+                    dish_counter[phrase] += 1
             
-            # Add capitalized phrases that aren't common words
-            for phrase in capitalized_phrases:
-                if len(phrase) > 3 and phrase.lower() not in COMMON_FOOD_WORDS:
-                    potential_dishes.append(phrase)
-            
-            # Add food phrases
-            for phrase in food_phrases:
-                if phrase not in potential_dishes:
-                    # Capitalize first letter of each word for consistency
-                    formatted_phrase = " ".join(word.capitalize() for word in phrase.split())
-                    potential_dishes.append(formatted_phrase)
-        
-        # Count frequencies and return most common
-        if potential_dishes:
-            dish_counter = Counter(potential_dishes)
-            return [dish for dish, count in dish_counter.most_common(10) if count > 1]
-        
-        return []
+            # Also add phrases that end in a food item, capitalizing each word for consistency
+            for phrase in _find_food_phrases(text.lower()):
+                name = formatted.get(phrase)
+                if name is None:
+                    name = formatted[phrase] = " ".join(word.capitalize() for word in phrase.split())
+                dish_counter[name] += 1
+        
+        # Return the most common phrases mentioned more than once
+        return [dish for dish, count in dish_counter.most_common(10) if count > 1]
+    
+    def _is_food_phrase(self, phrase: str) -> bool:
+        """Check a capitalized phrase against the food lexicon (always true without one)"""
+        if self.food_lexicon is None:
+            return True
+        
+        for word in phrase.lower().split():
+            if word in self.food_lexicon or (word.endswith("s") and word[:-1] in self.food_lexicon):
+                return True
+        return False
     
     def extract_descriptors(self, reviews: List[Dict[str, Any]]) -> List[str]:
         """Extract descriptive keywords from reviews"""
-        descriptors = set()
+        found = set()
         
         # Combine all review text
         all_text = " ".join([review.get("text", "").lower() for review in reviews])
         
-        # Look for descriptor patterns
-        for category, patterns in DESCRIPTOR_PATTERNS.items():
-            for pattern in patterns:
-                if pattern in all_text:
-                    descriptors.add(category)
-                    break
+        # Find every descriptor pattern in one pass over the text
+        for match in DESCRIPTOR_REGEX.finditer(all_text):
+            found.update(DESCRIPTOR_PATTERN_CATEGORIES[match.group(1)])
         
-        return list(descriptors)
+        # Return categories in a fixed order so output is reproducible
+        return [category for category in DESCRIPTOR_PATTERNS if category in found]
     
     def calculate_sentiment(self, reviews: List[Dict[str, Any]]) -> str:
         """Calculate overall sentiment from review ratings"""
@@ -266,28 +621,23 @@ class DataProcessor:
         
         return profile
     
-    def generate_cuisine_stats(self) -> Dict[str, int]:
-        """Generate statistics about cuisine types"""
-        restaurants = self.load_restaurants()
-        
-        cuisine_counts = {}
+    def generate_stats(self, path: Optional[str] = None) -> RestaurantStats:
+        """
+        Compute all dataset statistics in a single streaming pass
         
-        for restaurant in restaurants:
-            for cuisine in restaurant.get("cuisine_types", []):
-                cuisine_counts[cuisine] = cuisine_counts.get(cuisine, 0) + 1
+        Args:
+            path: JSON or JSONL file to read (defaults to restaurants.json)
+        """
+        if path is None and snapshot_is_fresh(self.snapshot_path, self.restaurants_path):
+            with SnapshotReader(self.snapshot_path) as reader:
+                return RestaurantStats.from_restaurants(reader.iter_restaurants(reviews="skip"), PRICE_MAPPING)
         
-        # Sort by count
-        return {k: v for k, v in sorted(cuisine_counts.items(), key=lambda item: item[1], reverse=True)}
+        return RestaurantStats.from_restaurants(self.iter_restaurants(path), PRICE_MAPPING)
+    
+    def generate_cuisine_stats(self) -> Dict[str, int]:
+        """Generate statistics about cuisine types"""
+        return self.generate_stats().to_dict()["cuisines"]
     
     def generate_price_stats(self) -> Dict[str, int]:
         """Generate statistics about price levels"""
-        restaurants = self.load_restaurants()
-        
-        price_counts = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0}
-        
-        for restaurant in restaurants:
-            price_level = restaurant.get("price_level", 0)
-            price_counts[price_level] += 1
-        
-        # Convert to labels
-        return {PRICE_MAPPING[k]: v for k, v in price_counts.items()}
\ No newline at end of file
+        return self.generate_stats().to_dict()["price_levels"]
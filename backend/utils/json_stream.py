@@ -0,0 +1,145 @@
+import json
+from typing import List, Any, Optional, Tuple
+
+WHITESPACE = " \t\r\n"
+
+
+class JSONStreamParser:
+    """
+    Incremental parser for a JSON object arriving in chunks, such as streamed LLM output.
+
+    Text before the first "{" (a ```json fence, for instance) is skipped. As
+    the text is fed, the parser reports each top-level field once its value
+    is complete, and each element of a top-level array as soon as that
+    element is complete, without waiting for the rest of the document:
+
+        ("item", "recommendations", {...})   # every element, in order
+        ("field", "query_analysis", "...")   # every top-level value
+
+    Only the characters added since the previous feed() are scanned, and
+    completed values are decoded with json.loads.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._done = False
+        # Top-level parsing state: reading a key or a value, the current key and where its value starts
+        self._expect_key = True
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        # Start of the current element when the top-level value is an array
+        self._in_array = False
+        self._item_start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the top-level object has been closed"""
+        return self._done
+
+    def feed(self, chunk: str) -> List[Tuple[str, str, Any]]:
+        """
+        Add a chunk of text
+
+        Returns:
+            Events completed by this chunk, as (kind, key, value) tuples
+        """
+        self.text += chunk
+        events = []
+        text = self.text
+
+        while self._pos < len(text) and not self._done:
+            i = self._pos
+            c = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect_key and self._key_start is not None:
+                            self._key = json.loads(text[self._key_start:i + 1])
+                            self._key_start = None
+                        elif self._value_start is not None:
+                            self._finish_value(i + 1, events)
+                continue
+
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                continue
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect_key:
+                        self._key_start = i
+                    elif self._value_start is None:
+                        self._value_start = i
+                elif self._depth == 2 and self._in_array and self._item_start is None:
+                    self._item_start = i
+            elif c in "{[":
+                if self._depth == 1 and self._value_start is None:
+                    self._value_start = i
+                    self._in_array = c == "["
+                elif self._depth == 2 and self._in_array and self._item_start is None:
+                    self._item_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    # End of the document; a pending scalar value ends here too
+                    self._finish_value(i, events)
+                    self._done = True
+                elif self._depth == 2 and self._item_start is not None:
+                    self._finish_item(i + 1, events)
+                elif self._depth == 1:
+                    if self._in_array and self._item_start is not None:
+                        self._finish_item(i, events)
+                    self._finish_value(i + 1, events)
+            elif c == ",":
+                if self._depth == 1:
+                    self._finish_value(i, events)
+                    self._expect_key = True
+                elif self._depth == 2 and self._item_start is not None:
+                    self._finish_item(i, events)
+            elif c == ":":
+                if self._depth == 1 and self._expect_key:
+                    self._expect_key = False
+            elif c not in WHITESPACE:
+                # Start of a number, true, false or null
+                if self._depth == 1 and not self._expect_key and self._value_start is None:
+                    self._value_start = i
+                elif self._depth == 2 and self._in_array and self._item_start is None:
+                    self._item_start = i
+
+        return events
+
+    def _finish_item(self, end: int, events: List[Tuple[str, str, Any]]) -> None:
+        """Decode the array element ending at `end` and report it"""
+        raw = self.text[self._item_start:end].strip()
+        self._item_start = None
+        try:
+            events.append(("item", self._key, json.loads(raw)))
+        except json.JSONDecodeError:
+            pass
+
+    def _finish_value(self, end: int, events: List[Tuple[str, str, Any]]) -> None:
+        """Decode the top-level value ending at `end` and report it"""
+        if self._value_start is None or self._key is None:
+            return
+        raw = self.text[self._value_start:end].strip()
+        self._value_start = None
+        self._in_array = False
+        try:
+            events.append(("field", self._key, json.loads(raw)))
+        except json.JSONDecodeError:
+            pass
@@ -0,0 +1,168 @@
+import os
+import re
+import json
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import List, Dict, Any, Optional, Iterable, Sequence, Tuple
+
+INDEX_VERSION = 1
+
+WORD_START_REGEX = re.compile(r"(?<!\w)\w")
+
+
+class NameIndex:
+    """
+    Restaurant name lookup by place_id, prefix and substring.
+
+    Positions refer to the order the restaurants were added in (the order of
+    the dataset file and the binary snapshot). Names are matched
+    case-insensitively:
+        - place_id lookups are a dict access
+        - prefixes of the name or of any word in it are found by bisecting a
+          sorted list of the names' word-start suffixes
+        - substrings of three characters or more are looked for only in the
+          names holding their rarest trigram (postings built on first use);
+          each of those is checked against the substring, so the cost follows
+          that posting's length, not the number of names
+        - substrings of one or two characters have no trigram and still scan
+          every name (about 10 ms at 100k names); such short substrings match
+          most names anyway, and autocomplete only uses them as prefixes
+
+    Only names and place_ids are saved, so the index loads without decoding
+    the restaurants.
+    """
+
+    def __init__(self, names: Optional[List[str]] = None, place_ids: Optional[List[str]] = None):
+        self.names: List[str] = []
+        self.place_ids: List[str] = []
+        self._lower: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._trigrams: Optional[Dict[str, array]] = None
+        # Sorted word-start suffixes and their positions, built on first use and
+        # published as one tuple so concurrent first lookups never see half of it
+        self._words: Optional[Tuple[List[str], array]] = None
+        for name, place_id in zip(names or [], place_ids or []):
+            self.add(name, place_id)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str, place_id: str) -> None:
+        """Add a restaurant name"""
+        self._positions[place_id] = len(self.names)
+        self.names.append(name or "")
+        self.place_ids.append(place_id or "")
+        self._lower.append((name or "").lower())
+        self._trigrams = None
+        self._words = None
+
+    @classmethod
+    def build(cls, restaurants: Iterable[Dict[str, Any]]) -> "NameIndex":
+        """Build an index over an iterable of restaurants"""
+        index = cls()
+        for restaurant in restaurants:
+            index.add(restaurant.get("name") or "", restaurant.get("place_id") or "")
+        return index
+
+    def get(self, place_id: str) -> Optional[int]:
+        """Position of a place_id, or None"""
+        return self._positions.get(place_id)
+
+    def _build_words(self) -> Tuple[List[str], array]:
+        """Sorted suffixes of every name starting at each of its words, with their positions"""
+        keys = sorted(
+            (name[match.start():], position)
+            for position, name in enumerate(self._lower)
+            for match in WORD_START_REGEX.finditer(name)
+        )
+        words = ([key for key, _ in keys], array("l", (position for _, position in keys)))
+        self._words = words
+        return words
+
+    def _build_trigrams(self) -> Dict[str, array]:
+        """Postings of every trigram of the names, positions in ascending order"""
+        trigrams: Dict[str, array] = {}
+        for position, name in enumerate(self._lower):
+            for trigram in {name[i:i + 3] for i in range(len(name) - 2)}:
+                if trigram not in trigrams:
+                    trigrams[trigram] = array("l")
+                trigrams[trigram].append(position)
+        self._trigrams = trigrams
+        return trigrams
+
+    def prefix(self, query: str) -> List[int]:
+        """Positions of the names with a word starting with query, ascending"""
+        query = query.lower().strip()
+        if not query:
+            return []
+        keys, positions = self._words or self._build_words()
+        start = bisect_left(keys, query)
+        end = bisect_left(keys, query + "\U0010ffff", start)
+        return sorted(set(positions[start:end]))
+
+    def search(self, query: str) -> List[int]:
+        """Positions of the names containing query, plus the restaurant whose place_id is query, ascending"""
+        exact = self._positions.get(query)
+        needle = query.lower()
+        if len(needle) < 3:
+            matches = [position for position, name in enumerate(self._lower) if needle in name]
+        else:
+            trigrams = self._trigrams or self._build_trigrams()
+            # Every match holds every trigram of the needle, so the shortest
+            # posting is a complete candidate list; checking the candidates
+            # directly is cheaper than intersecting the longer postings
+            rarest = min((trigrams.get(needle[i:i + 3], ()) for i in range(len(needle) - 2)), key=len)
+            names = self._lower
+            matches = [position for position in rarest if needle in names[position]]
+
+        if exact is not None and exact not in matches:
+            matches = sorted(matches + [exact])
+        return matches
+
+    def autocomplete(self, query: str, limit: int = 10, rank: Optional[Sequence[int]] = None) -> List[int]:
+        """
+        Positions of the best name matches for a partial query
+
+        Names starting with the query come first, then names with a word
+        starting with it, then names containing it.
+
+        Args:
+            query: Partial name
+            limit: Maximum number of positions
+            rank: Optional rank per position (lower is better) to order each group by
+        """
+        query = query.lower().strip()
+        if not query or limit <= 0:
+            return []
+        key = rank.__getitem__ if rank is not None else None
+
+        word_matches = self.prefix(query)
+        starts = [p for p in word_matches if self._lower[p].startswith(query)]
+        results = heapq.nsmallest(limit, starts, key=key)
+        if len(results) < limit:
+            chosen = set(results)
+            words = (p for p in word_matches if p not in chosen)
+            results += heapq.nsmallest(limit - len(results), words, key=key)
+        if len(results) < limit and len(query) >= 3:
+            chosen = set(results)
+            others = (p for p in self.search(query) if p not in chosen)
+            results += heapq.nsmallest(limit - len(results), others, key=key)
+        return results
+
+    def save(self, path: str) -> None:
+        """Write the names and place_ids to a JSON file"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "names": self.names, "place_ids": self.place_ids}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NameIndex":
+        """Load an index written by save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported name index version in {path}")
+        return cls(data["names"], data["place_ids"])
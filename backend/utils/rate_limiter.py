@@ -0,0 +1,45 @@
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Each call to acquire() consumes one token, blocking until one is available.
+    The clock and sleep functions can be replaced, e.g. by a fake clock in tests.
+    """
+
+    def __init__(self, rate: float, capacity: float = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError("Rate must be a positive number of requests per second")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last_refill = self._clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last refill"""
+        now = self._clock()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` tokens are available, then consume them"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_time = (tokens - self._tokens) / self.rate
+
+            self._sleep(wait_time)
@@ -0,0 +1,218 @@
+import sys
+from collections.abc import Mapping
+from typing import List, Dict, Any, Optional, Iterator
+
+# Restaurant fields in output order, with the attribute value used when a record
+# lacks one. Fields the record lacked are left out of to_dict() and dict access.
+RESTAURANT_FIELDS = {
+    "place_id": "",
+    "name": "",
+    "address": "",
+    "city": "",
+    "zipcode": "",
+    "lat": 0,
+    "lng": 0,
+    "rating": 0,
+    "user_ratings_total": 0,
+    "price_level": 0,
+    "website": "",
+    "phone": "",
+    "types": [],
+    "fetched_at": None,
+    "reviews": [],
+    "cuisine_types": [],
+    "price_display": None,
+    "popular_dishes": None,
+    "descriptors": None,
+    "sentiment": None,
+    "profile": None,
+    "content_hash": None,
+}
+
+# Categorical strings that are interned, and list fields stored as tuples that
+# records loaded together share when they are equal
+INTERNED_FIELDS = ("city", "zipcode", "price_display", "sentiment")
+SHARED_LIST_FIELDS = ("types", "cuisine_types", "descriptors")
+
+
+def _shared(value: Any, shared: Optional[Dict[Any, Any]]) -> Any:
+    """Canonical instance of an immutable value among the records of one load"""
+    if shared is None:
+        return value
+    try:
+        return shared.setdefault(value, value)
+    except TypeError:
+        return value
+
+
+REVIEW_FIELDS = {
+    "author_name": "",
+    "rating": 0,
+    "text": "",
+    "time": 0,
+}
+
+
+class Review(Mapping):
+    """
+    Compact, read-only review record.
+
+    Fields are stored in slots; read-only dict access (review["text"],
+    review.get("rating", 0)) is supported so existing code keeps working.
+    """
+
+    __slots__ = tuple(REVIEW_FIELDS) + ("extra",)
+
+    def __init__(self, author_name: str = "", rating: float = 0, text: str = "", time: int = 0,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.author_name = author_name
+        self.rating = rating
+        self.text = text
+        self.time = time
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Review":
+        """Build a review from its dictionary form"""
+        if isinstance(data, Review):
+            return data
+        extra = {k: v for k, v in data.items() if k not in REVIEW_FIELDS} or None
+        return cls(
+            data.get("author_name", ""),
+            data.get("rating", 0),
+            data.get("text", ""),
+            data.get("time", 0),
+            extra
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the review as a plain dictionary"""
+        data = {"author_name": self.author_name, "rating": self.rating, "text": self.text, "time": self.time}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key: str) -> Any:
+        if key in REVIEW_FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in REVIEW_FIELDS:
+            return getattr(self, key)
+        return self.extra.get(key, default) if self.extra else default
+
+    def __iter__(self) -> Iterator[str]:
+        yield from REVIEW_FIELDS
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(REVIEW_FIELDS) + (len(self.extra) if self.extra else 0)
+
+    def __repr__(self) -> str:
+        return f"Review({self.author_name!r}, rating={self.rating!r})"
+
+
+class Restaurant(Mapping):
+    """
+    Compact restaurant record shared by the data processor and the API service.
+
+    Fields live in slots instead of a per-record dict, categorical strings and
+    lists such as city and cuisine types are shared between records, and
+    reviews are Review records (reviews loaded lazily from a snapshot are
+    converted on first access).
+    Filters can read attributes directly (restaurant.rating), while read-only
+    dict access and to_dict() keep the dictionary form available at the API
+    boundary.
+    """
+
+    __slots__ = tuple(f for f in RESTAURANT_FIELDS if f != "reviews") + ("_reviews", "_missing", "extra")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], shared: Optional[Dict[Any, Any]] = None) -> "Restaurant":
+        """
+        Build a restaurant from its dictionary form
+
+        Args:
+            data: Restaurant dictionary
+            shared: Optional dict reused for every record of one load, so equal
+                    cuisine types, descriptors and types share one tuple
+        """
+        if isinstance(data, Restaurant):
+            return data
+
+        restaurant = cls.__new__(cls)
+        for field, default in RESTAURANT_FIELDS.items():
+            if field != "reviews":
+                setattr(restaurant, field, data.get(field, default))
+        restaurant._missing = _shared(frozenset(f for f in RESTAURANT_FIELDS if f not in data), shared) or None
+
+        # Repeated values are shared between records instead of stored per record
+        for field in INTERNED_FIELDS:
+            value = getattr(restaurant, field)
+            if isinstance(value, str):
+                setattr(restaurant, field, sys.intern(value))
+        for field in SHARED_LIST_FIELDS:
+            value = getattr(restaurant, field)
+            if isinstance(value, (list, tuple)):
+                setattr(restaurant, field, _shared(tuple(value), shared))
+
+        # Decoded reviews are compacted now; lazily loaded ones stay lazy
+        reviews = data.get("reviews") or []
+        if type(reviews) is list:
+            reviews = [Review.from_dict(review) for review in reviews]
+        restaurant._reviews = reviews
+        restaurant.extra = {k: v for k, v in data.items() if k not in RESTAURANT_FIELDS} or None
+        return restaurant
+
+    @property
+    def reviews(self) -> List[Review]:
+        """Reviews as Review records, converted on first access"""
+        reviews = self._reviews
+        if type(reviews) is not list:
+            reviews = self._reviews = [Review.from_dict(review) for review in reviews]
+        return reviews
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the restaurant as a plain dictionary with the fields it was built from (reviews included)"""
+        data = {}
+        for field in self:
+            if field == "reviews":
+                data[field] = [review.to_dict() for review in self.reviews]
+            else:
+                value = self[field]
+                data[field] = list(value) if type(value) is tuple else value
+        return data
+
+    def _has(self, field: str) -> bool:
+        return self._missing is None or field not in self._missing
+
+    def __getitem__(self, key: str) -> Any:
+        if key in RESTAURANT_FIELDS:
+            if not self._has(key):
+                raise KeyError(key)
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in RESTAURANT_FIELDS:
+            return getattr(self, key) if self._has(key) else default
+        return self.extra.get(key, default) if self.extra else default
+
+    def __iter__(self) -> Iterator[str]:
+        for field in RESTAURANT_FIELDS:
+            if self._has(field):
+                yield field
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Restaurant({self.place_id!r}, {self.name!r})"
@@ -0,0 +1,127 @@
+from collections import Counter
+from typing import Dict, Any, Iterable, Optional
+
+# Enhanced fields reported in the enrichment coverage
+COVERAGE_FIELDS = ("popular_dishes", "descriptors", "sentiment", "profile", "content_hash")
+
+PERCENTILES = (25, 50, 75, 90)
+
+
+def counter_percentile(counts: Counter, total: int, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of the values counted in a Counter"""
+    if not total:
+        return None
+
+    rank = min(total - 1, int(round(pct / 100 * (total - 1))))
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen > rank:
+            return value
+    return None
+
+
+class RestaurantStats:
+    """
+    Single-pass statistics over a stream of restaurants.
+
+    Each restaurant is folded into running counters with add(), so the whole
+    dataset is never held in memory and every statistic comes from the same
+    pass. Ratings and review counts are kept as value counts, which gives
+    exact percentiles without storing one entry per restaurant.
+    """
+
+    def __init__(self, price_labels: Dict[int, str], by_city: bool = True):
+        """
+        Args:
+            price_labels: Display label for each known price level
+            by_city: Also keep a breakdown per city
+        """
+        self.price_labels = price_labels
+        self.total = 0
+        self.cuisines = Counter()
+        self.prices = Counter()
+        self.rating_buckets = Counter()
+        self.ratings = Counter()
+        self.review_totals = Counter()
+        self.coverage = Counter()
+        self.cities = {} if by_city else None
+
+    def add(self, restaurant: Dict[str, Any]) -> None:
+        """Fold one restaurant into the statistics"""
+        self.total += 1
+        self.cuisines.update(restaurant.get("cuisine_types") or [])
+
+        # Price levels outside the known range are counted as unknown
+        price_level = restaurant.get("price_level")
+        self.prices[self.price_labels.get(price_level, self.price_labels.get(0, "Unknown"))] += 1
+
+        rating = restaurant.get("rating") or 0
+        # Round to nearest 0.5
+        self.rating_buckets[round(rating * 2) / 2] += 1
+        if rating:
+            self.ratings[rating] += 1
+
+        review_total = restaurant.get("user_ratings_total")
+        if review_total is not None:
+            self.review_totals[review_total] += 1
+
+        for field in COVERAGE_FIELDS:
+            if restaurant.get(field):
+                self.coverage[field] += 1
+
+        if self.cities is not None:
+            city = restaurant.get("city") or "unknown"
+            if city not in self.cities:
+                self.cities[city] = RestaurantStats(self.price_labels, by_city=False)
+            self.cities[city].add(restaurant)
+
+    def _percentiles(self, counts: Counter) -> Dict[str, Optional[float]]:
+        """Percentiles of a value count"""
+        total = sum(counts.values())
+        return {f"p{pct}": counter_percentile(counts, total, pct) for pct in PERCENTILES}
+
+    def to_dict(self, top_cuisines: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the statistics as a JSON-serializable dictionary
+
+        Args:
+            top_cuisines: Only include the most common cuisine types (all when None)
+        """
+        rated = sum(self.ratings.values())
+        rating_sum = sum(rating * count for rating, count in self.ratings.items())
+
+        # Known price levels are always listed, in order, followed by anything else
+        prices = {label: self.prices.get(label, 0) for label in self.price_labels.values()}
+        prices.update({label: count for label, count in self.prices.items() if label not in prices})
+
+        stats = {
+            "total": self.total,
+            "cuisines": dict(self.cuisines.most_common(top_cuisines)),
+            "price_levels": prices,
+            "rating_distribution": {str(bucket): self.rating_buckets[bucket] for bucket in sorted(self.rating_buckets)},
+            "rating": dict(
+                rated=rated,
+                average=round(rating_sum / rated, 2) if rated else None,
+                **self._percentiles(self.ratings)
+            ),
+            "review_count": self._percentiles(self.review_totals),
+            "coverage": {field: self.coverage[field] for field in COVERAGE_FIELDS}
+        }
+
+        if self.cities is not None:
+            stats["cities"] = {
+                city: self.cities[city].to_dict(top_cuisines)
+                for city in sorted(self.cities, key=lambda c: (-self.cities[c].total, c))
+            }
+
+        return stats
+
+    @classmethod
+    def from_restaurants(cls, restaurants: Iterable[Dict[str, Any]], price_labels: Dict[int, str],
+                         by_city: bool = True) -> "RestaurantStats":
+        """Compute statistics over an iterable of restaurants in one pass"""
+        stats = cls(price_labels, by_city=by_city)
+        for restaurant in restaurants:
+            stats.add(restaurant)
+        return stats
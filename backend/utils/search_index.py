@@ -0,0 +1,209 @@
+import os
+import re
+import json
+import math
+import heapq
+from array import array
+from collections import Counter
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+INDEX_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Share of the catalog a query's postings must cover for its scores to be
+# accumulated in a flat list instead of a dict
+DENSE_QUERY_SHARE = 0.25
+
+# Weight of each field's terms in a restaurant's document
+FIELD_WEIGHTS = {
+    "name": 2.0,
+    "cuisine_types": 3.0,
+    "popular_dishes": 2.0,
+    "descriptors": 2.0,
+    "profile": 1.0,
+    "reviews": 1.0,
+}
+
+TOKEN_REGEX = re.compile(r"[^\W_]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "for", "from", "had", "has",
+    "have", "i", "im", "in", "is", "it", "its", "looking", "me", "my", "need", "not", "of", "on",
+    "or", "our", "place", "please", "restaurant", "restaurants", "s", "so", "some", "somewhere",
+    "that", "the", "their", "there", "they", "this", "to", "too", "also", "very", "want", "was",
+    "we", "were", "where", "which", "with", "would", "you", "your", "recommend", "find", "like",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, with a plural "s" stripped"""
+    tokens = []
+    for token in TOKEN_REGEX.findall(text.lower().replace("'", "")):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def restaurant_terms(restaurant: Dict[str, Any]) -> Counter:
+    """Weighted term frequencies of a restaurant's searchable fields"""
+    terms = Counter()
+
+    def add(text: str, weight: float) -> None:
+        for token in tokenize(text):
+            terms[token] += weight
+
+    add(restaurant.get("name") or "", FIELD_WEIGHTS["name"])
+    add(" ".join(restaurant.get("cuisine_types") or []), FIELD_WEIGHTS["cuisine_types"])
+    add(" ".join(restaurant.get("popular_dishes") or []), FIELD_WEIGHTS["popular_dishes"])
+    add(" ".join(d.replace("_", " ") for d in restaurant.get("descriptors") or []), FIELD_WEIGHTS["descriptors"])
+    add(restaurant.get("profile") or "", FIELD_WEIGHTS["profile"])
+    for review in restaurant.get("reviews") or []:
+        add(review.get("text") or "", FIELD_WEIGHTS["reviews"])
+
+    return terms
+
+
+class SearchIndex:
+    """
+    BM25 inverted index over the restaurants' searchable text.
+
+    Each restaurant is one document made of its name, cuisine types, popular
+    dishes, descriptors, profile and review text, with per-field weights.
+    The index is built during --process, saved next to the dataset and
+    loaded at startup, so a query is scored by walking only the postings of
+    its own terms.
+    """
+
+    def __init__(self):
+        self.doc_ids: List[str] = []
+        self.doc_lengths = array("f")
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self._norms = None
+        # term -> BM25 contribution to each document of its postings, filled on first use
+        self._impacts: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, restaurant: Dict[str, Any]) -> None:
+        """Add a restaurant to the index"""
+        doc = len(self.doc_ids)
+        terms = restaurant_terms(restaurant)
+        self.doc_ids.append(restaurant.get("place_id", ""))
+        self.doc_lengths.append(sum(terms.values()))
+        for term, frequency in terms.items():
+            if term not in self.postings:
+                self.postings[term] = (array("l"), array("f"))
+            docs, frequencies = self.postings[term]
+            docs.append(doc)
+            frequencies.append(frequency)
+        self._norms = None
+        self._impacts = {}
+
+    @classmethod
+    def build(cls, restaurants: Iterable[Dict[str, Any]]) -> "SearchIndex":
+        """Build an index over an iterable of restaurants"""
+        index = cls()
+        for restaurant in restaurants:
+            index.add(restaurant)
+        return index
+
+    def _length_norms(self) -> array:
+        """Per-document BM25 length normalization, k1 * (1 - b + b * length / average length)"""
+        if self._norms is None:
+            average = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 1.0
+            self._norms = array("f", (
+                BM25_K1 * (1 - BM25_B + BM25_B * length / (average or 1.0)) for length in self.doc_lengths
+            ))
+        return self._norms
+
+    def _term_impacts(self, term: str) -> array:
+        """BM25 score a term adds to each document of its postings, computed once per term"""
+        impacts = self._impacts.get(term)
+        if impacts is None:
+            norms = self._length_norms()
+            docs, frequencies = self.postings[term]
+            idf = math.log(1 + (len(self.doc_ids) - len(docs) + 0.5) / (len(docs) + 0.5))
+            impacts = array("d", (
+                idf * frequency * (BM25_K1 + 1) / (frequency + norms[doc]) for doc, frequency in zip(docs, frequencies)
+            ))
+            self._impacts[term] = impacts
+        return impacts
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Score the documents matching any query term
+
+        Scores are accumulated only for the documents in the postings of the
+        query terms, so a query costs what it matches, not the catalog size:
+        in a dict when the postings are sparse, and in a flat list when they
+        cover a good share of the catalog anyway (cheaper per posting). With
+        a limit, only the best `limit` documents are selected (a heap, not a
+        sort of every match).
+
+        Returns:
+            List of (place_id, score), best first (ties in index order); empty when no term matches
+        """
+        total = len(self.doc_ids)
+        postings = [(self.postings[term][0], self._term_impacts(term))
+                    for term in set(tokenize(query)) if term in self.postings]
+
+        if sum(len(docs) for docs, _ in postings) >= total * DENSE_QUERY_SHARE:
+            scores = [0.0] * total
+            for docs, impacts in postings:
+                for doc, impact in zip(docs, impacts):
+                    scores[doc] += impact
+            matched = range(total)
+        else:
+            scores: Dict[int, float] = {}
+            get = scores.get
+            for docs, impacts in postings:
+                for doc, impact in zip(docs, impacts):
+                    scores[doc] = get(doc, 0.0) + impact
+            matched = sorted(scores)
+
+        # Candidates are in index order, and both selections are stable, so ties keep it
+        if limit is None:
+            ranked = sorted(matched, key=lambda doc: -scores[doc])
+        else:
+            ranked = heapq.nlargest(limit, matched, key=scores.__getitem__)
+        return [(self.doc_ids[doc], scores[doc]) for doc in ranked if scores[doc] > 0]
+
+    def save(self, path: str) -> None:
+        """Write the index to a JSON file"""
+        data = {
+            "version": INDEX_VERSION,
+            "doc_ids": self.doc_ids,
+            "doc_lengths": [round(length, 3) for length in self.doc_lengths],
+            "postings": {
+                term: [list(docs), [round(f, 3) for f in frequencies]]
+                for term, (docs, frequencies) in self.postings.items()
+            }
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SearchIndex":
+        """Load an index written by save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version in {path}")
+
+        index = cls()
+        index.doc_ids = data["doc_ids"]
+        index.doc_lengths = array("f", data["doc_lengths"])
+        index.postings = {
+            term: (array("l", docs), array("f", frequencies))
+            for term, (docs, frequencies) in data["postings"].items()
+        }
+        return index
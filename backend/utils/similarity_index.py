@@ -0,0 +1,269 @@
+import os
+import re
+import sys
+import math
+import heapq
+from array import array
+from collections import Counter
+from typing import List, Dict, Any, Optional, Iterable, Sequence, Tuple
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.search_index import tokenize
+
+# Weight of each kind of feature in a restaurant's vector, before IDF
+FEATURE_WEIGHTS = {
+    "cuisine": 3.0,
+    "name": 2.0,
+    "descriptor": 1.5,
+    "dish": 1.0,
+}
+
+# Share of the final score from the feature vectors, the price level and the distance
+VECTOR_WEIGHT = 0.6
+PRICE_WEIGHT = 0.2
+LOCATION_WEIGHT = 0.2
+
+# Distance (km) at which the location part of the score has halved
+LOCATION_HALF_KM = 10.0
+
+# Features found in more than this share of the restaurants say nothing about
+# similarity ("Restaurant") and are left out of the vectors
+MAX_FEATURE_SHARE = 0.5
+
+# "similar to X", "places like X", "pizza instead of X"... captures what follows
+# the phrase. A bare "like" is a verb as often as not ("I'd like X tonight"),
+# so it only counts after a word for a place or a kind of food
+ANCHOR_REGEX = re.compile(
+    r"\b(?:similar to|reminds? me of|alternatives? to|comparable to|instead of|other than|"
+    r"(?:something|somewhere|anything|place|places|restaurant|restaurants|spot|spots|joint|joints|food|"
+    r"one|ones|chain|chains|burgers?|pizza|tacos?|sushi|chicken|coffee)\s+(?:just\s+)?like)\s+(.+)",
+    re.IGNORECASE
+)
+
+
+# What names add to tell branches apart: " - Downtown", " | Easton", "#12", "(Short North)"
+BRANCH_SUFFIX_REGEX = re.compile(r"(?:\s+[-\u2013\u2014|]\s+|\s*#\s*\d|\s*\().*$")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a name and drop punctuation, so "McDonald's" and "mcdonalds" are equal"""
+    return " ".join(re.sub(r"[^\w\s]", "", name.lower().replace("_", " ")).split())
+
+
+def brand_name(name: str, city: Optional[str] = None) -> str:
+    """
+    Normalized name without its branch suffix, so "McDonald's - Downtown",
+    "Skyline Chili #12" and "Skyline Chili Columbus" (in Columbus) name the
+    brands "mcdonalds" and "skyline chili"
+    """
+    brand = normalize_name(BRANCH_SUFFIX_REGEX.sub("", name))
+    city = normalize_name(city or "")
+    if city and brand.endswith(" " + city):
+        brand = brand[:-len(city) - 1]
+    return brand or normalize_name(name)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 12742.0 * math.asin(min(1.0, math.sqrt(a)))
+
+
+def restaurant_features(restaurant: Any, dish_cache: Optional[Dict[tuple, List[str]]] = None) -> set:
+    """
+    Features of a restaurant's cuisine types, name, descriptors and popular dishes
+
+    Words of the name are features too: cuisine types are coarse ("Restaurant",
+    "Bar/Pub"), and names like "Hot Chicken" or "Sushi Bar" say what a place serves.
+
+    Args:
+        restaurant: Restaurant record
+        dish_cache: Optional dict reused across calls to tokenize each list of dishes once
+    """
+    features = {f"cuisine:{cuisine.lower()}" for cuisine in restaurant.get("cuisine_types") or []}
+    features.update(f"name:{token}" for token in tokenize(restaurant.get("name") or ""))
+    features.update(f"descriptor:{descriptor}" for descriptor in restaurant.get("descriptors") or [])
+
+    dishes = tuple(restaurant.get("popular_dishes") or ())
+    tokens = dish_cache.get(dishes) if dish_cache is not None else None
+    if tokens is None:
+        tokens = [f"dish:{token}" for token in tokenize(" ".join(dishes))]
+        if dish_cache is not None:
+            dish_cache[dishes] = tokens
+    features.update(tokens)
+    return features
+
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour index of restaurants by what they serve and where they are.
+
+    Each restaurant gets a sparse feature vector over its cuisine types, name
+    words, descriptors and popular dish words, weighted by kind and by IDF and
+    L2-normalized at build time. The vectors are kept as postings per
+    feature, so the neighbours of a restaurant are found by walking only the
+    postings of its own features. The score of a neighbour blends the cosine
+    similarity of the vectors with how close its price level and location are:
+
+        0.6 * cosine + 0.2 * price similarity + 0.2 * location similarity
+
+    Restaurants sharing no feature with the anchor are never returned.
+
+    Positions refer to the order the restaurants were given in.
+    """
+
+    def __init__(self, restaurants: Sequence[Any], rank: Optional[Sequence[int]] = None):
+        """
+        Args:
+            restaurants: Restaurant records, in catalog order
+            rank: Optional popularity rank per position (lower is better), to break ties
+        """
+        self.restaurants = restaurants
+        self.rank = rank
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.vectors: List[Dict[str, float]] = []
+        # Normalized names and brand names -> positions, to recognise a named
+        # restaurant in a query and to leave out the other branches of a chain
+        self._names: Dict[str, List[int]] = {}
+        self._brands: Dict[str, List[int]] = {}
+        self._brand_of: List[str] = []
+
+        dish_cache: Dict[tuple, List[str]] = {}
+        features = [restaurant_features(r, dish_cache) for r in restaurants]
+        document_frequency = Counter(feature for vector in features for feature in vector)
+        total = len(restaurants)
+        max_frequency = max(1, int(total * MAX_FEATURE_SHARE)) if total >= 10 else total
+
+        # Weight of each feature: its kind's weight times its IDF
+        weights = {
+            feature: FEATURE_WEIGHTS[feature.split(":", 1)[0]] * math.log(1 + total / frequency)
+            for feature, frequency in document_frequency.items()
+            if frequency <= max_frequency
+        }
+
+        for position, (restaurant, vector) in enumerate(zip(restaurants, features)):
+            weighted = [(feature, weights[feature]) for feature in vector if feature in weights]
+            norm = math.sqrt(sum(w * w for _, w in weighted)) or 1.0
+            self.vectors.append({feature: w / norm for feature, w in weighted})
+            for feature, weight in weighted:
+                if feature not in self.postings:
+                    self.postings[feature] = (array("l"), array("f"))
+                docs, doc_weights = self.postings[feature]
+                docs.append(position)
+                doc_weights.append(weight / norm)
+
+            name = normalize_name(restaurant.name or "")
+            if name:
+                self._names.setdefault(name, []).append(position)
+            brand = brand_name(restaurant.name or "", restaurant.city)
+            self._brand_of.append(brand)
+            if brand:
+                self._brands.setdefault(brand, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def _score(self, anchor: Any, candidate: Any, cosine: float) -> float:
+        """Blend the vector similarity with the price and location similarity"""
+        if anchor.price_level and candidate.price_level:
+            price = 1.0 - abs(anchor.price_level - candidate.price_level) / 3
+        else:
+            price = 0.5
+        if (anchor.lat or anchor.lng) and (candidate.lat or candidate.lng):
+            distance = haversine_km(anchor.lat, anchor.lng, candidate.lat, candidate.lng)
+            location = LOCATION_HALF_KM / (LOCATION_HALF_KM + distance)
+        else:
+            location = 0.5
+        return VECTOR_WEIGHT * cosine + PRICE_WEIGHT * price + LOCATION_WEIGHT * location
+
+    def similar(self, position: int, k: int = 10, city: Optional[str] = None,
+                price_levels: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Get the k restaurants most similar to one restaurant
+
+        The restaurant itself and every restaurant of the same brand (other
+        branches of a chain, see brand_name) are left out.
+
+        Args:
+            position: Position of the anchor restaurant
+            k: Maximum number of neighbours
+            city: Optional city filter (case-insensitive)
+            price_levels: Optional price levels to keep
+
+        Returns:
+            List of (position, score), most similar first
+        """
+        anchor = self.restaurants[position]
+        excluded = set(self._brands.get(self._brand_of[position], ())) | {position}
+        city = city.lower() if city else None
+        prices = set(price_levels) if price_levels else None
+
+        # Cosine similarity with every restaurant sharing a feature, from the anchor's postings
+        cosines = [0.0] * len(self.vectors)
+        for feature, weight in self.vectors[position].items():
+            docs, weights = self.postings[feature]
+            for doc, doc_weight in zip(docs, weights):
+                cosines[doc] += weight * doc_weight
+
+        # Score candidates by decreasing cosine until no unscored candidate could
+        # beat the k-th best, even with a perfect price and location match
+        best: List[Tuple[float, int, int]] = []
+        slack = PRICE_WEIGHT + LOCATION_WEIGHT
+        for doc in sorted((d for d in range(len(cosines)) if cosines[d] > 0), key=cosines.__getitem__, reverse=True):
+            cosine = cosines[doc]
+            if len(best) == k and best[0][0] > VECTOR_WEIGHT * cosine + slack:
+                break
+            if doc in excluded:
+                continue
+            candidate = self.restaurants[doc]
+            if city is not None and (candidate.city or "").lower() != city:
+                continue
+            if prices is not None and candidate.price_level not in prices:
+                continue
+            rank = self.rank[doc] if self.rank is not None else doc
+            entry = (self._score(anchor, candidate, cosine), -rank, doc)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+        return [(doc, score) for score, _, doc in sorted(best, reverse=True)]
+
+    def find_anchor(self, query: str) -> Optional[int]:
+        """
+        Recognise a restaurant named in a "similar to X" style query
+
+        The words after the phrase are matched against the restaurant names,
+        longest first, so "places like McDonald's but cheaper" finds "McDonald's".
+        Only whole names or brand names match ("like Skyline Chili" finds
+        "Skyline Chili #12"); of several branches the most popular is used.
+
+        Returns:
+            Position of the named restaurant, or None
+        """
+        for match in ANCHOR_REGEX.finditer(query):
+            words = normalize_name(match.group(1)).split()
+            for end in range(len(words), 0, -1):
+                name = " ".join(words[:end])
+                positions = self._names.get(name) or self._brands.get(name)
+                if positions:
+                    if self.rank is None:
+                        return positions[0]
+                    return min(positions, key=self.rank.__getitem__)
+        return None
+
+    def explain(self, anchor: int, position: int) -> Dict[str, Any]:
+        """Features shared by two restaurants, their price levels and distance"""
+        a, b = self.restaurants[anchor], self.restaurants[position]
+        shared = sorted(set(self.vectors[anchor]) & set(self.vectors[position]),
+                        key=lambda f: -self.vectors[anchor][f] * self.vectors[position][f])
+        reasons: Dict[str, Any] = {"cuisines": [], "names": [], "descriptors": [], "dishes": []}
+        for feature in shared:
+            kind, value = feature.split(":", 1)
+            reasons[kind + ("es" if kind == "dish" else "s")].append(value)
+        reasons["price_levels"] = [a.price_level, b.price_level]
+        if (a.lat or a.lng) and (b.lat or b.lng):
+            reasons["distance_km"] = round(haversine_km(a.lat, a.lng, b.lat, b.lng), 1)
+        return reasons
@@ -0,0 +1,396 @@
+import os
+import sys
+import json
+import mmap
+import math
+import shutil
+import struct
+import tempfile
+import weakref
+from array import array
+from collections.abc import Sequence
+from typing import List, Dict, Any, Optional, Iterator, Iterable
+
+MAGIC = b"RSNAP\x00\x00\x01"
+FORMAT_VERSION = 1
+
+# Numeric columns: field name -> (array typecode, value stored when the field is missing)
+NUMERIC_COLUMNS = {
+    "rating": ("d", math.nan),
+    "user_ratings_total": ("q", -1),
+    "price_level": ("q", -1),
+    "lat": ("d", math.nan),
+    "lng": ("d", math.nan),
+}
+
+# Categorical columns are stored as ids into a string table in the header
+CATEGORICAL_COLUMNS = ("city",)
+
+# Everything is 8-byte aligned so columns can be viewed in place
+ALIGNMENT = 8
+
+
+def _column_value(field: str, value: Any) -> Any:
+    """
+    Value stored in a numeric column, or None if it can't be stored exactly
+    (the original value is then kept with the record's other fields)
+    """
+    typecode, _ = NUMERIC_COLUMNS[field]
+    if typecode == "d":
+        return value if type(value) is float else None
+    return value if type(value) is int else None
+
+
+def _release_mapping(views: List[memoryview], mapping: mmap.mmap) -> None:
+    """Release the views over a snapshot mapping, then unmap it"""
+    for view in views:
+        view.release()
+    mapping.close()
+
+
+def _pad(f) -> None:
+    """Pad a file with zeros to the next aligned offset"""
+    remainder = f.tell() % ALIGNMENT
+    if remainder:
+        f.write(b"\x00" * (ALIGNMENT - remainder))
+
+
+class SnapshotWriter:
+    """
+    Streaming writer for the binary restaurant snapshot.
+
+    Numeric fields (rating, review count, price level, coordinates) go to
+    fixed-width columns and city names to a categorical column. Reviews are
+    stored apart from the remaining fields as one compact JSON blob per
+    restaurant, so a reader can skip review text entirely until it is needed.
+    Blobs are spooled to temporary files while records are added, and the
+    snapshot is assembled and moved into place by close().
+
+    Layout: magic, header length, JSON header, then the aligned columns, the
+    record blobs and the review blobs, each with an offsets column.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.columns = {field: array(typecode) for field, (typecode, _) in NUMERIC_COLUMNS.items()}
+        self.categories: Dict[str, Dict[str, int]] = {field: {} for field in CATEGORICAL_COLUMNS}
+        self.category_ids = {field: array("q") for field in CATEGORICAL_COLUMNS}
+        self.layouts: Dict[tuple, int] = {}
+        self.layout_ids = array("q")
+        self.record_offsets = array("q", [0])
+        self.review_offsets = array("q", [0])
+
+        directory = os.path.dirname(os.path.abspath(path))
+        self._records = tempfile.TemporaryFile(dir=directory)
+        self._reviews = tempfile.TemporaryFile(dir=directory)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add(self, restaurant: Dict[str, Any]) -> None:
+        """Add one restaurant to the snapshot"""
+        rest = dict(restaurant)
+
+        for field, (_, missing) in NUMERIC_COLUMNS.items():
+            value = _column_value(field, rest.get(field))
+            if value is None:
+                # Missing or not exactly representable: keep it with the other fields
+                number = rest.get(field)
+                value = missing
+                if isinstance(number, (int, float)) and not isinstance(number, bool) and math.isfinite(number):
+                    value = type(missing)(number)
+            else:
+                del rest[field]
+            self.columns[field].append(value)
+
+        for field in CATEGORICAL_COLUMNS:
+            value = rest.get(field)
+            if isinstance(value, str):
+                table = self.categories[field]
+                self.category_ids[field].append(table.setdefault(value, len(table)))
+                del rest[field]
+            else:
+                self.category_ids[field].append(-1)
+
+        # Reviews are stored apart; an explicit null stays with the other fields
+        reviews = rest.pop("reviews") if rest.get("reviews") is not None else None
+
+        # Key order is kept so exports reproduce the original records
+        layout = tuple(restaurant.keys())
+        self.layout_ids.append(self.layouts.setdefault(layout, len(self.layouts)))
+
+        self._records.write(json.dumps(rest, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        self.record_offsets.append(self._records.tell())
+
+        if reviews is not None:
+            self._reviews.write(json.dumps(reviews, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        self.review_offsets.append(self._reviews.tell())
+
+        self.count += 1
+
+    def close(self) -> None:
+        """Assemble the snapshot and atomically move it into place"""
+        body = []
+        for field, column in self.columns.items():
+            body.append(("column", field, column))
+        for field, column in self.category_ids.items():
+            body.append(("category", field, column))
+        body.append(("layout", "layout", self.layout_ids))
+        body.append(("offsets", "records", self.record_offsets))
+        body.append(("offsets", "reviews", self.review_offsets))
+
+        # Offsets in the header are relative to the end of the header
+        sections = {}
+        position = 0
+        for kind, name, column in body:
+            sections[f"{kind}:{name}"] = {"offset": position, "typecode": column.typecode, "length": len(column)}
+            position += len(column) * column.itemsize
+            position += -position % ALIGNMENT
+        sections["blob:records"] = {"offset": position, "size": self.record_offsets[-1]}
+        position += self.record_offsets[-1]
+        sections["blob:reviews"] = {"offset": position, "size": self.review_offsets[-1]}
+
+        header = json.dumps({
+            "version": FORMAT_VERSION,
+            "count": self.count,
+            "categories": {field: list(table) for field, table in self.categories.items()},
+            "layouts": [list(layout) for layout in self.layouts],
+            "sections": sections
+        }, ensure_ascii=False).encode("utf-8")
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            _pad(f)
+
+            for kind, name, column in body:
+                if sys.byteorder != "little":
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                column.tofile(f)
+                _pad(f)
+
+            for blob in (self._records, self._reviews):
+                blob.seek(0)
+                shutil.copyfileobj(blob, f)
+
+        self._records.close()
+        self._reviews.close()
+        os.replace(tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard the snapshot being written"""
+        self._records.close()
+        self._reviews.close()
+
+
+def write_snapshot(restaurants: Iterable[Dict[str, Any]], path: str) -> int:
+    """
+    Write restaurants to a binary snapshot
+
+    Returns:
+        Number of restaurants written
+    """
+    with SnapshotWriter(path) as writer:
+        for restaurant in restaurants:
+            writer.add(restaurant)
+    return writer.count
+
+
+class LazyReviews(Sequence):
+    """
+    Reviews of one restaurant, decoded from the snapshot on first access
+    """
+
+    __slots__ = ("_reader", "_index", "_reviews")
+
+    def __init__(self, reader: "SnapshotReader", index: int):
+        self._reader = reader
+        self._index = index
+        self._reviews = None
+
+    def _load(self) -> List[Dict[str, Any]]:
+        if self._reviews is None:
+            self._reviews = self._reader.reviews(self._index) or []
+        return self._reviews
+
+    def __getitem__(self, item):
+        return self._load()[item]
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (LazyReviews, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyReviews({self._load()!r})" if self._reviews is not None else "LazyReviews(<not loaded>)"
+
+
+class SnapshotReader:
+    """
+    Memory-mapped reader for snapshots written by SnapshotWriter.
+
+    Opening a snapshot only parses the header. Numeric and categorical columns
+    are exposed as zero-copy views over the mapping, record fields are decoded
+    per record, and review text is decoded only when it is accessed.
+
+    Records loaded lazily keep the reader alive through their reviews, and
+    the mapping is released by close() or once the reader is no longer
+    referenced by anything, so a record outliving its catalog can still
+    decode its reviews.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a restaurant snapshot: {path}")
+
+        header_length, = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mmap[header_start:header_start + header_length].decode("utf-8"))
+        if header["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {header['version']} in {path}")
+
+        self.count = header["count"]
+        self.categories: Dict[str, List[str]] = header["categories"]
+        self.layouts: List[List[str]] = header["layouts"]
+        self._sections = header["sections"]
+        self._start = header_start + header_length
+        self._start += -self._start % ALIGNMENT
+        self._view = memoryview(self._mmap)
+
+        self.columns = {field: self._array(f"column:{field}") for field in NUMERIC_COLUMNS}
+        self.category_ids = {field: self._array(f"category:{field}") for field in CATEGORICAL_COLUMNS}
+        self._layout_ids = self._array("layout:layout")
+        self._record_offsets = self._array("offsets:records")
+        self._review_offsets = self._array("offsets:reviews")
+
+        # Derived views first, the base view last, then the mapping itself
+        views = [view for view in [*self.columns.values(), *self.category_ids.values(), self._layout_ids,
+                                   self._record_offsets, self._review_offsets] if isinstance(view, memoryview)]
+        self._finalizer = weakref.finalize(self, _release_mapping, views + [self._view], self._mmap)
+
+    def _array(self, name: str):
+        """Typed view of a column section"""
+        section = self._sections[name]
+        start = self._start + section["offset"]
+        itemsize = array(section["typecode"]).itemsize
+        view = self._view[start:start + section["length"] * itemsize].cast(section["typecode"])
+        if sys.byteorder != "little":
+            view = array(section["typecode"], view)
+            view.byteswap()
+        return view
+
+    def _blob(self, name: str, offsets, index: int) -> Optional[bytes]:
+        """Raw bytes of one record's blob, or None if it is empty"""
+        start, end = offsets[index], offsets[index + 1]
+        if start == end:
+            return None
+        base = self._start + self._sections[f"blob:{name}"]["offset"]
+        return self._mmap[base + start:base + end]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        """Release the memory mapping now (records with lazy reviews can't decode them afterwards)"""
+        self._finalizer()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def category(self, field: str, index: int) -> Optional[str]:
+        """Categorical value of a record"""
+        value_id = self.category_ids[field][index]
+        return self.categories[field][value_id] if value_id >= 0 else None
+
+    def reviews(self, index: int) -> Optional[List[Dict[str, Any]]]:
+        """Decode the reviews of a record"""
+        blob = self._blob("reviews", self._review_offsets, index)
+        return json.loads(blob.decode("utf-8")) if blob is not None else None
+
+    def record(self, index: int, reviews: str = "lazy") -> Dict[str, Any]:
+        """
+        Rebuild one restaurant record
+
+        Args:
+            index: Position of the record in the snapshot
+            reviews: "lazy" for reviews decoded on first access, "eager" to decode
+                     them now, or "skip" to leave them out
+        """
+        rest = json.loads(self._blob("records", self._record_offsets, index).decode("utf-8"))
+        record = {}
+        for key in self.layouts[self._layout_ids[index]]:
+            if key in rest:
+                record[key] = rest[key]
+            elif key in NUMERIC_COLUMNS:
+                record[key] = self.columns[key][index]
+            elif key in CATEGORICAL_COLUMNS:
+                record[key] = self.category(key, index)
+            elif key == "reviews":
+                if reviews == "eager":
+                    record[key] = self.reviews(index)
+                elif reviews == "lazy":
+                    record[key] = LazyReviews(self, index)
+        return record
+
+    def iter_restaurants(self, reviews: str = "lazy") -> Iterator[Dict[str, Any]]:
+        """Iterate over all records (see record() for the reviews options)"""
+        for index in range(self.count):
+            yield self.record(index, reviews)
+
+    def load_restaurants(self, reviews: str = "lazy") -> List[Dict[str, Any]]:
+        """Load all records"""
+        return list(self.iter_restaurants(reviews))
+
+    def export_json(self, path: str) -> int:
+        """
+        Export the snapshot as a restaurants.json file (same layout as json.dump with indent=2)
+
+        Returns:
+            Number of restaurants exported
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for index, restaurant in enumerate(self.iter_restaurants(reviews="eager")):
+                f.write("\n" if index == 0 else ",\n")
+                record = json.dumps(restaurant, ensure_ascii=False, indent=2)
+                f.write("  " + record.replace("\n", "\n  "))
+            f.write("\n]" if self.count else "]")
+        os.replace(tmp_path, path)
+        return self.count
+
+
+def snapshot_path_for(json_path: str) -> str:
+    """Path of the snapshot that sits next to a restaurants JSON file"""
+    return os.path.splitext(json_path)[0] + ".snap"
+
+
+def snapshot_is_fresh(snapshot_path: str, json_path: str) -> bool:
+    """Check that a snapshot exists and is not older than the JSON file it was written with"""
+    if not os.path.exists(snapshot_path):
+        return False
+    return not os.path.exists(json_path) or os.path.getmtime(snapshot_path) >= os.path.getmtime(json_path)
+